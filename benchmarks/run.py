@@ -0,0 +1,186 @@
+"""Time and memory-profile Mindmapp's core table helpers on synthetic hierarchies.
+
+    python -m benchmarks.run --sizes 1000 10000 100000
+    python -m benchmarks.run --compare bench-results/<earlier run>.json
+
+Run from the repository root. Each benchmark is timed `--repeat` times on fresh inputs, then
+run once more under tracemalloc for its peak allocation. Results go to a JSON file (by default
+bench-results/<commit>-<time>.json) that --compare can diff a later run against.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import DEFAULT_FANOUT, synthetic_hierarchy
+from canvas import build_elements
+from issue_graph import IssueGraph
+from issue_table import mark_dirty, normalize_df
+from jira_sync import creation_layers
+from layout import tree_layout
+from lod import DEFAULT_NODE_BUDGET, lod_frame
+from validation import DataValidator
+
+RESULTS_DIR = "bench-results"
+# A benchmark counts as regressed when its median time grew by more than this factor.
+REGRESSION_FACTOR = 1.2
+
+
+class Inputs:
+    """One synthetic table and what's derived from it, shared by the benchmarks of one size."""
+
+    def __init__(self, n, seed, **shape):
+        self.raw = synthetic_hierarchy(n, seed=seed, **shape)
+        self.df = normalize_df(self.raw)
+        self.graph = IssueGraph.from_frame(self.df)
+        roots = np.flatnonzero(self.graph.parent < 0)
+        self.root_id = self.graph.ids[roots[0]] if len(roots) else self.graph.ids[0]
+        self.positions = tree_layout(self.graph)
+
+
+def _edited(inputs):
+    """A copy of the table with one Summary and one Parent ID changed, as after a table edit."""
+    df = inputs.df.copy()
+    df.iat[len(df) // 2, df.columns.get_loc("Summary")] = "edited"
+    df.iat[len(df) // 3, df.columns.get_loc("Parent ID")] = ""
+    return mark_dirty(df)
+
+
+def _validate_edit(inputs):
+    validator = DataValidator()
+    validator.check(inputs.df, inputs.graph)
+    edited = normalize_df(_edited(inputs))
+    graph = IssueGraph.from_frame(edited)
+    return lambda: validator.check(edited, graph)
+
+
+# name -> prepare(inputs), which returns the call to measure. Preparation isn't timed.
+BENCHMARKS = {
+    "normalize_df": lambda i: lambda: normalize_df(i.raw),
+    "issue_graph": lambda i: lambda: IssueGraph.from_frame(i.df),
+    "descendant_ids": lambda i: lambda: i.graph.descendant_ids(i.root_id),
+    "find_data_issues": lambda i: lambda: DataValidator().check(i.df, i.graph),
+    "find_data_issues_after_edit": _validate_edit,
+    "tree_layout": lambda i: lambda: tree_layout(i.graph),
+    "lod_frame": lambda i: lambda: lod_frame(i.df, i.graph, DEFAULT_NODE_BUDGET),
+    "build_elements": lambda i: lambda: build_elements(i.df, i.graph, i.positions),
+    "creation_layers": lambda i: lambda: creation_layers(i.df),
+}
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(prepare, inputs, repeat):
+    """(run times in seconds, peak traced bytes) of one benchmark."""
+    times = []
+    for _ in range(repeat):
+        call = prepare(inputs)
+        started = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - started)
+    call = prepare(inputs)
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def run(sizes, names, repeat, seed, shape, log=print):
+    results = []
+    for n in sizes:
+        started = time.perf_counter()
+        inputs = Inputs(n, seed, **shape)
+        log(f"n={n:,}: generated in {time.perf_counter() - started:.2f}s")
+        for name in names:
+            times, peak = measure(BENCHMARKS[name], inputs, repeat)
+            result = {
+                "benchmark": name, "size": n, "median_s": statistics.median(times), "min_s": min(times),
+                "runs_s": times, "peak_bytes": peak,
+            }
+            results.append(result)
+            log(f"  {name:<28} median {result['median_s'] * 1000:10.2f} ms   peak {peak / 2 ** 20:9.1f} MiB")
+    return results
+
+
+def compare(results, baseline_path, factor=REGRESSION_FACTOR, log=print):
+    """Log each result's median against the same benchmark and size in an earlier run; returns
+    the (benchmark, size) pairs that got slower by more than `factor`."""
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r["size"]): r for r in json.load(f)["results"]}
+    regressed = []
+    log(f"Compared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["benchmark"], r["size"]))
+        if old is None:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        flag = "  REGRESSED" if ratio > factor else ""
+        log(f"  {r['benchmark']:<28} n={r['size']:<9,} {ratio:6.2f}x time  "
+            f"{r['peak_bytes'] / max(old['peak_bytes'], 1):6.2f}x peak{flag}")
+        if ratio > factor:
+            regressed.append((r["benchmark"], r["size"]))
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="issue counts to generate (10^3 to 10^6 is the intended range)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark and size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fanout", type=float, nargs=4, default=list(DEFAULT_FANOUT),
+                        metavar=("UC", "EPIC", "STORY", "TASK"), help="mean children per issue of each level")
+    parser.add_argument("--blocks", type=float, default=0.05, help="share of issues with Blocks references")
+    parser.add_argument("--relates", type=float, default=0.03, help="share of issues with Relates To references")
+    parser.add_argument("--cycles", type=int, default=5, help="parent cycles to inject")
+    parser.add_argument("--dangling", type=int, default=20, help="references to missing IDs to inject")
+    parser.add_argument("--output", help="results file (default: bench-results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"exit with status 1 if a median got more than {REGRESSION_FACTOR}x slower")
+    args = parser.parse_args(argv)
+
+    shape = {
+        "fanout": tuple(args.fanout), "blocks": args.blocks, "relates": args.relates,
+        "cycles": args.cycles, "dangling": args.dangling,
+    }
+    commit = _commit()
+    results = run(args.sizes, args.only or list(BENCHMARKS), args.repeat, args.seed, shape)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit, "created_at": time.time(), "python": platform.python_version(),
+            "pandas": pd.__version__, "numpy": np.__version__, "machine": platform.machine(),
+            "seed": args.seed, "repeat": args.repeat, "shape": shape, "results": results,
+        }, f, indent=1)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        regressed = compare(results, args.compare)
+        if regressed and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
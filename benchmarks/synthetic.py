@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from issue_table import ISSUE_COLUMNS, ISSUE_TYPES
+
+# Mean number of children per Use-Case, Epic, Story and Task (Sub-tasks have none).
+DEFAULT_FANOUT = (6.0, 8.0, 4.0, 2.0)
+_WORDS = np.array(
+    "login checkout search export import sync report billing profile invite audit cache upload "
+    "review admin dashboard alert schedule archive payment onboarding settings mobile api".split()
+)
+
+
+def _tree(n, fanout, rng):
+    """(parent index, depth) arrays of about n nodes, level by level, parents before children."""
+    subtree = 1.0
+    for mean in reversed(fanout):
+        subtree = 1 + mean * subtree
+    roots = max(1, math.ceil(n / subtree))
+    while True:
+        parents, depths = [np.full(roots, -1)], [np.zeros(roots, dtype=np.int64)]
+        current, total = np.arange(roots), roots
+        for depth, mean in enumerate(fanout, start=1):
+            if not len(current) or total >= n:
+                break
+            children = np.repeat(current, rng.poisson(mean, len(current)))
+            parents.append(children)
+            depths.append(np.full(len(children), depth))
+            current = np.arange(total, total + len(children))
+            total += len(children)
+        if total >= n:
+            return np.concatenate(parents)[:n], np.concatenate(depths)[:n]
+        roots = math.ceil(roots * n / max(total, 1)) + 1
+
+
+def _references(n, density, ids, rng):
+    """Comma-joined random IDs for a `density` share of n rows (one or two each), else ""."""
+    out = np.full(n, "", dtype=object)
+    rows = np.flatnonzero(rng.random(n) < density)
+    first = ids[rng.integers(0, n, len(rows))]
+    second = ids[rng.integers(0, n, len(rows))]
+    two = rng.random(len(rows)) < 0.25
+    out[rows] = np.where(two, first + "," + second, first)
+    return out
+
+
+def synthetic_hierarchy(n, seed=0, fanout=DEFAULT_FANOUT, blocks=0.05, relates=0.03, cycles=0, dangling=0,
+                        synced=0.5, project="BEN", shuffle=True):
+    """A reproducible issue table of n rows shaped like a real Use-Case → Sub-task hierarchy.
+
+    Every issue below Use-Case has a parent one level up, with a Poisson number of children per
+    level averaging `fanout`. `blocks` / `relates` are the shares of rows with Blocks / Relates
+    To references (to one or two random issues). `cycles` parent cycles and `dangling`
+    references to missing IDs are injected for the validator, and a `synced` share of rows
+    have a Jira Key. Rows come in random (shuffle) or breadth-first order, with raw string
+    columns as an upload would give them; run normalize_df before handing it to the app.
+    """
+    rng = np.random.default_rng(seed)
+    parent, depth = _tree(n, fanout, rng)
+    ids = np.array([f"{project}-{i + 1}" for i in range(n)], dtype=object)
+
+    for v in rng.choice(np.flatnonzero(depth >= 2), size=min(cycles, int((depth >= 2).sum())), replace=False):
+        # v's parent now hangs off v: both (and v's subtree) leave the tree in a 2-cycle.
+        parent[parent[v]] = v
+
+    parent_ids = np.where(parent >= 0, ids[np.maximum(parent, 0)], "")
+    block_refs = _references(n, blocks, ids, rng)
+    relates_refs = _references(n, relates, ids, rng)
+    for i, row in enumerate(rng.choice(n, size=min(dangling, n), replace=False)):
+        if i % 2:
+            block_refs[row] = f"{project}-MISSING-{i}"
+        else:
+            parent_ids[row] = f"{project}-MISSING-{i}"
+
+    levels = np.array(ISSUE_TYPES, dtype=object)[depth]
+    words = _WORDS[rng.integers(0, len(_WORDS), (n, 3))]
+    summaries = [f"{lvl}: {a} {b} {c}" for lvl, (a, b, c) in zip(levels, words)]
+    epic_names = np.where(levels == "Epic", [f"{w} epic" for w in words[:, 0]], "")
+    jira_keys = np.where(rng.random(n) < synced, ids, "")
+
+    df = pd.DataFrame({
+        "ID": ids, "Level": levels, "Summary": summaries, "Epic Name": epic_names,
+        "Parent ID": parent_ids, "Blocks": block_refs, "Relates To": relates_refs, "Jira Key": jira_keys,
+    }, columns=ISSUE_COLUMNS)
+    if shuffle:
+        df = df.iloc[rng.permutation(n)].reset_index(drop=True)
+    return df
@@ -0,0 +1,41 @@
+import os
+from collections import OrderedDict
+
+# Where caches that outlive the Streamlit session (Jira issues, schemas) are kept.
+CACHE_DIR = os.environ.get("MINDMAPP_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".mindmapp")
+
+
+class LRUCache:
+    """Small bounded mapping that evicts the least recently used entry and counts hits/misses."""
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,187 @@
+import base64
+import json
+import zlib
+
+import numpy as np
+
+from issue_graph import IssueGraph
+
+# Columns that affect what the canvas shows; anything else can change without a re-render.
+CANVAS_COLUMNS = ["ID", "Level", "Summary", "Parent ID", "Blocks", "Relates To", "Jira Key"]
+
+# Level of the aggregate nodes lod.lod_frame puts in place of folded subtrees.
+CLUSTER_LEVEL = "Cluster"
+# Frame attribute with {(relation, source ID, target ID): count} of edges standing for several
+# links, e.g. all the blocks between two folded subtrees.
+LINK_COUNTS_ATTR = "mindmapp_link_counts"
+
+COLOR_SHAPE = {
+    "Use-Case": {"color": "#1f77b4", "shape": "ellipse",         "w": 80, "h": 80},
+    "Epic":     {"color": "#2ca02c", "shape": "round-rectangle", "w": 70, "h": 70},
+    "Story":    {"color": "#ff7f0e", "shape": "diamond",         "w": 60, "h": 60},
+    "Task":     {"color": "#7f7f7f", "shape": "triangle",        "w": 50, "h": 50},
+    "Sub-task": {"color": "#9467bd", "shape": "hexagon",         "w": 40, "h": 40},
+}
+
+
+def build_elements(df, graph=None, positions=None):
+    """Cytoscape nodes for every row of df, then hierarchy, blocks and relates edges between them.
+
+    positions, an (x, y) pair of arrays in row order (see layout.tree_layout), pins each node
+    for the "preset" layout. Edges merged from several links (df.attrs[LINK_COUNTS_ATTR]) carry
+    their "count".
+    """
+    if graph is None:
+        graph = IssueGraph.from_frame(df)
+    ids = graph.ids
+    levels = df["Level"].astype(str).tolist()
+    jira_keys = df["Jira Key"].astype(str).tolist()
+    summaries = df["Summary"].astype(str).tolist()
+
+    elements = [
+        {
+            "data": {"id": node_id, "label": f"{jira_key or level}: {summary}"},
+            "classes": f"{level} {'synced' if jira_key else 'unsynced'}",
+        }
+        if level != CLUSTER_LEVEL else
+        {"data": {"id": node_id, "label": summary}, "classes": CLUSTER_LEVEL}
+        for node_id, level, summary, jira_key in zip(ids, levels, summaries, jira_keys)
+    ]
+    if positions is not None:
+        for node, x, y in zip(elements, positions[0].tolist(), positions[1].tolist()):
+            node["position"] = {"x": x, "y": y}
+
+    child = np.flatnonzero(graph.parent >= 0)
+    for src, dst, relation in (
+        (graph.parent[child], child, "hierarchy"),
+        (*graph.blocks_edges(), "blocks"),
+        (*graph.relates_edges(), "relates"),
+    ):
+        elements.extend(
+            {"data": {"id": f"{relation}:{s}->{t}", "source": s, "target": t, "relation": relation}}
+            for s, t in zip(ids[src], ids[dst])
+        )
+    link_counts = df.attrs.get(LINK_COUNTS_ATTR)
+    if link_counts:
+        for el in elements:
+            data = el["data"]
+            count = "source" in data and link_counts.get((data["relation"], data["source"], data["target"]))
+            if count:
+                data["count"] = count
+    return elements
+
+
+# Edge relations, in the order encode_elements numbers them.
+RELATIONS = ["hierarchy", "blocks", "relates"]
+# Encoded payloads at least this big are deflated and base64-encoded for the trip to the browser.
+COMPRESS_MIN_BYTES = 32 * 1024
+
+
+def encode_elements(elements, compress_min_bytes=COMPRESS_MIN_BYTES):
+    """build_elements output in the compact columnar form the canvas component decodes.
+
+    Node and edge-endpoint IDs are stored once, in `ids`; the first `n` are the nodes, whose
+    labels, class codes (into `classes`) and rounded positions follow as parallel lists. Edges
+    are `src` / `dst` indices into `ids` plus a `rel` code into RELATIONS, and `cnt` link counts
+    when any edge has one (0 for none); their IDs are rebuilt in the browser. Large payloads come back as {"z": base64 zlib of that JSON}.
+    """
+    nodes = [el for el in elements if "source" not in el["data"]]
+    edges = [el for el in elements if "source" in el["data"]]
+    ids = [node["data"]["id"] for node in nodes]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    classes = {}
+    payload = {
+        "ids": ids,
+        "n": len(nodes),
+        "labels": [node["data"]["label"] for node in nodes],
+        "cls": [classes.setdefault(node.get("classes", ""), len(classes)) for node in nodes],
+    }
+    payload["classes"] = list(classes)
+    if nodes and all("position" in node for node in nodes):
+        payload["x"] = [round(node["position"]["x"]) for node in nodes]
+        payload["y"] = [round(node["position"]["y"]) for node in nodes]
+
+    def endpoint(node_id):
+        if node_id not in index:
+            index[node_id] = len(ids)
+            ids.append(node_id)
+        return index[node_id]
+
+    relation_code = {relation: i for i, relation in enumerate(RELATIONS)}
+    payload["src"] = [endpoint(edge["data"]["source"]) for edge in edges]
+    payload["dst"] = [endpoint(edge["data"]["target"]) for edge in edges]
+    payload["rel"] = [relation_code[edge["data"]["relation"]] for edge in edges]
+    if any("count" in edge["data"] for edge in edges):
+        payload["cnt"] = [edge["data"].get("count", 0) for edge in edges]
+
+    text = json.dumps(payload, separators=(",", ":"))
+    if len(text) >= compress_min_bytes:
+        return {"z": base64.b64encode(zlib.compress(text.encode("utf-8"), 6)).decode("ascii")}
+    return payload
+
+
+STYLESHEET = [
+    {"selector": "node", "style": {"label": "data(label)", "color": "white",
+                                    "text-outline-color": "#000", "text-outline-width": 2,
+                                    "text-valign": "center", "text-halign": "center"}},
+    {"selector": ".unsynced", "style": {"border-width": 3, "border-style": "dashed", "border-color": "#ffbf00"}},
+]
+for lvl, spec in COLOR_SHAPE.items():
+    STYLESHEET.append({
+        "selector": f".{lvl}",
+        "style": {"background-color": spec["color"], "shape": spec["shape"],
+                  "width": spec["w"], "height": spec["h"]}
+    })
+STYLESHEET.append({
+    "selector": f".{CLUSTER_LEVEL}",
+    "style": {"background-color": "#e0e0e0", "shape": "round-rectangle", "width": 120, "height": 40,
+              "border-width": 2, "border-style": "double", "border-color": "#555",
+              "color": "#222", "text-outline-width": 0, "font-size": 11,
+              "text-wrap": "wrap", "text-max-width": 160}
+})
+STYLESHEET.append({
+    "selector": "edge[relation = 'hierarchy']",
+    "style": {"curve-style": "bezier", "target-arrow-shape": "triangle",
+              "line-color": "#999", "target-arrow-color": "#999"}
+})
+STYLESHEET.append({
+    "selector": "edge[relation = 'blocks']",
+    "style": {
+        "line-style": "dashed",
+        "line-color": "red",
+        "curve-style": "bezier",
+        "target-arrow-shape": "triangle",
+        "target-arrow-color": "red",
+        "arrow-scale": 1.5,
+        "label": "blocks",
+        "font-size": 10,
+        "color": "red",
+        "text-rotation": "autorotate",
+        "text-background-color": "white",
+        "text-background-opacity": 1,
+        "text-background-padding": "2px"
+    }
+})
+STYLESHEET.append({
+    "selector": "edge[relation = 'relates']",
+    "style": {
+        "line-style": "dotted",
+        "line-color": "#1f77b4",
+        "curve-style": "bezier",
+        "target-arrow-shape": "none",
+        "source-arrow-shape": "none",
+        "width": 2,
+        "label": "relates to",
+        "font-size": 10,
+        "color": "#1f77b4",
+        "text-rotation": "autorotate",
+        "text-background-color": "white",
+        "text-background-opacity": 1,
+        "text-background-padding": "2px"
+    }
+})
+STYLESHEET.append({
+    # Edges merged from several links between folded subtrees: labelled "<count> × blocks" etc.
+    "selector": "edge[count > 1]",
+    "style": {"label": "data(label)", "width": "mapData(count, 2, 50, 3, 8)"},
+})
@@ -0,0 +1,70 @@
+import json
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from canvas import STYLESHEET, encode_elements
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "canvas_frontend")
+_component = components.declare_component("mindmap_canvas", path=_FRONTEND_DIR)
+
+
+def _sent_key(key):
+    return f"{key}__sent"
+
+
+def mindmap_canvas(elements, key="mindmap_canvas", elements_key=None):
+    """Show elements in the canvas component, sending only what changed since the last render.
+
+    Elements travel in canvas.encode_elements' compact format: a full snapshot as "elements",
+    a delta as the new or changed elements ("upserted") plus the IDs of those "removed".
+
+    What the page was last sent is kept in session state. The page asks for a full snapshot
+    whenever it can't apply a delta (first load, reload, missed update), by bumping the
+    "resync" counter in the component value. elements_key, if given, identifies the element
+    list (e.g. the key it is cached under): while it stays the same the elements are taken as
+    unchanged and aren't serialized or compared at all.
+    """
+    sent = st.session_state.get(_sent_key(key))
+    value = st.session_state.get(key) or {}
+    same = sent is not None and elements_key is not None and sent["elements_key"] == elements_key
+    encoded = sent["elements"] if same else {el["data"]["id"]: json.dumps(el, sort_keys=True) for el in elements}
+
+    if sent is None or value.get("resync", 0) != sent["resync"]:
+        version = sent["version"] + 1 if sent else 1
+        args = {"full": True, "version": version, "elements": encode_elements(elements), "style": STYLESHEET}
+    else:
+        added, changed, removed = [], [], []
+        if not same:
+            old = sent["elements"]
+            for el in elements:
+                el_id = el["data"]["id"]
+                if el_id not in old:
+                    added.append(el)
+                elif old[el_id] != encoded[el_id]:
+                    changed.append(el)
+            removed = [el_id for el_id in old if el_id not in encoded]
+        version = sent["version"] + 1 if added or changed or removed else sent["version"]
+        args = {
+            "full": False, "base": sent["version"], "version": version,
+            "upserted": encode_elements(added + changed), "removed": removed,
+            # Mostly new content (e.g. another focus): re-centre instead of keeping the old view.
+            "refit": len(added) + len(removed) > len(elements) // 2,
+        }
+
+    st.session_state[_sent_key(key)] = {
+        "version": version, "elements": encoded, "elements_key": elements_key, "resync": value.get("resync", 0),
+        "click": sent["click"] if sent else value.get("click", 0),
+    }
+    _component(key=key, default=None, **args)
+
+
+def take_canvas_click(key="mindmap_canvas"):
+    """ID of the node clicked on the canvas since this was last called, or None."""
+    value = st.session_state.get(key) or {}
+    sent = st.session_state.get(_sent_key(key))
+    if sent is None or not value.get("click") or value["click"] == sent["click"]:
+        return None
+    sent["click"] = value["click"]
+    return value.get("clicked")
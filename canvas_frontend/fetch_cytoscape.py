@@ -0,0 +1,64 @@
+"""Vendor Cytoscape.js for the canvas component: its official ES module build, unmodified.
+
+    python canvas_frontend/fetch_cytoscape.py [--version 3.34.1]
+
+Downloads the cytoscape npm package, checks it against the integrity hash the npm registry
+publishes for it, and extracts dist/cytoscape.esm.min.mjs and LICENSE into
+canvas_frontend/vendor/. Commit both: the app itself never downloads anything, so the canvas
+works on air-gapped hosts. To upgrade, run it with the new version and commit the result.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import os
+import sys
+import tarfile
+
+import requests
+
+CYTOSCAPE_VERSION = "3.34.1"
+REGISTRY_URL = "https://registry.npmjs.org/cytoscape"
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor")
+# Package member -> file name in VENDOR_DIR.
+FILES = {
+    "package/dist/cytoscape.esm.min.mjs": "cytoscape.esm.min.mjs",
+    "package/LICENSE": "cytoscape.LICENSE",
+}
+
+
+def fetch(version=CYTOSCAPE_VERSION, dest=VENDOR_DIR, log=print):
+    r = requests.get(f"{REGISTRY_URL}/{version}", timeout=30)
+    r.raise_for_status()
+    dist = r.json()["dist"]
+    tarball = requests.get(dist["tarball"], timeout=120)
+    tarball.raise_for_status()
+
+    algorithm, _, expected = dist["integrity"].partition("-")
+    actual = base64.b64encode(hashlib.new(algorithm, tarball.content).digest()).decode("ascii")
+    if actual != expected:
+        raise ValueError(f"cytoscape {version} tarball doesn't match the registry's {algorithm} integrity hash")
+
+    os.makedirs(dest, exist_ok=True)
+    with tarfile.open(fileobj=io.BytesIO(tarball.content), mode="r:gz") as tar:
+        for member, name in FILES.items():
+            data = tar.extractfile(member).read()
+            with open(os.path.join(dest, name), "wb") as f:
+                f.write(data)
+            log(f"Wrote {os.path.join(dest, name)} ({len(data):,} bytes)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--version", default=CYTOSCAPE_VERSION, help="cytoscape release to vendor")
+    args = parser.parse_args(argv)
+    try:
+        fetch(args.version)
+    except (requests.RequestException, KeyError, ValueError, tarfile.TarError) as e:
+        print(f"Could not vendor cytoscape {args.version}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
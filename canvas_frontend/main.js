@@ -0,0 +1,126 @@
+// Mindmap canvas as a Streamlit component. The Cytoscape instance lives as long as the iframe,
+// so zoom and pan survive reruns; Python sends either a full snapshot or the elements upserted
+// and removed since the version this page last applied, both in canvas.encode_elements' format.
+// Cytoscape 3.34.1 as an ES module with a default export, vendored (see fetch_cytoscape.py).
+import cytoscape from "./vendor/cytoscape.esm.min.mjs";
+
+const FRAME_HEIGHT = 500;
+const RELATIONS = ["hierarchy", "blocks", "relates"];  // canvas.RELATIONS
+// Labels of edges standing for several links, after their count (see canvas.STYLESHEET).
+const LINK_LABELS = { blocks: "blocks", relates: "relates to" };
+let cy = null;
+let version = null;
+let clicks = 0;
+let resyncs = 0;
+let lastClicked = null;
+// Renders are applied one at a time, in order, although decoding may have to wait.
+let queue = Promise.resolve();
+
+function send(type, extra) {
+  window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, extra), "*");
+}
+
+function setValue() {
+  send("streamlit:setComponentValue", {
+    value: { clicked: lastClicked, click: clicks, resync: resyncs },
+    dataType: "json",
+  });
+}
+
+async function inflate(z) {
+  const bytes = Uint8Array.from(atob(z), function (c) { return c.charCodeAt(0); });
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+  return JSON.parse(await new Response(stream).text());
+}
+
+// Cytoscape element definitions from an encoded payload.
+async function decode(payload) {
+  const p = payload.z ? await inflate(payload.z) : payload;
+  const elements = [];
+  for (let i = 0; i < p.n; i++) {
+    const el = { group: "nodes", data: { id: p.ids[i], label: p.labels[i] }, classes: p.classes[p.cls[i]] };
+    if (p.x) {
+      el.position = { x: p.x[i], y: p.y[i] };
+    }
+    elements.push(el);
+  }
+  for (let i = 0; i < p.src.length; i++) {
+    const source = p.ids[p.src[i]];
+    const target = p.ids[p.dst[i]];
+    const relation = RELATIONS[p.rel[i]];
+    const data = { id: relation + ":" + source + "->" + target, source: source, target: target, relation: relation };
+    if (p.cnt && p.cnt[i]) {
+      data.count = p.cnt[i];
+      data.label = p.cnt[i] + " × " + LINK_LABELS[relation];
+    }
+    elements.push({ group: "edges", data: data });
+  }
+  return elements;
+}
+
+function init(args, elements) {
+  if (cy) {
+    cy.destroy();
+  }
+  cy = cytoscape({
+    container: document.getElementById("cy"),
+    elements: elements,
+    style: args.style,
+    layout: { name: "preset", fit: true, padding: 30 },
+  });
+  cy.on("tap", "node", function (evt) {
+    lastClicked = evt.target.id();
+    clicks += 1;
+    setValue();
+  });
+}
+
+function apply(args, upserted) {
+  cy.batch(function () {
+    args.removed.forEach(function (id) { cy.getElementById(id).remove(); });
+    const added = [];
+    upserted.forEach(function (el) {
+      const ele = cy.getElementById(el.data.id);
+      if (ele.empty()) {
+        added.push(el);
+        return;
+      }
+      // data() merges: clear first, so e.g. a merged edge's count goes once it's a single link.
+      ele.removeData();
+      ele.data(el.data);
+      ele.classes(el.classes || "");
+      if (el.position) {
+        ele.position(el.position);
+      }
+    });
+    cy.add(added);
+  });
+  if (args.refit) {
+    cy.fit(undefined, 30);
+  }
+}
+
+async function render(args) {
+  if (args.full) {
+    init(args, await decode(args.elements));
+    version = args.version;
+  } else if (cy && version === args.base) {
+    apply(args, await decode(args.upserted));
+    version = args.version;
+  } else if (version !== args.version) {
+    // This page missed an update (or was reloaded): ask Python for a full snapshot.
+    resyncs += 1;
+    setValue();
+  }
+}
+
+window.addEventListener("message", function (event) {
+  const msg = event.data;
+  if (!msg || msg.type !== "streamlit:render") {
+    return;
+  }
+  queue = queue.then(function () { return render(msg.args); }).catch(function (err) { console.error(err); });
+});
+
+send("streamlit:componentReady", { apiVersion: 1 });
+send("streamlit:setFrameHeight", { height: FRAME_HEIGHT });
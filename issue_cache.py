@@ -0,0 +1,104 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from caching import CACHE_DIR
+
+# v2 added the account column; the old file is simply no longer read.
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "issue_cache.v2.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    site TEXT NOT NULL,
+    account TEXT NOT NULL,
+    project TEXT NOT NULL,
+    jql TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (site, account, project, jql, key)
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    site TEXT NOT NULL,
+    account TEXT NOT NULL,
+    project TEXT NOT NULL,
+    jql TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (site, account, project, jql)
+);
+"""
+
+
+class IssueCache:
+    """Raw Jira issue payloads on disk, per (site, account, project, pull JQL), with the last sync time.
+
+    Scopes are per Jira account, so one user's pull never hands out issues another user's
+    permissions let them see.
+
+    A connection is opened per call, so one cache can be shared by Streamlit's script threads.
+    Issues are returned in the order they were first stored, which for a full pull is the
+    order of the JQL's ORDER BY.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def last_sync(self, site, account, project, jql):
+        """Epoch seconds at which the cached set was last brought up to date, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT synced_at FROM syncs WHERE site = ? AND account = ? AND project = ? AND jql = ?",
+                (site, account, project, jql),
+            ).fetchone()
+        return row[0] if row else None
+
+    def store(self, site, account, project, jql, issues, synced_at, replace=False):
+        """Upsert issues (all of them, if replace, dropping the old set) and record synced_at."""
+        scope = (site, account, project, jql)
+        with closing(self._connect()) as conn, conn:
+            if replace:
+                conn.execute("DELETE FROM issues WHERE site = ? AND account = ? AND project = ? AND jql = ?", scope)
+            conn.executemany(
+                "INSERT INTO issues (site, account, project, jql, key, payload) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (site, account, project, jql, key) DO UPDATE SET payload = excluded.payload",
+                ((*scope, issue["key"], json.dumps(issue, separators=(",", ":"))) for issue in issues),
+            )
+            conn.execute(
+                "INSERT INTO syncs (site, account, project, jql, synced_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (site, account, project, jql) DO UPDATE SET synced_at = excluded.synced_at",
+                (*scope, synced_at),
+            )
+
+    def issues(self, site, account, project, jql):
+        """Cached issue payloads of the scope, decoded one row at a time."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT payload FROM issues WHERE site = ? AND account = ? AND project = ? AND jql = ? ORDER BY rowid",
+                (site, account, project, jql),
+            )
+            for (payload,) in rows:
+                yield json.loads(payload)
+
+    def clear(self, site=None):
+        with closing(self._connect()) as conn, conn:
+            if site is None:
+                conn.execute("DELETE FROM issues")
+                conn.execute("DELETE FROM syncs")
+            else:
+                conn.execute("DELETE FROM issues WHERE site = ?", (site,))
+                conn.execute("DELETE FROM syncs WHERE site = ?", (site,))
+
+
+def open_issue_cache(path=DEFAULT_CACHE_PATH):
+    """IssueCache at path, or None when it can't be created (e.g. a read-only home directory)."""
+    try:
+        return IssueCache(path)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,181 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+GRAPH_COLUMNS = ["ID", "Parent ID", "Blocks", "Relates To"]
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def split_ids(value):
+    """Comma-separated ID list -> list of stripped, non-empty IDs."""
+    if isinstance(value, str) and not value:
+        return []
+    return [x.strip() for x in str(value).split(",") if x.strip()]
+
+
+def frame_fingerprint(df, columns=None):
+    """Cheap content hash of df (or just `columns` of it), sensitive to row order."""
+    if columns is not None:
+        df = df[columns]
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _csr(sources, targets, n):
+    """Group targets by source: returns (offsets, targets) with offsets of length n + 1."""
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+    return offsets, targets[order].astype(np.int64)
+
+
+def _gather(offsets, targets, nodes):
+    """Concatenated CSR neighbour lists of `nodes`, without a Python-level loop."""
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        return _EMPTY
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return targets[np.arange(total) + shift]
+
+
+class IssueGraph:
+    """Integer-coded Parent ID / Blocks / Relates To references of a normalized issue table.
+
+    Node codes are row positions in the table the graph was built from. References to IDs
+    that don't exist are left out of the edge arrays.
+    """
+
+    def __init__(self, ids, parent, child_offsets, children, blocks_offsets, blocks_targets,
+                 relates_offsets, relates_targets):
+        self.ids = ids
+        self.index = pd.Index(ids)
+        self.parent = parent
+        self.child_offsets = child_offsets
+        self.children = children
+        self.blocks_offsets = blocks_offsets
+        self.blocks_targets = blocks_targets
+        self.relates_offsets = relates_offsets
+        self.relates_targets = relates_targets
+
+    @classmethod
+    def from_frame(cls, df):
+        ids = df["ID"].astype(str).to_numpy(dtype=object)
+        n = len(ids)
+        index = pd.Index(ids)
+        if not index.is_unique:
+            raise ValueError("IssueGraph needs unique IDs; normalize the table first")
+
+        parent_ref = df["Parent ID"].astype(str).str.strip().to_numpy(dtype=object)
+        parent = index.get_indexer(parent_ref).astype(np.int64)
+        has_parent = parent_ref != ""
+        parent[~has_parent] = -1
+        has_child = parent >= 0
+        child_offsets, children = _csr(parent[has_child], np.flatnonzero(has_child), n)
+
+        rows = np.arange(n)
+        csr = []
+        for column in ("Blocks", "Relates To"):
+            refs = pd.Series(df[column].astype(str).to_numpy(dtype=object), index=rows).str.split(",").explode()
+            refs = refs.str.strip()
+            refs = refs[refs != ""]
+            src = refs.index.to_numpy(dtype=np.int64)
+            dst = index.get_indexer(refs.to_numpy(dtype=object))
+            ok = dst >= 0
+            csr.append(_csr(src[ok], dst[ok], n))
+
+        (blocks_offsets, blocks_targets), (relates_offsets, relates_targets) = csr
+        return cls(ids, parent, child_offsets, children, blocks_offsets, blocks_targets,
+                   relates_offsets, relates_targets)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def code(self, issue_id):
+        """Row position of issue_id, or -1 if it isn't in the graph."""
+        try:
+            return int(self.index.get_loc(issue_id))
+        except KeyError:
+            return -1
+
+    def subtree_rows(self, root_id):
+        """Sorted row positions of root_id and everything under it via Parent ID."""
+        root = self.code(root_id)
+        if root < 0:
+            return _EMPTY
+        seen = {root}
+        result = [np.array([root])]
+        frontier = result[0]
+        while len(frontier):
+            frontier = _gather(self.child_offsets, self.children, frontier)
+            # Only a parent cycle can lead back to an already visited node.
+            frontier = np.array([c for c in frontier.tolist() if c not in seen], dtype=np.int64)
+            seen.update(frontier.tolist())
+            result.append(frontier)
+        return np.sort(np.concatenate(result))
+
+    def children_of(self, codes):
+        """Codes of the direct children of `codes`, grouped by parent in the given order."""
+        return _gather(self.child_offsets, self.children, np.asarray(codes, dtype=np.int64))
+
+    def depth_levels(self):
+        """(codes per depth from the roots down, codes never reached from a root).
+
+        Each level lists children grouped by parent, in table order. The unreached codes are
+        the nodes in or under a parent cycle.
+        """
+        levels = []
+        frontier = np.flatnonzero(self.parent < 0)
+        seen = np.zeros(len(self), dtype=bool)
+        while len(frontier):
+            seen[frontier] = True
+            levels.append(frontier)
+            frontier = self.children_of(frontier)
+        return levels, np.flatnonzero(~seen)
+
+    def descendant_ids(self, root_id):
+        """IDs of root_id and everything under it via Parent ID."""
+        rows = self.subtree_rows(root_id)
+        return set(self.ids[rows]) if len(rows) else {root_id}
+
+    def blocks_edges(self):
+        """(source, target) code arrays of every resolvable Blocks reference, in table order."""
+        return np.repeat(np.arange(len(self)), np.diff(self.blocks_offsets)), self.blocks_targets
+
+    def relates_edges(self):
+        """(source, target) code arrays of Relates To references, each unordered pair once."""
+        src = np.repeat(np.arange(len(self)), np.diff(self.relates_offsets))
+        dst = self.relates_targets
+        pair = np.minimum(src, dst) * max(len(self), 1) + np.maximum(src, dst)
+        _, first = np.unique(pair, return_index=True)
+        keep = np.sort(first)
+        return src[keep], dst[keep]
+
+    def parent_cycles(self):
+        """Every Parent ID cycle once, as a list of codes closed by repeating its entry node.
+
+        One coloured walk over the parent pointers, so O(n) overall. Each cycle starts at
+        the node where the walk from the earliest row first entered it.
+        """
+        parent = self.parent.tolist()
+        state = [0] * len(parent)  # 0 = unvisited, 1 = on current path, 2 = done
+        cycles = []
+        for start in range(len(parent)):
+            if state[start]:
+                continue
+            path = []
+            cur = start
+            while cur >= 0 and not state[cur]:
+                state[cur] = 1
+                path.append(cur)
+                cur = parent[cur]
+            if cur >= 0 and state[cur] == 1:
+                cycles.append(path[path.index(cur):] + [cur])
+            for node in path:
+                state[node] = 2
+        return cycles
@@ -0,0 +1,43 @@
+import pandas as pd
+
+ISSUE_TYPES = ["Use-Case", "Epic", "Story", "Task", "Sub-task"]
+ISSUE_COLUMNS = ["ID", "Level", "Summary", "Epic Name", "Parent ID", "Blocks", "Relates To", "Jira Key"]
+
+# Set in df.attrs on frames normalize_df returned. pandas carries attrs through copies and
+# row filters, so code that edits cells in place must either keep values normalized or
+# call mark_dirty().
+NORMALIZED_ATTR = "mindmapp_normalized"
+
+
+def mark_dirty(df):
+    df.attrs.pop(NORMALIZED_ATTR, None)
+    return df
+
+
+def _clean(col):
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype(object)
+    return col.fillna("").astype(str).str.strip()
+
+
+def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Ensure consistent formatting of dataframe.
+
+    Rows without an ID or with a repeated one are dropped, then every column is blanked and
+    stripped in place, missing ones are added blank and Level becomes a categorical over
+    ISSUE_TYPES (plus any unknown types present). Already-normalized frames are returned as is.
+    """
+    if df.attrs.get(NORMALIZED_ATTR):
+        return df
+    ids = _clean(df["ID"])
+    keep = ((ids != "") & ~ids.duplicated()).to_numpy()
+    out = df[keep].copy()
+    for c in ISSUE_COLUMNS:
+        if c not in out.columns:
+            out[c] = ""
+    for c in out.columns:
+        out[c] = ids[keep] if c == "ID" else _clean(out[c])
+    extra = [lvl for lvl in out["Level"].unique() if lvl not in ISSUE_TYPES]
+    out["Level"] = pd.Categorical(out["Level"], categories=ISSUE_TYPES + extra)
+    out.attrs[NORMALIZED_ATTR] = True
+    return out
@@ -1,23 +1,221 @@
+import bisect
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from email.utils import parsedate_to_datetime
+
 import requests
+from requests.adapters import HTTPAdapter
+
+# Jira's issue/bulk endpoint accepts at most this many issues per request.
+BULK_CREATE_LIMIT = 50
+
+# Transport defaults. The pool is sized for the largest push concurrency the sidebar allows.
+DEFAULT_POOL_SIZE = 32
+DEFAULT_RATE_LIMIT = 10.0   # requests per second, client-wide
+DEFAULT_BURST = 20
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5          # seconds; doubled on every retry, with full jitter
+BACKOFF_CAP = 30.0
+MAX_RETRY_AFTER = 120.0
+
+SEARCH_FIELDS = ["summary", "issuetype", "parent", "issuelinks"]
+# Offset-paged searches keep this many pages in flight once the total is known.
+SEARCH_PREFETCH = 4
+
+# 429 and 503 mean Jira turned the request away before acting on it, so any method may be
+# retried. Other gateway errors and dropped connections may hide a request that did go
+# through, so those are only retried when repeating it is harmless.
+THROTTLE_STATUSES = {429, 503}
+TRANSIENT_STATUSES = {500, 502, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Upper bounds (seconds) of the per-endpoint latency histogram buckets; the last is open-ended.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+# Field and link-type catalogs change rarely; this is how long a fetched copy is reused.
+SCHEMA_TTL = 3600
+
+_catalog_memory = {}  # base URL -> catalogs, see JiraClient.catalogs
+_catalog_lock = threading.Lock()
 
 
 class JiraError(Exception):
     pass
 
 
+def endpoint_name(method, path):
+    """Method and path with issue keys and IDs replaced by {id}, e.g. "PUT issue/{id}"."""
+    parts = ["{id}" if any(c.isdigit() for c in part) else part for part in path.strip("/").split("/")]
+    return f"{method.upper()} {'/'.join(parts)}"
+
+
+def _histogram_quantile(histogram, q):
+    """Upper bound of the LATENCY_BUCKETS bucket holding the q-quantile (the largest finite one
+    for the last bucket)."""
+    total = sum(histogram)
+    if not total:
+        return None
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram):
+        seen += count
+        if seen >= q * total:
+            return bound if bound != float("inf") else LATENCY_BUCKETS[-2]
+    return LATENCY_BUCKETS[-2]
+
+
+class RequestMetrics:
+    """Per-endpoint counts, latency histogram and bytes of every HTTP attempt a client makes.
+
+    Thread-safe, and may be shared by several clients, e.g. all those of one app session.
+    Retried attempts count separately; errors are responses of 400 and up, or no response.
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, status, sent=0, received=0):
+        with self._lock:
+            e = self._endpoints.get(endpoint)
+            if e is None:
+                e = self._endpoints[endpoint] = {
+                    "requests": 0, "errors": 0, "throttled": 0, "seconds": 0.0, "max_seconds": 0.0,
+                    "bytes_sent": 0, "bytes_received": 0, "histogram": [0] * len(LATENCY_BUCKETS),
+                }
+            e["requests"] += 1
+            e["errors"] += status is None or status >= 400
+            e["throttled"] += status in THROTTLE_STATUSES
+            e["seconds"] += seconds
+            e["max_seconds"] = max(e["max_seconds"], seconds)
+            e["bytes_sent"] += sent
+            e["bytes_received"] += received
+            e["histogram"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def snapshot(self):
+        """{endpoint: counters}, each with approximate p50 / p95 latencies from its histogram."""
+        with self._lock:
+            endpoints = {name: dict(e, histogram=list(e["histogram"])) for name, e in self._endpoints.items()}
+        for e in endpoints.values():
+            e["p50"] = _histogram_quantile(e["histogram"], 0.5)
+            e["p95"] = _histogram_quantile(e["histogram"], 0.95)
+        return endpoints
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def _retry_after(response):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), or None."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def _received_bytes(response):
+    """Size of the response body as sent over the wire: its Content-Length (compressed, if
+    gzip'd), else the decoded body for chunked responses without one."""
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return len(response.content)
+
+
+def _read_catalogs(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) and "fetched_at" in data else None
+
+
+def _write_catalogs(path, catalogs):
+    # Written to a temp file and renamed, so a concurrent reader never sees half a file.
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(catalogs, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
 class JiraClient:
     """Thin wrapper around the Jira REST API for a user-supplied site."""
 
     def __init__(self, base_url, auth_mode="cloud", email=None, api_token=None,
-                 username=None, password=None, api_version="3", timeout=20):
+                 username=None, password=None, api_version="3", timeout=20,
+                 pool_size=DEFAULT_POOL_SIZE, rate_limit=DEFAULT_RATE_LIMIT, burst=DEFAULT_BURST,
+                 max_retries=MAX_RETRIES, schema_cache_dir=None, metrics=None):
         if not base_url:
             raise JiraError("Jira base URL is required")
         self.base_url = base_url.rstrip("/")
         self.rest = f"{self.base_url}/rest/api/{api_version}"
+        # Cloud's v3 API has cursor-paged search/jql; a 404 from it switches to offsets for good.
+        self.search_mode = "token" if str(api_version) == "3" else "offset"
         self.timeout = timeout
+        self.max_retries = max_retries
+        self.schema_cache_dir = schema_cache_dir
+        self.limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "throttle_wait": 0.0, "backoff_wait": 0.0}
+        self._stats_lock = threading.Lock()
+        self.metrics = metrics if metrics is not None else RequestMetrics()
 
         self.session = requests.Session()
-        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+        # One pool per host, large enough that concurrent pushes don't open and drop connections.
+        # Retries are handled in _request, which knows about Retry-After and the rate limiter.
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Search and field listings compress well; requests decodes gzip/deflate bodies itself.
+        self.session.headers.update({
+            "Accept": "application/json", "Content-Type": "application/json", "Accept-Encoding": "gzip, deflate",
+        })
         if auth_mode == "cloud":
             if not email or not api_token:
                 raise JiraError("Email and API token are required for Jira Cloud auth")
@@ -29,55 +227,207 @@ class JiraClient:
         else:
             raise JiraError(f"Unknown auth_mode: {auth_mode}")
 
-    def _request(self, method, path, **kwargs):
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for name, value in deltas.items():
+                self._stats[name] += value
+
+    def transport_stats(self):
+        """Counters since the client was created: requests sent, retries, throttled responses
+        (429/503), and seconds spent waiting on the rate limiter or Retry-After (throttle_wait)
+        versus backing off from other failures (backoff_wait)."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def endpoint_stats(self):
+        """Per-endpoint request metrics; see RequestMetrics.snapshot."""
+        return self.metrics.snapshot()
+
+    def _request(self, method, path, ok_statuses=(), idempotent=None, **kwargs):
+        """Send a request, retrying throttled and transient failures with jittered backoff.
+
+        idempotent overrides whether the method is safe to repeat after a 5xx or a dropped
+        connection, e.g. for read-only POSTs.
+        """
         url = f"{self.rest}/{path.lstrip('/')}"
-        try:
-            r = self.session.request(method, url, timeout=self.timeout, **kwargs)
-        except requests.RequestException as e:
-            raise JiraError(f"Could not reach {url}: {e}") from e
-        if r.status_code >= 400:
+        endpoint = endpoint_name(method, path)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                waited = self.limiter.acquire()
+                if waited:
+                    self._count(throttle_wait=waited)
+            self._count(requests=1)
+            started = time.perf_counter()
+            try:
+                r = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.record(endpoint, time.perf_counter() - started, None)
+                if not idempotent or attempt >= self.max_retries:
+                    raise JiraError(f"Could not reach {url}: {e}") from e
+                r = None
+            status = r.status_code if r is not None else None
+            if r is not None:
+                self.metrics.record(
+                    endpoint, time.perf_counter() - started, status,
+                    sent=len(r.request.body or b""), received=_received_bytes(r),
+                )
+
+            throttled = status in THROTTLE_STATUSES and status not in ok_statuses
+            transient = r is None or (status in TRANSIENT_STATUSES and idempotent and status not in ok_statuses)
+            if not (throttled or transient) or attempt >= self.max_retries:
+                break
+
+            attempt += 1
+            delay = _retry_after(r)
+            if delay is None:
+                delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+            if throttled:
+                self._count(retries=1, throttled=1, throttle_wait=delay)
+            else:
+                self._count(retries=1, backoff_wait=delay)
+            time.sleep(delay)
+
+        if r.status_code >= 400 and r.status_code not in ok_statuses:
             raise JiraError(f"{method} {path} failed ({r.status_code}): {r.text[:500]}")
         return r
 
     def test_connection(self):
         return self._request("GET", "myself").json()
 
-    def field_id_by_name(self, name):
+    def account_id(self):
+        """ID of the account the credentials authenticate as (Cloud accountId, Server user key).
+
+        Makes an authenticated request, so it also proves the credentials are still valid.
+        """
+        me = self.test_connection()
+        account = me.get("accountId") or me.get("key") or me.get("name")
+        if not account:
+            raise JiraError("Jira did not say which account these credentials belong to")
+        return str(account)
+
+    def catalogs(self, refresh=False):
+        """{"fields": {lowercase name: field ID}, "link_types": {lowercase name: name}} of the site.
+
+        Both catalogs are fetched in one go and shared by every client of the same base URL for
+        SCHEMA_TTL seconds, in memory and, if the client has a schema_cache_dir, on disk.
+        """
+        now = time.time()
+        if not refresh:
+            with _catalog_lock:
+                cached = _catalog_memory.get(self.base_url)
+            if cached is None and self.schema_cache_dir:
+                cached = _read_catalogs(self._catalog_path())
+            if cached is not None and now - cached["fetched_at"] < SCHEMA_TTL:
+                with _catalog_lock:
+                    _catalog_memory[self.base_url] = cached
+                return cached
+
+        fields = {}
         for f in self._request("GET", "field").json():
-            if f.get("name", "").lower() == name.lower():
-                return f["id"]
-        return None
+            # First match wins, as the per-name lookups this replaces returned the first hit.
+            fields.setdefault(f.get("name", "").lower(), f["id"])
+        link_types = {}
+        for lt in self._request("GET", "issueLinkType").json().get("issueLinkTypes", []):
+            link_types.setdefault(lt.get("name", "").lower(), lt["name"])
+        cached = {"fetched_at": now, "fields": fields, "link_types": link_types}
+        with _catalog_lock:
+            _catalog_memory[self.base_url] = cached
+        if self.schema_cache_dir:
+            _write_catalogs(self._catalog_path(), cached)
+        return cached
+
+    def _catalog_path(self):
+        name = hashlib.blake2b(self.base_url.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.schema_cache_dir, f"catalogs-{name}.json")
+
+    def field_id_by_name(self, name):
+        return self.catalogs()["fields"].get(name.lower())
 
     def link_type_name(self, name):
-        types = self._request("GET", "issueLinkType").json().get("issueLinkTypes", [])
-        for lt in types:
-            if lt.get("name", "").lower() == name.lower():
-                return lt["name"]
-        return None
+        return self.catalogs()["link_types"].get(name.lower())
 
-    def discover_schema(self):
+    def discover_schema(self, refresh=False):
+        catalogs = self.catalogs(refresh=refresh)
         return {
-            "epic_name_field": self.field_id_by_name("Epic Name"),
-            "epic_link_field": self.field_id_by_name("Epic Link"),
-            "blocks_link_type": self.link_type_name("Blocks"),
-            "relates_link_type": self.link_type_name("Relates"),
+            "epic_name_field": catalogs["fields"].get("epic name"),
+            "epic_link_field": catalogs["fields"].get("epic link"),
+            "blocks_link_type": catalogs["link_types"].get("blocks"),
+            "relates_link_type": catalogs["link_types"].get("relates"),
         }
 
-    def search_issues(self, jql, max_results=500, page_size=100):
-        fields = "summary,issuetype,parent,issuelinks"
-        issues = []
-        start_at = 0
-        while len(issues) < max_results:
-            params = {"jql": jql, "startAt": start_at, "maxResults": page_size, "fields": fields}
-            data = self._request("GET", "search", params=params).json()
-            batch = data.get("issues", [])
-            issues.extend(batch)
-            start_at += len(batch)
-            if not batch or start_at >= data.get("total", 0):
-                break
-        return issues[:max_results]
+    def iter_issues(self, jql, max_results=None, page_size=100, prefetch=SEARCH_PREFETCH):
+        """Issues matching jql, yielded page by page as they arrive.
 
-    def create_issue(self, project_key, issue_type, summary, extra_fields=None):
+        The JQL goes in a POST body, so long key lists aren't limited by URL length. Sites that
+        have the search/jql endpoint are paged with its nextPageToken cursor (one page at a time,
+        as each token comes from the previous page); older ones fall back to startAt offsets,
+        fetching up to `prefetch` pages ahead once the first page reports the total.
+        """
+        if max_results is not None and max_results <= 0:
+            return
+        pages = self._token_pages if self.search_mode == "token" else self._offset_pages
+        count = 0
+        for batch in pages(jql, page_size, max_results, prefetch):
+            if max_results is not None and count + len(batch) >= max_results:
+                yield from batch[:max_results - count]
+                return
+            count += len(batch)
+            yield from batch
+
+    def search_issues(self, jql, max_results=None, page_size=100):
+        return list(self.iter_issues(jql, max_results=max_results, page_size=page_size))
+
+    def _token_pages(self, jql, page_size, max_results, prefetch):
+        body = {"jql": jql, "fields": SEARCH_FIELDS, "maxResults": page_size}
+        while True:
+            r = self._request("POST", "search/jql", ok_statuses=(404,), idempotent=True, json=body)
+            if r.status_code == 404:
+                # Server / Data Center, or an older Cloud API: only the offset endpoint exists.
+                self.search_mode = "offset"
+                yield from self._offset_pages(jql, page_size, max_results, prefetch)
+                return
+            data = r.json()
+            yield data.get("issues", [])
+            token = data.get("nextPageToken")
+            if not token or data.get("isLast"):
+                return
+            body = {**body, "nextPageToken": token}
+
+    def _offset_page(self, jql, start_at, page_size):
+        body = {"jql": jql, "startAt": start_at, "maxResults": page_size, "fields": SEARCH_FIELDS}
+        return self._request("POST", "search", idempotent=True, json=body).json()
+
+    def _offset_pages(self, jql, page_size, max_results, prefetch):
+        first = self._offset_page(jql, 0, page_size)
+        batch = first.get("issues", [])
+        yield batch
+        total = first.get("total", 0)
+        if max_results is not None:
+            total = min(total, max_results)
+        # Jira may serve fewer issues per page than asked for; step by what it actually returned.
+        step = len(batch)
+        if not step or step >= total:
+            return
+
+        offsets = iter(range(step, total, step))
+        with ThreadPoolExecutor(max_workers=max(1, prefetch)) as pool:
+            pending = deque(pool.submit(self._offset_page, jql, start, step)
+                            for start in islice(offsets, max(1, prefetch)))
+            while pending:
+                data = pending.popleft().result()
+                start = next(offsets, None)
+                if start is not None:
+                    pending.append(pool.submit(self._offset_page, jql, start, step))
+                batch = data.get("issues", [])
+                if not batch:
+                    return
+                yield batch
+
+    @staticmethod
+    def _issue_fields(project_key, issue_type, summary, extra_fields=None):
         fields = {
             "project": {"key": project_key},
             "issuetype": {"name": issue_type},
@@ -85,15 +435,72 @@ class JiraClient:
         }
         if extra_fields:
             fields.update(extra_fields)
+        return fields
+
+    def create_issue(self, project_key, issue_type, summary, extra_fields=None):
+        fields = self._issue_fields(project_key, issue_type, summary, extra_fields)
         return self._request("POST", "issue", json={"fields": fields}).json()["key"]
 
+    def create_issues_bulk(self, project_key, issues, batch_size=BULK_CREATE_LIMIT):
+        """Create issues through issue/bulk, batch_size per request.
+
+        issues is a list of (local_id, issue_type, summary, extra_fields). Returns (keys, errors),
+        mapping each local_id to its new Jira key or to the reason Jira rejected it.
+        """
+        keys, errors = {}, {}
+        for start in range(0, len(issues), batch_size):
+            batch = issues[start:start + batch_size]
+            payload = {"issueUpdates": [
+                {"fields": self._issue_fields(project_key, issue_type, summary, extra)}
+                for _, issue_type, summary, extra in batch
+            ]}
+            try:
+                # Jira answers 400 when every element failed; the body still has the per-element errors.
+                r = self._request("POST", "issue/bulk", ok_statuses=(400,), json=payload)
+                data = r.json()
+            except (JiraError, ValueError) as e:
+                errors.update((local_id, str(e)) for local_id, *_ in batch)
+                continue
+
+            failed = {}
+            for err in data.get("errors", []):
+                element = err.get("elementErrors", {})
+                messages = list(element.get("errorMessages", []))
+                messages += [f"{field}: {msg}" for field, msg in element.get("errors", {}).items()]
+                failed[err.get("failedElementNumber")] = "; ".join(messages) or f"failed ({err.get('status')})"
+            if r.status_code >= 400 and not failed:
+                errors.update((local_id, f"POST issue/bulk failed ({r.status_code}): {r.text[:500]}") for local_id, *_ in batch)
+                continue
+
+            # Created issues come back in request order, skipping the failed elements.
+            created = iter(data.get("issues", []))
+            for n, (local_id, *_) in enumerate(batch):
+                if n in failed:
+                    errors[local_id] = failed[n]
+                    continue
+                issue = next(created, None)
+                if issue is None:
+                    errors[local_id] = "no key returned by issue/bulk"
+                else:
+                    keys[local_id] = issue["key"]
+        return keys, errors
+
     def update_issue_summary(self, key, summary):
-        self._request("PUT", f"issue/{key}", json={"fields": {"summary": summary}})
+        self.update_issue_fields(key, {"summary": summary})
+
+    def update_issue_fields(self, key, fields):
+        self._request("PUT", f"issue/{key}", json={"fields": fields})
 
     def create_link(self, outward_key, inward_key, link_type_name):
+        """Link two issues; returns the new link's ID when Jira reports it (Location header), else None."""
         payload = {
             "type": {"name": link_type_name},
             "outwardIssue": {"key": outward_key},
             "inwardIssue": {"key": inward_key},
         }
-        self._request("POST", "issueLink", json=payload)
+        r = self._request("POST", "issueLink", json=payload)
+        location = r.headers.get("Location", "").rstrip("/")
+        return location.rsplit("/", 1)[-1] if location else None
+
+    def delete_link(self, link_id):
+        self._request("DELETE", f"issueLink/{link_id}")
@@ -0,0 +1,350 @@
+"""A local stand-in for the parts of the Jira REST API that JiraClient uses.
+
+Run it on its own to point the app at it (any credentials are accepted):
+
+    python jira_stub.py --issues 5000 --latency 0.05 --throttle-rate 0.02
+
+or start it in-process, e.g. to count the requests a pull makes:
+
+    with StubJira(latency=0.02) as stub:
+        stub.seed_from_frame(df)
+        client = JiraClient(stub.url, email="x", api_token="x")
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+EPIC_NAME_FIELD = "customfield_10011"
+EPIC_LINK_FIELD = "customfield_10014"
+FIELDS = [
+    {"id": "summary", "name": "Summary"},
+    {"id": "issuetype", "name": "Issue Type"},
+    {"id": "parent", "name": "Parent"},
+    {"id": EPIC_NAME_FIELD, "name": "Epic Name"},
+    {"id": EPIC_LINK_FIELD, "name": "Epic Link"},
+]
+LINK_TYPES = [
+    {"id": "10000", "name": "Blocks", "inward": "is blocked by", "outward": "blocks"},
+    {"id": "10003", "name": "Relates", "inward": "relates to", "outward": "relates to"},
+]
+
+_KEYS_IN = re.compile(r'(parent|"Epic Link")\s+in\s*\(([^)]*)\)', re.IGNORECASE)
+_KEY_EQUALS = re.compile(r'\bkey\s*=\s*"?([A-Za-z][A-Za-z0-9_]*-\d+)"?', re.IGNORECASE)
+_PROJECT = re.compile(r'\bproject\s*=\s*"?([A-Za-z][A-Za-z0-9_]*)"?', re.IGNORECASE)
+_UPDATED = re.compile(r'\bupdated\s*>=\s*"-(\d+)m"', re.IGNORECASE)
+
+
+class StubJira:
+    """In-memory Jira served over HTTP on localhost, with injectable latency and failures.
+
+    Every request first sleeps `latency` seconds (plus up to `jitter`), then fails with a 429
+    (and Retry-After: `retry_after`) with probability `throttle_rate`, or a 500 with
+    probability `error_rate`. search_api="offset" answers search/jql with 404, like Jira
+    Server. Search understands the JQL shapes Mindmapp sends: project =, key =, parent /
+    "Epic Link" in (...), updated >= "-Nm", combined with AND / OR as Mindmapp combines them.
+    `requests` logs (method, path, status) of everything served.
+    """
+
+    def __init__(self, project="STUB", latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=1, search_api="token", seed=0, port=0):
+        self.project = project
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.search_api = search_api
+        self.port = port
+        self.issues = {}  # key -> issue, in creation order
+        self.links = {}   # link ID -> (type name, outward key, inward key)
+        self.requests = []
+        self._updated = {}  # key -> epoch seconds
+        self._matches = {}  # JQL -> matching keys, until the next change; pages re-run the same JQL
+        self._numbers = itertools.count(1)
+        self._link_ids = itertools.count(20001)
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._server = None
+
+    # ----------------------------
+    # Data
+    # ----------------------------
+    def add_issue(self, summary, issue_type="Story", parent=None, key=None, fields=None, project=None):
+        """Store an issue (keyed <project>-<next number> unless key is given) and return its key."""
+        with self._lock:
+            number = next(self._numbers)
+            key = key or f"{project or self.project}-{number}"
+            issue_fields = {
+                "summary": summary, "issuetype": {"name": issue_type},
+                "parent": {"key": parent} if parent else None, "issuelinks": [],
+            }
+            issue_fields.update(fields or {})
+            self.issues[key] = {"id": str(10000 + number), "key": key, "fields": issue_fields}
+            self._touch(key)
+            return key
+
+    def add_link(self, type_name, outward_key, inward_key):
+        """Link outward_key → inward_key (e.g. outward blocks inward) and return the link ID."""
+        with self._lock:
+            link_id = str(next(self._link_ids))
+            link_type = next(lt for lt in LINK_TYPES if lt["name"].lower() == type_name.lower())
+            self.links[link_id] = (link_type["name"], outward_key, inward_key)
+            kind = {"name": link_type["name"], "inward": link_type["inward"], "outward": link_type["outward"]}
+            if outward_key in self.issues:
+                self.issues[outward_key]["fields"]["issuelinks"].append(
+                    {"id": link_id, "type": kind, "outwardIssue": {"key": inward_key}})
+                self._touch(outward_key)
+            if inward_key in self.issues:
+                self.issues[inward_key]["fields"]["issuelinks"].append(
+                    {"id": link_id, "type": kind, "inwardIssue": {"key": outward_key}})
+                self._touch(inward_key)
+            return link_id
+
+    def remove_link(self, link_id):
+        with self._lock:
+            if self.links.pop(link_id, None) is None:
+                return False
+            for key, issue in self.issues.items():
+                links = issue["fields"]["issuelinks"]
+                kept = [link for link in links if link["id"] != link_id]
+                if len(kept) != len(links):
+                    issue["fields"]["issuelinks"] = kept
+                    self._touch(key)
+            return True
+
+    def seed_from_frame(self, df):
+        """Load an issue table (e.g. benchmarks.synthetic.synthetic_hierarchy) as existing issues,
+        keyed by their IDs, with Epic Name, parents and Blocks / Relates To links."""
+        with self._lock:
+            for row in df.itertuples(index=False):
+                fields = {EPIC_NAME_FIELD: row[3]} if row[3] else {}
+                self.add_issue(row[2], row[1], parent=row[4] or None, key=row[0], fields=fields)
+            for row in df.itertuples(index=False):
+                for ref in filter(None, (r.strip() for r in row[5].split(","))):
+                    self.add_link("Blocks", row[0], ref)
+                for ref in filter(None, (r.strip() for r in row[6].split(","))):
+                    self.add_link("Relates", row[0], ref)
+
+    def _touch(self, key):
+        self._matches.clear()
+        self._updated[key] = time.time()
+        if key in self.issues:
+            stamp = datetime.fromtimestamp(self._updated[key], timezone.utc)
+            self.issues[key]["fields"]["updated"] = stamp.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+    # ----------------------------
+    # Search
+    # ----------------------------
+    def _match(self, jql):
+        """Keys matching the supported JQL subset, in creation order."""
+        with self._lock:
+            if jql not in self._matches:
+                self._matches[jql] = self._evaluate(jql)
+            return self._matches[jql]
+
+    def _evaluate(self, jql):
+        """Keys matching jql; called with the lock held."""
+        where = re.split(r"\border\s+by\b", jql, flags=re.IGNORECASE)[0]
+        keys = list(self.issues)
+        key = _KEY_EQUALS.search(where)
+        if key:
+            return [key.group(1)] if key.group(1) in self.issues else []
+        project = _PROJECT.search(where)
+        if project:
+            keys = [k for k in keys if k.startswith(project.group(1) + "-")]
+        parents = set()
+        for _, keys_clause in _KEYS_IN.findall(where):
+            parents.update(k.strip().strip('"') for k in keys_clause.split(","))
+        if parents:
+            keys = [
+                k for k in keys
+                if (self.issues[k]["fields"].get("parent") or {}).get("key") in parents
+                or self.issues[k]["fields"].get(EPIC_LINK_FIELD) in parents
+            ]
+        updated = _UPDATED.search(where)
+        if updated:
+            cutoff = time.time() - int(updated.group(1)) * 60
+            keys = [k for k in keys if self._updated[k] >= cutoff]
+        return keys
+
+    def _page(self, keys, start, size):
+        with self._lock:
+            return [json.loads(json.dumps(self.issues[k])) for k in keys[start:start + size]]
+
+    # ----------------------------
+    # HTTP
+    # ----------------------------
+    def _handle(self, method, path, body):
+        """(status, JSON body, extra headers) of one API call."""
+        if method == "GET" and path == "myself":
+            return 200, {"accountId": "stub", "displayName": "Stub Jira User"}, {}
+        if method == "GET" and path == "field":
+            return 200, FIELDS, {}
+        if method == "GET" and path == "issueLinkType":
+            return 200, {"issueLinkTypes": LINK_TYPES}, {}
+
+        if method == "POST" and path == "search/jql":
+            if self.search_api != "token":
+                return 404, {"errorMessages": ["Not found"]}, {}
+            keys = self._match(body.get("jql", ""))
+            start = int(body.get("nextPageToken") or 0)
+            size = int(body.get("maxResults", 50))
+            data = {"issues": self._page(keys, start, size), "isLast": start + size >= len(keys)}
+            if not data["isLast"]:
+                data["nextPageToken"] = str(start + size)
+            return 200, data, {}
+        if method == "POST" and path == "search":
+            keys = self._match(body.get("jql", ""))
+            start, size = int(body.get("startAt", 0)), int(body.get("maxResults", 50))
+            return 200, {"startAt": start, "maxResults": size, "total": len(keys),
+                         "issues": self._page(keys, start, size)}, {}
+
+        if method == "POST" and path == "issue":
+            key = self._create(body.get("fields", {}))
+            return 201, {"id": self.issues[key]["id"], "key": key}, {}
+        if method == "POST" and path == "issue/bulk":
+            created, errors = [], []
+            for n, update in enumerate(body.get("issueUpdates", [])):
+                if not update.get("fields", {}).get("summary"):
+                    errors.append({"status": 400, "failedElementNumber": n,
+                                   "elementErrors": {"errors": {"summary": "You must specify a summary."}}})
+                    continue
+                key = self._create(update["fields"])
+                created.append({"id": self.issues[key]["id"], "key": key})
+            return (201 if created or not errors else 400), {"issues": created, "errors": errors}, {}
+        if method == "PUT" and path.startswith("issue/"):
+            key = path.split("/", 1)[1]
+            with self._lock:
+                if key not in self.issues:
+                    return 404, {"errorMessages": ["Issue does not exist"]}, {}
+                self.issues[key]["fields"].update(body.get("fields", {}))
+                self._touch(key)
+            return 204, None, {}
+
+        if method == "POST" and path == "issueLink":
+            link_id = self.add_link(body["type"]["name"], body["outwardIssue"]["key"], body["inwardIssue"]["key"])
+            return 201, None, {"Location": f"{self.url}/rest/api/3/issueLink/{link_id}"}
+        if method == "DELETE" and path.startswith("issueLink/"):
+            return (204 if self.remove_link(path.split("/", 1)[1]) else 404), None, {}
+        return 404, {"errorMessages": [f"{method} {path} is not implemented by the stub"]}, {}
+
+    def _create(self, fields):
+        extra = {k: v for k, v in fields.items() if k not in ("project", "summary", "issuetype", "parent")}
+        return self.add_issue(
+            fields["summary"], fields["issuetype"]["name"], parent=(fields.get("parent") or {}).get("key"),
+            fields=extra, project=(fields.get("project") or {}).get("key"),
+        )
+
+    def _respond(self, handler, method):
+        path = re.sub(r"^/rest/api/\d+/", "", urlsplit(handler.path).path).strip("/")
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length)) if length else {}
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            roll = self._random.random()
+        headers = {}
+        if roll < self.throttle_rate:
+            status, data, headers = 429, {"errorMessages": ["Rate limit exceeded"]}, {"Retry-After": str(self.retry_after)}
+        elif roll < self.throttle_rate + self.error_rate:
+            status, data = 500, {"errorMessages": ["Injected failure"]}
+        else:
+            status, data, headers = self._handle(method, path, body)
+        with self._lock:
+            self.requests.append((method, path, status))
+
+        payload = json.dumps(data).encode() if data is not None else b""
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        if payload:
+            handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def start(self):
+        """Serve on localhost in a daemon thread; returns the base URL."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub._respond(self, "GET")
+
+            def do_POST(self):
+                stub._respond(self, "POST")
+
+            def do_PUT(self):
+                stub._respond(self, "PUT")
+
+            def do_DELETE(self):
+                stub._respond(self, "DELETE")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local stand-in Jira for Mindmapp.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--project", default="STUB")
+    parser.add_argument("--issues", type=int, default=1000, help="synthetic issues to start with (0 for none)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--search-api", choices=["token", "offset"], default="token",
+                        help="offset: no search/jql endpoint, like Jira Server / Data Center")
+    args = parser.parse_args(argv)
+
+    stub = StubJira(
+        project=args.project, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, search_api=args.search_api,
+        port=args.port,
+    )
+    if args.issues:
+        from benchmarks.synthetic import synthetic_hierarchy
+        stub.seed_from_frame(synthetic_hierarchy(args.issues, project=args.project, shuffle=False))
+    print(f"Stub Jira with {len(stub.issues):,} issues at {stub.start()} (project key {args.project}); Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+import math
+import os
+import re
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from caching import CACHE_DIR
+from issue_graph import split_ids
+from issue_table import ISSUE_COLUMNS, mark_dirty, normalize_df
+from jira_client import BULK_CREATE_LIMIT, DEFAULT_RATE_LIMIT, JiraClient, JiraError
+
+DEFAULT_PUSH_CONCURRENCY = 8
+
+# Clients built from the sidebar config keep field / link-type catalogs here between runs.
+SCHEMA_CACHE_DIR = os.path.join(CACHE_DIR, "schemas")
+
+# Subtree pulls query children for at most this many parent keys per JQL, so a wide level
+# becomes several bounded queries run side by side instead of one huge IN (...) list.
+SUBTREE_JQL_CHUNK = 100
+SUBTREE_CONCURRENCY = 4
+
+# Incremental pulls also re-fetch issues updated this long before the last sync, to cover
+# clock skew between this machine and Jira and edits that landed while that sync ran.
+DELTA_PULL_MARGIN = 300
+
+# A Parent ID that isn't a row of the table is only sent to Jira if it looks like an issue key.
+JIRA_KEY = re.compile(r"[A-Za-z][A-Za-z0-9_]*-\d+")
+
+# Row fields Push updates on issues that already exist in Jira.
+SYNCED_FIELDS = ["Summary", "Epic Name"]
+
+
+def jira_client_from_config(cfg, metrics=None):
+    if not cfg or not cfg.get("base_url"):
+        return None
+    auth_mode = cfg.get("auth_mode")
+    if auth_mode == "cloud" and not cfg.get("api_token"):
+        return None
+    if auth_mode == "server" and not cfg.get("password"):
+        return None
+    return JiraClient(
+        base_url=cfg["base_url"],
+        auth_mode=auth_mode,
+        email=cfg.get("email"),
+        api_token=cfg.get("api_token"),
+        username=cfg.get("username"),
+        password=cfg.get("password"),
+        api_version=cfg.get("api_version", "3" if auth_mode == "cloud" else "2"),
+        rate_limit=cfg.get("rate_limit", DEFAULT_RATE_LIMIT),
+        schema_cache_dir=cfg.get("schema_cache_dir", SCHEMA_CACHE_DIR),
+        metrics=metrics,
+    )
+
+
+def _map_issue_to_row(issue, reverse_type_map, schema):
+    key = issue["key"]
+    fields = issue["fields"]
+    jira_type_name = fields["issuetype"]["name"]
+    level = reverse_type_map.get(jira_type_name, jira_type_name)
+
+    epic_name = ""
+    if schema.get("epic_name_field"):
+        epic_name = fields.get(schema["epic_name_field"]) or ""
+
+    parent_id = ""
+    if fields.get("parent"):
+        parent_id = fields["parent"]["key"]
+    elif schema.get("epic_link_field") and fields.get(schema["epic_link_field"]):
+        parent_id = fields[schema["epic_link_field"]]
+
+    blocks = []
+    relates = []
+    for link in fields.get("issuelinks", []) or []:
+        link_type_name = link.get("type", {}).get("name", "").lower()
+        if link_type_name == "blocks":
+            outward = link.get("outwardIssue")
+            if outward:
+                blocks.append(outward["key"])
+        elif link_type_name == "relates":
+            other = link.get("outwardIssue") or link.get("inwardIssue")
+            if other:
+                relates.append(other["key"])
+
+    return {
+        "ID": key,
+        "Level": level,
+        "Summary": fields.get("summary", "") or "",
+        "Epic Name": epic_name,
+        "Parent ID": parent_id,
+        "Blocks": ",".join(blocks),
+        "Relates To": ",".join(relates),
+        "Jira Key": key,
+    }
+
+
+def _link_key(kind, outward_key, inward_key):
+    # "relates" has no direction, so its pairs are stored sorted.
+    if kind == "relates":
+        outward_key, inward_key = sorted((outward_key, inward_key))
+    return (kind, outward_key, inward_key)
+
+
+def _add_issue_links(index, issue):
+    key = issue["key"]
+    for link in issue["fields"].get("issuelinks", []) or []:
+        kind = link.get("type", {}).get("name", "").lower()
+        if kind not in ("blocks", "relates"):
+            continue
+        if link.get("outwardIssue"):
+            index[_link_key(kind, key, link["outwardIssue"]["key"])] = link.get("id")
+        elif link.get("inwardIssue"):
+            index[_link_key(kind, link["inwardIssue"]["key"], key)] = link.get("id")
+
+
+def link_index_from_issues(issues):
+    """{(kind, outward key, inward key): link ID} for the blocks / relates links on pulled issues."""
+    index = {}
+    for issue in issues:
+        _add_issue_links(index, issue)
+    return index
+
+
+def merge_link_index(old, new, pulled_keys):
+    """old minus links touching re-pulled issues (Jira's view of them is in new), plus new."""
+    merged = {k: v for k, v in (old or {}).items() if k[1] not in pulled_keys and k[2] not in pulled_keys}
+    merged.update(new)
+    return merged
+
+
+def updated_since_jql(jql, seconds_ago):
+    """jql narrowed to issues updated in the last seconds_ago (plus a safety margin).
+
+    Uses JQL's relative "-Nm" form, which doesn't depend on the Jira user's time zone.
+    """
+    minutes = math.ceil((max(seconds_ago, 0) + DELTA_PULL_MARGIN) / 60)
+    match = re.search(r"\border\s+by\b", jql, flags=re.IGNORECASE)
+    where, order = (jql[:match.start()], " " + jql[match.start():]) if match else (jql, "")
+    where = where.strip()
+    condition = f'updated >= "-{minutes}m"'
+    return (f"({where}) AND {condition}" if where else condition) + order
+
+
+def _reporting(issues, on_progress):
+    for count, issue in enumerate(issues, start=1):
+        yield issue
+        on_progress(count)
+
+
+def pull_from_jira(client, jql, type_map, schema, cache=None, site="", account="", project="",
+                   full_refresh=False, on_progress=None):
+    """Issues matching jql as table rows, plus the link index of their existing links.
+
+    Without a cache, issues are mapped as search pages stream in, so only the rows are held in
+    memory. With an IssueCache, a scope (site, account, project, jql) that was synced before is
+    brought up to date by fetching only issues updated since (unless full_refresh), and rows are
+    mapped from the cached payloads. Issues deleted in Jira, or no longer matching jql, only drop
+    out of the cache on a full refresh. Returns (df, link index, stats). on_progress, if given,
+    is called with the number of issues downloaded so far after each one.
+    """
+    started = time.time()
+    last_sync = None if cache is None or full_refresh else cache.last_sync(site, account, project, jql)
+    query = jql if last_sync is None else updated_since_jql(jql, started - last_sync)
+    issues = client.iter_issues(query)
+    if on_progress:
+        issues = _reporting(issues, on_progress)
+    stats = {"fetched": 0, "cached": 0, "incremental": last_sync is not None}
+
+    if cache is not None:
+        issues = list(issues)
+        cache.store(site, account, project, jql, issues, synced_at=started, replace=last_sync is None)
+        stats["fetched"] = len(issues)
+        issues = cache.issues(site, account, project, jql)
+
+    reverse_type_map = {v: k for k, v in type_map.items()}
+    rows, links = [], {}
+    for issue in issues:
+        rows.append(_map_issue_to_row(issue, reverse_type_map, schema))
+        _add_issue_links(links, issue)
+    if cache is None:
+        stats["fetched"] = len(rows)
+    else:
+        stats["cached"] = len(rows)
+    return pd.DataFrame(rows, columns=ISSUE_COLUMNS), links, stats
+
+
+def _children_jql(keys, schema):
+    keys_clause = ", ".join(f'"{k}"' for k in keys)
+    clauses = [f"parent in ({keys_clause})"]
+    if schema.get("epic_link_field"):
+        clauses.append(f'"Epic Link" in ({keys_clause})')
+    return " OR ".join(clauses)
+
+
+def pull_subtree_from_jira(client, root_key, type_map, schema, max_issues=None,
+                           chunk_size=SUBTREE_JQL_CHUNK, concurrency=SUBTREE_CONCURRENCY, on_level=None):
+    """BFS out from root_key via parent/Epic-Link, since JQL has no recursive descendant query.
+
+    Each level is one children query per chunk_size frontier keys, run concurrently; the
+    children it returns already carry every field, so they are the next level's issues as is.
+    Returns (df, link index, levels), where levels has per-level fan-out, query and request
+    counts and timing, also passed to on_level as each level completes. max_issues, if set,
+    stops the crawl once that many issues were fetched.
+    """
+    reverse_type_map = {v: k for k, v in type_map.items()}
+    fetched = {issue["key"]: issue for issue in client.iter_issues(f'key = "{root_key}"', max_results=1)}
+    frontier = list(fetched)
+    levels = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while frontier and (max_issues is None or len(fetched) < max_issues):
+            started = time.perf_counter()
+            requests_before = client.transport_stats()["requests"]
+            chunks = [frontier[i:i + chunk_size] for i in range(0, len(frontier), chunk_size)]
+            results = pool.map(lambda keys: client.search_issues(_children_jql(keys, schema)), chunks)
+            frontier = []
+            for children in results:
+                for child in children:
+                    if child["key"] not in fetched:
+                        fetched[child["key"]] = child
+                        frontier.append(child["key"])
+
+            seconds = time.perf_counter() - started
+            stats = {
+                "level": len(levels) + 1, "parents": sum(map(len, chunks)), "children": len(frontier),
+                "issues": len(fetched),
+                "queries": len(chunks), "requests": client.transport_stats()["requests"] - requests_before,
+                "seconds": seconds,
+            }
+            levels.append(stats)
+            if on_level:
+                on_level(stats)
+
+    issues = list(fetched.values())
+    if max_issues is not None:
+        issues = issues[:max_issues]
+    rows = [_map_issue_to_row(issue, reverse_type_map, schema) for issue in issues]
+    return pd.DataFrame(rows, columns=ISSUE_COLUMNS), link_index_from_issues(issues), levels
+
+
+def creation_layers(df):
+    """Row labels of issues without a Jira Key, grouped so every parent lands in an earlier layer.
+
+    Layer 0 holds rows whose Parent ID is empty, already synced, or not a row being created (it's
+    passed to Jira as-is, e.g. a key typed by hand). Rows caught in or under a parent cycle can't
+    be ordered and make up a final layer in table order.
+    """
+    new = df[df["Jira Key"] == ""]
+    new_ids = set(new["ID"])
+    position = {label: i for i, label in enumerate(new.index)}
+    children = defaultdict(list)
+    layer = []
+    for label, issue_id, parent in zip(new.index, new["ID"], new["Parent ID"]):
+        if parent and parent in new_ids:
+            children[parent].append((label, issue_id))
+        else:
+            layer.append((label, issue_id))
+
+    layers = []
+    while layer:
+        layers.append([label for label, _ in layer])
+        layer = [child for _, issue_id in layer for child in children.pop(issue_id, [])]
+    stuck = sorted((label for kids in children.values() for label, _ in kids), key=position.get)
+    if stuck:
+        layers.append(stuck)
+    return layers
+
+
+def _create_fields(row, type_map, schema, id_map):
+    level = row["Level"]
+    parent_key = id_map.get(row["Parent ID"], row["Parent ID"] or None)
+
+    extra_fields = {}
+    if level == "Epic" and schema.get("epic_name_field") and row["Epic Name"]:
+        extra_fields[schema["epic_name_field"]] = row["Epic Name"]
+    if parent_key:
+        if level == "Sub-task":
+            extra_fields["parent"] = {"key": parent_key}
+        elif schema.get("epic_link_field"):
+            extra_fields[schema["epic_link_field"]] = parent_key
+        else:
+            extra_fields["parent"] = {"key": parent_key}
+    return type_map.get(level, level), extra_fields
+
+
+def _field_hashes(synced):
+    return pd.DataFrame(
+        {col: pd.util.hash_pandas_object(synced[col].astype(str), index=False).to_numpy() for col in SYNCED_FIELDS},
+        index=pd.Index(synced["Jira Key"].to_numpy(dtype=object), name="Jira Key"),
+    )
+
+
+def sync_baseline(df):
+    """Hashes of the fields Push can update (SYNCED_FIELDS), per Jira Key, as Jira last saw them."""
+    hashes = _field_hashes(df[df["Jira Key"] != ""])
+    return hashes[~hashes.index.duplicated()]
+
+
+def merge_baseline(old, new):
+    """old with the entries of new added or replacing it, e.g. after a subtree pull."""
+    if old is None:
+        return new
+    return pd.concat([old[~old.index.isin(new.index)], new])
+
+
+def pending_updates(df, baseline, schema):
+    """{jira_key: {Jira field: value}} for synced rows changed since the baseline.
+
+    Only the changed fields are included. Without a baseline every synced row is sent, since
+    there is nothing to compare against; keys the baseline doesn't know count as fully changed.
+    """
+    synced = df[df["Jira Key"] != ""]
+    current = _field_hashes(synced)
+    changed = {col: np.ones(len(synced), dtype=bool) for col in SYNCED_FIELDS}
+    if baseline is not None and len(baseline):
+        pos = baseline.index.get_indexer(current.index)
+        known = pos >= 0
+        for col in SYNCED_FIELDS:
+            before = baseline[col].to_numpy()[np.where(known, pos, 0)]
+            changed[col] = ~known | (before != current[col].to_numpy())
+
+    any_changed = changed["Summary"] | changed["Epic Name"]
+    updates = {}
+    for (_, row), summary_changed, epic_changed in zip(
+        synced[any_changed].iterrows(), changed["Summary"][any_changed], changed["Epic Name"][any_changed]
+    ):
+        fields = {}
+        if summary_changed:
+            fields["summary"] = row["Summary"]
+        if epic_changed and row["Level"] == "Epic" and schema.get("epic_name_field"):
+            fields[schema["epic_name_field"]] = row["Epic Name"]
+        if fields:
+            updates[row["Jira Key"]] = fields
+    return updates
+
+
+def desired_links(df, schema):
+    """Link keys (see link_index_from_issues) the table's Blocks / Relates To columns ask for.
+
+    Only rows with a Jira Key can be linked from, and references to rows that never made it to
+    Jira are skipped; anything else not in the table is passed through as a Jira key.
+    """
+    key_of = dict(zip(df["ID"], df["Jira Key"]))
+    wanted = set()
+    for kind, column in (("blocks", "Blocks"), ("relates", "Relates To")):
+        if not schema.get(f"{kind}_link_type"):
+            continue
+        for source_key, refs in zip(df["Jira Key"], df[column]):
+            if not source_key:
+                continue
+            for ref in split_ids(refs):
+                target_key = key_of.get(ref, ref)
+                if target_key:
+                    wanted.add(_link_key(kind, source_key, target_key))
+    return wanted
+
+
+def sync_links(client, df, schema, link_index, remove_missing, pool, errors):
+    """Create links the table has but link_index doesn't; optionally delete the reverse.
+
+    A known link only counts as removed locally if the table holds the issue that would list it:
+    the blocking issue for blocks, either end for relates. Requests run on pool; failures are
+    appended to errors. Returns ({"created", "skipped", "removed", "failed"}, updated link index).
+    """
+    existing = dict(link_index or {})
+    wanted = desired_links(df, schema)
+    to_create = sorted(wanted - existing.keys())
+    to_remove = []
+    if remove_missing:
+        table_keys = set(df["Jira Key"]) - {""}
+        for key, link_id in existing.items():
+            kind, outward_key, inward_key = key
+            if key in wanted or not link_id or not schema.get(f"{kind}_link_type"):
+                continue
+            if outward_key in table_keys or (kind == "relates" and inward_key in table_keys):
+                to_remove.append((key, link_id))
+
+    creates = [
+        (key, pool.submit(client.create_link, key[1], key[2], schema[f"{key[0]}_link_type"]))
+        for key in to_create
+    ]
+    removes = [(key, pool.submit(client.delete_link, link_id)) for key, link_id in to_remove]
+    summary = {"created": 0, "skipped": len(wanted) - len(to_create), "removed": 0, "failed": 0}
+    for key, future in creates:
+        try:
+            existing[key] = future.result()
+            summary["created"] += 1
+        except JiraError as e:
+            summary["failed"] += 1
+            errors.append(f"Link {key[1]} {key[0]} {key[2]}: {e}")
+    for key, future in removes:
+        try:
+            future.result()
+            del existing[key]
+            summary["removed"] += 1
+        except JiraError as e:
+            summary["failed"] += 1
+            errors.append(f"Removing link {key[1]} {key[0]} {key[2]}: {e}")
+    return summary, existing
+
+
+def apply_id_map(df, id_map, created_keys):
+    """df with created rows renamed to their new Jira keys and references remapped through id_map.
+
+    created_keys maps the local ID of each newly created issue to its key; id_map additionally
+    maps synced issues' IDs to their keys, as Parent ID / Blocks / Relates To refer to issues by
+    key once they're in Jira.
+    """
+    df = mark_dirty(df.copy())
+    new = df["ID"].isin(list(created_keys)) & (df["Jira Key"] == "")
+    keys = df.loc[new, "ID"].map(created_keys)
+    df.loc[new, "Jira Key"] = keys
+    df.loc[new, "ID"] = keys
+    df["Parent ID"] = df["Parent ID"].map(lambda x: id_map.get(x, x))
+    df["Blocks"] = df["Blocks"].apply(
+        lambda s: ",".join(id_map.get(b.strip(), b.strip()) for b in str(s).split(",") if b.strip())
+    )
+    df["Relates To"] = df["Relates To"].apply(
+        lambda s: ",".join(id_map.get(b.strip(), b.strip()) for b in str(s).split(",") if b.strip())
+    )
+    return df
+
+
+def push_to_jira(client, project_key, df, type_map, schema, baseline=None, link_index=None,
+                 remove_missing_links=False, concurrency=DEFAULT_PUSH_CONCURRENCY, on_layer=None,
+                 should_stop=None):
+    """Create unsynced issues layer by layer, update changed synced issues, then sync links.
+
+    Each creation layer is split into issue/bulk batches of BULK_CREATE_LIMIT, with up to
+    `concurrency` of them in flight on a worker pool; a layer starts only once the previous one
+    finished, so parent keys are always known. A row whose parent wasn't created (it failed, or
+    sits in a parent cycle) or whose Parent ID is neither a row nor an issue key is not sent; it
+    gets an error instead, and so in turn do its descendants. Synced issues are only updated for fields that
+    differ from baseline (see pending_updates), and links are diffed against link_index (see
+    sync_links). Returns (df, created, updated, errors, report): report["layers"] has per-layer
+    counts and throughput, also passed to on_layer as each layer completes, report["links"] the
+    link summary, and report["baseline"] / report["link_index"] are what to keep for the next push.
+
+    should_stop, if given, is polled before each batch: once it returns True no further batches,
+    updates or links are sent (report["cancelled"] is set). An unexpected error stops the push
+    the same way, with report["error"] set instead of raising. Either way the issues created so
+    far are returned with their keys, and updates that weren't confirmed keep their old baseline
+    so the next push sends them again. report["id_map"] / report["created_keys"] allow replaying
+    the renames on a newer copy of the table with apply_id_map.
+    """
+    df = mark_dirty(df.copy())
+    synced = df["Jira Key"] != ""
+    id_map = dict(zip(df.loc[synced, "ID"], df.loc[synced, "Jira Key"]))
+    new_ids = set(df.loc[~synced, "ID"])
+    updates = pending_updates(df, baseline, schema)
+    workers = max(1, int(concurrency))
+
+    created, updated, errors = 0, 0, []
+    created_keys = {}
+    applied = set()
+    report = {"layers": [], "cancelled": False, "error": None}
+
+    def halted():
+        if not report["cancelled"] and should_stop and should_stop():
+            report["cancelled"] = True
+        return report["cancelled"] or report["error"] is not None
+
+    def settle(chunk, batch):
+        """Record one issue/bulk batch's keys and failures; returns how many it created."""
+        try:
+            new_keys, failures = batch.result()
+        except Exception as e:  # e.g. a bug or an unexpected response: stop, keep what exists
+            report["error"] = str(e) or type(e).__name__
+            new_keys, failures = {}, {}
+        for _, local_id, summary, *_ in chunk:
+            if local_id not in new_keys:
+                errors.append(f"{local_id} ({summary}): {failures.get(local_id, report['error'] or 'not created')}")
+                continue
+            id_map[local_id] = created_keys[local_id] = new_keys[local_id]
+        return sum(local_id in new_keys for _, local_id, *_ in chunk)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for number, layer in enumerate(creation_layers(df), start=1):
+                if halted():
+                    break
+                started = time.perf_counter()
+                pending = []
+                for idx in layer:
+                    row = df.loc[idx]
+                    parent = row["Parent ID"]
+                    if parent and parent not in id_map and (parent in new_ids or not JIRA_KEY.fullmatch(parent)):
+                        # Its parent failed, was skipped or never existed: don't send a local ID
+                        # to Jira. Its own children are dropped the same way in the next layer.
+                        reason = "was not created" if parent in new_ids else "is not in Jira"
+                        errors.append(f"{row['ID']} ({row['Summary']}): parent {parent} {reason}")
+                        continue
+                    jira_type, extra_fields = _create_fields(row, type_map, schema, id_map)
+                    pending.append((idx, row["ID"], row["Summary"], jira_type, extra_fields))
+
+                layer_created, requests = 0, 0
+                in_flight = deque()
+                for i in range(0, len(pending), BULK_CREATE_LIMIT):
+                    if halted():
+                        break
+                    if len(in_flight) >= workers:
+                        layer_created += settle(*in_flight.popleft())
+                    chunk = pending[i:i + BULK_CREATE_LIMIT]
+                    in_flight.append((chunk, pool.submit(
+                        client.create_issues_bulk, project_key,
+                        [(local_id, jira_type, summary, extra) for _, local_id, summary, jira_type, extra in chunk],
+                    )))
+                    requests += 1
+                while in_flight:
+                    layer_created += settle(*in_flight.popleft())
+                created += layer_created
+
+                seconds = time.perf_counter() - started
+                stats = {
+                    "layer": number, "issues": len(layer), "created": layer_created, "requests": requests,
+                    "seconds": seconds, "per_second": layer_created / seconds if seconds else 0.0,
+                }
+                report["layers"].append(stats)
+                if on_layer:
+                    on_layer(stats)
+        except Exception as e:
+            report["error"] = str(e) or type(e).__name__
+
+        df = apply_id_map(df, id_map, created_keys)
+        report["id_map"], report["created_keys"] = id_map, created_keys
+        report["links"] = {"created": 0, "skipped": 0, "removed": 0, "failed": 0}
+        report["link_index"] = dict(link_index or {})
+
+        # Stopped: what was created is recorded above, updates and links wait for the next push.
+        if not halted():
+            try:
+                futures = [(key, pool.submit(client.update_issue_fields, key, fields)) for key, fields in updates.items()]
+                for key, future in futures:
+                    try:
+                        future.result()
+                        applied.add(key)
+                        updated += 1
+                    except JiraError as e:
+                        errors.append(f"{key} update: {e}")
+                if not halted():
+                    report["links"], report["link_index"] = sync_links(
+                        client, df, schema, link_index, remove_missing_links, pool, errors
+                    )
+            except Exception as e:
+                report["error"] = str(e) or type(e).__name__
+
+    if report["error"] is not None:
+        errors.append(f"Push stopped by an unexpected error: {report['error']}")
+
+    # Issues whose update failed or was never sent keep their old baseline, so the next push
+    # still sees them as changed.
+    unsent = list(set(updates) - applied)
+    new_baseline = sync_baseline(df)
+    new_baseline = new_baseline[~new_baseline.index.isin(unsent)]
+    if baseline is not None:
+        new_baseline = merge_baseline(new_baseline, baseline[baseline.index.isin(unsent)])
+    report["baseline"] = new_baseline
+
+    return normalize_df(df), created, updated, errors, report
@@ -0,0 +1,55 @@
+import numpy as np
+
+# Distance between neighbouring leaves and between hierarchy levels, in canvas pixels.
+X_SPACING = 180
+Y_SPACING = 160
+
+
+def _group_offsets(widths, groups):
+    """Exclusive running sum of widths, restarting wherever the group changes."""
+    if not len(widths):
+        return widths
+    total = np.cumsum(widths) - widths
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    return total - np.repeat(total[starts], np.diff(np.r_[starts, len(widths)]))
+
+
+def tree_layout(graph):
+    """(x, y) arrays of canvas positions for every node of an IssueGraph, top-down by Parent ID.
+
+    A layered tidy-tree layout computed a whole level at a time: each node gets as many columns
+    as its subtree has leaves, children are laid out left to right in table order under their
+    parent, and the parent is centred over them. Nodes stuck in a parent cycle form a last row.
+    """
+    n = len(graph)
+    x = np.zeros(n)
+    y = np.zeros(n)
+    if not n:
+        return x, y
+    tree_levels, cyclic = graph.depth_levels()
+    child_counts = np.diff(graph.child_offsets)
+
+    # Leaf counts, bottom-up: a node is as wide as the sum of its children, or 1 if it has none.
+    width = np.zeros(n)
+    for level in reversed(tree_levels):
+        has_children = child_counts[level] > 0
+        width[level[~has_children]] = 1
+        parents = graph.parent[level]
+        inner = parents >= 0
+        np.add.at(width, parents[inner], width[level[inner]])
+
+    # Left edges, top-down: roots side by side, then children after their earlier siblings.
+    left = np.zeros(n)
+    for depth, level in enumerate(tree_levels):
+        parents = graph.parent[level]
+        if depth == 0:
+            left[level] = np.cumsum(width[level]) - width[level]
+        else:
+            left[level] = left[parents] + _group_offsets(width[level], parents)
+        y[level] = depth
+
+    x[:] = (left + width / 2) * X_SPACING
+    if len(cyclic):
+        x[cyclic] = (np.arange(len(cyclic)) + 0.5) * X_SPACING
+        y[cyclic] = len(tree_levels)
+    return x, y * Y_SPACING
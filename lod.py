@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+from canvas import CANVAS_COLUMNS, CLUSTER_LEVEL, LINK_COUNTS_ATTR
+
+DEFAULT_NODE_BUDGET = 300
+
+# Cluster node IDs. Real IDs are Jira keys or short local IDs, so "::" can't collide with them.
+CLUSTER_SUFFIX = "::hidden"
+TOP_CLUSTER_ID = "::top-level"
+CYCLE_CLUSTER_ID = "::cycles"
+TOP = ""  # in `expanded`: show every top-level issue, however many there are
+
+
+def cluster_owner(cluster_id):
+    """The issue ID whose children a cluster folds (TOP for the top-level one), or None."""
+    if cluster_id == TOP_CLUSTER_ID:
+        return TOP
+    if cluster_id.endswith(CLUSTER_SUFFIX):
+        return cluster_id[:-len(CLUSTER_SUFFIX)]
+    return None
+
+
+def _visible(graph, budget, expanded):
+    """Visible mask, opening the tree breadth-first while the canvas nodes fit in the budget.
+
+    Nodes are visible issues plus the cluster rows standing in for hidden ones: a visible issue
+    whose children are folded costs one cluster, and so do the top-level issues or the parent
+    cycles that don't fit. A visible node shows either all of its children or none; expanded
+    IDs are opened first and regardless of the budget (their children still count against it).
+    """
+    levels, stuck = graph.depth_levels()
+    child_counts = np.diff(graph.child_offsets)
+    has_children = child_counts > 0
+    # Children of each node that have children of their own, i.e. clusters its opening adds.
+    inner = graph.parent[has_children & (graph.parent >= 0)]
+    grandparents = np.bincount(inner, minlength=len(graph)) if len(graph) else np.zeros(0, dtype=np.int64)
+
+    visible = np.zeros(len(graph), dtype=bool)
+    roots = levels[0] if levels else np.empty(0, dtype=np.int64)
+    remaining = budget - (1 if len(stuck) else 0)  # the cycle cluster, freed if cycles are shown
+    cost = 1 + has_children[roots]
+    if TOP not in expanded and cost.sum() > remaining:
+        remaining -= 1  # the top-level cluster
+        roots = roots[:int(np.searchsorted(np.cumsum(cost), remaining, side="right"))]
+    visible[roots] = True
+    remaining -= int(cost[:len(roots)].sum())
+
+    frontier = roots
+    while len(frontier):
+        parents = frontier[has_children[frontier]]
+        is_expanded = np.array([i in expanded for i in graph.ids[parents]], dtype=bool)
+        order = np.argsort(~is_expanded, kind="stable")
+        opened = []
+        for parent, forced in zip(parents[order].tolist(), is_expanded[order].tolist()):
+            # Its children replace its cluster, and bring clusters of their own.
+            extra = int(child_counts[parent] + grandparents[parent]) - 1
+            if forced or extra <= remaining:
+                opened.append(parent)
+                remaining -= extra
+        frontier = graph.children_of(np.sort(np.array(opened, dtype=np.int64)))
+        visible[frontier] = True
+    # Issues in parent cycles are shown as they are if they all still fit.
+    if len(stuck) and len(stuck) <= remaining + 1:
+        visible[stuck] = True
+    return visible
+
+
+def _fold(graph, visible):
+    """(row of each issue in the reduced frame, shown codes, hidden codes, cluster owners, cluster
+    slot of each hidden code). Hidden issues map to the cluster of their nearest visible
+    ancestor: owner -1 is the top-level overflow, -2 the parent cycles."""
+    n = len(graph)
+    levels, stuck = graph.depth_levels()
+    owner = np.full(n, -2, dtype=np.int64)
+    if levels:
+        owner[levels[0][~visible[levels[0]]]] = -1
+    for level in levels[1:]:
+        hidden = level[~visible[level]]
+        parents = graph.parent[hidden]
+        owner[hidden] = np.where(visible[parents], parents, owner[parents])
+    owner[stuck[~visible[stuck]]] = -2
+
+    hidden = np.flatnonzero(~visible)
+    owners, slot = np.unique(owner[hidden], return_inverse=True)
+    shown = np.flatnonzero(visible)
+    rep = np.empty(n, dtype=np.int64)
+    rep[shown] = np.arange(len(shown))
+    rep[hidden] = len(shown) + slot
+    return rep, shown, hidden, owners, slot
+
+
+def _rerouted(rep, m, src, dst, undirected=False):
+    """(source rows, target rows, link counts) of edges moved onto their ends' rows, one per
+    pair of distinct rows."""
+    s, t = rep[src], rep[dst]
+    keep = s != t
+    s, t = s[keep], t[keep]
+    if undirected:
+        s, t = np.minimum(s, t), np.maximum(s, t)
+    pairs, counts = np.unique(s * max(m, 1) + t, return_counts=True)
+    return pairs // max(m, 1), pairs % max(m, 1), counts
+
+
+def _joined(sources, targets, labels, n):
+    """Comma-joined target labels per source row."""
+    out = np.full(n, "", dtype=object)
+    if not len(sources):
+        return out
+    for s, group in pd.DataFrame({"s": sources, "t": targets}).groupby("s", sort=False)["t"]:
+        out[s] = ",".join(labels[group.to_numpy()])
+    return out
+
+
+def _size(graph, visible):
+    """Canvas nodes plus blocks / relates edges of the frame `visible` folds df into."""
+    rep, shown, _, owners, _ = _fold(graph, visible)
+    m = len(shown) + len(owners)
+    return m + len(_rerouted(rep, m, *graph.blocks_edges())[0]) + len(
+        _rerouted(rep, m, *graph.relates_edges(), undirected=True)[0]
+    )
+
+
+def lod_frame(df, graph, budget=DEFAULT_NODE_BUDGET, expanded=()):
+    """df reduced to at most `budget` canvas nodes and links, with folded subtrees as cluster rows.
+
+    The budget counts issues, cluster rows and Blocks / Relates To edges (hierarchy edges, at
+    most one per node, aren't counted): the tree is opened as far as that allows, so the
+    elements sent to the browser stay bounded however densely issues are linked. Only
+    `expanded` IDs may take it over the budget.
+
+    Returns (frame, cluster IDs). The frame has CANVAS_COLUMNS; cluster rows hang off the issue
+    whose children they fold, with Level CLUSTER_LEVEL and a Summary counting the hidden issues
+    per level. Blocks / Relates To references into a folded subtree point at its cluster
+    instead, merged into one reference per pair of rows; frame.attrs[LINK_COUNTS_ATTR] has how
+    many links each merged one stands for. Issues only reachable through a parent cycle share
+    one cluster. When nothing needs folding, df itself is returned.
+    """
+    expanded = set(expanded)
+    visible = _visible(graph, budget, expanded)
+    if _size(graph, visible) > budget:
+        # Links don't fit: look for a node allowance whose links do. Links only multiply as
+        # clusters open, and the size grows with the allowance (near enough: the greedy opening
+        # isn't strictly monotone), so a binary search finds one close to the largest. Expanded
+        # subtrees are left out of the search, as they may go over the budget anyway: counted
+        # in, they would fold the canvas until the clusters opened were hidden themselves.
+        searched = expanded & {TOP}
+        low, high = 0, budget - 1
+        while low < high:
+            mid = (low + high + 1) // 2
+            if _size(graph, _visible(graph, mid, searched)) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+        visible = _visible(graph, low, expanded)
+    if visible.all():
+        return df, []
+
+    rep, shown, hidden, owners, slot = _fold(graph, visible)
+    level_codes = pd.Categorical(df["Level"].astype(str).to_numpy()[hidden])
+    counts = np.zeros((len(owners), len(level_codes.categories)), dtype=np.int64)
+    np.add.at(counts, (slot, level_codes.codes), 1)
+
+    ids = graph.ids
+    cluster_ids = np.array([
+        TOP_CLUSTER_ID if o == -1 else CYCLE_CLUSTER_ID if o == -2 else f"{ids[o]}{CLUSTER_SUFFIX}"
+        for o in owners.tolist()
+    ], dtype=object)
+    summaries = []
+    for o, row in zip(owners.tolist(), counts):
+        parts = ", ".join(f"{c} {lvl}" for lvl, c in zip(level_codes.categories, row) if c)
+        what = "in parent cycles" if o == -2 else "more top-level" if o == -1 else "hidden"
+        summaries.append(f"+{row.sum()} {what} ({parts})")
+
+    m = len(shown) + len(owners)
+    labels = np.concatenate([ids[shown], cluster_ids])
+    link_counts = {}
+    columns = {}
+    for relation, column, (src, dst), undirected in (
+        ("blocks", "Blocks", graph.blocks_edges(), False),
+        ("relates", "Relates To", graph.relates_edges(), True),
+    ):
+        s, t, c = _rerouted(rep, m, src, dst, undirected)
+        columns[column] = _joined(s, t, labels, m)
+        merged = c > 1
+        link_counts.update(
+            ((relation, a, b), k) for a, b, k in zip(labels[s[merged]], labels[t[merged]], c[merged].tolist())
+        )
+
+    view = df.iloc[shown]
+    frame = pd.DataFrame({
+        "ID": labels,
+        "Level": np.concatenate([view["Level"].astype(str).to_numpy(dtype=object), [CLUSTER_LEVEL] * len(owners)]),
+        "Summary": np.concatenate([view["Summary"].astype(str).to_numpy(dtype=object), summaries]),
+        "Parent ID": np.concatenate([
+            view["Parent ID"].astype(str).to_numpy(dtype=object),
+            [ids[o] if o >= 0 else "" for o in owners.tolist()],
+        ]),
+        **columns,
+        "Jira Key": np.concatenate([view["Jira Key"].astype(str).to_numpy(dtype=object), [""] * len(owners)]),
+    }, columns=CANVAS_COLUMNS)
+    frame.attrs[LINK_COUNTS_ATTR] = link_counts
+    return frame, cluster_ids.tolist()
@@ -1,13 +1,41 @@
-import io
-import json
+import time
+from functools import partial
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from jira_client import JiraClient, JiraError
+from caching import LRUCache
+from canvas import CANVAS_COLUMNS, build_elements
+from canvas_component import mindmap_canvas, take_canvas_click
+from issue_cache import open_issue_cache
+from issue_graph import GRAPH_COLUMNS, IssueGraph, frame_fingerprint
+from issue_table import ISSUE_COLUMNS, ISSUE_TYPES, mark_dirty, normalize_df
+from jira_client import DEFAULT_RATE_LIMIT, LATENCY_BUCKETS, JiraError, RequestMetrics
+from jira_sync import (
+    DEFAULT_PUSH_CONCURRENCY, apply_id_map, jira_client_from_config, merge_baseline, merge_link_index,
+    pending_updates, sync_baseline,
+)
+from layout import tree_layout
+from pull_cache import get_pull_cache, pull_cache_key, pull_view
+from profiling import RerunProfiler
+from lod import DEFAULT_NODE_BUDGET, cluster_owner, lod_frame
+from sync_jobs import get_job_runner, pull_job, push_job, subtree_job
+from table_io import XLSX_MIME, ExportCache, UploadError, read_upload, upload_digest
+from validation import DataValidator
+from workspaces import AUTOSAVE_DELAY, WorkspaceError, open_workspace_store
 
 st.set_page_config(page_title="Mindmapp MVP", layout="wide")
 st.title("Mindmapp MVP")
 
+# Opt-in timing of each section below, shown in the Rerun Profile panel (or start with ?profile=1).
+if "rerun_profiler" not in st.session_state:
+    st.session_state.rerun_profiler = RerunProfiler()
+if "profile_reruns" not in st.session_state:
+    st.session_state.profile_reruns = st.query_params.get("profile") == "1"
+profiler = st.session_state.rerun_profiler
+profiler.start(st.session_state.profile_reruns)
+profiler.mark("Setup")
+
 if "connection_mode" not in st.session_state:
     st.session_state.connection_mode = "CSV / Excel only (no Jira account needed)"
 
@@ -21,8 +49,6 @@ JIRA_MODE = st.session_state.connection_mode == "Live Jira connection"
 # ----------------------------
 # Helpers
 # ----------------------------
-ISSUE_TYPES = ["Use-Case", "Epic", "Story", "Task", "Sub-task"]
-
 def id_prefix(level: str) -> str:
     return {
         "Use-Case": "UC",
@@ -32,29 +58,6 @@ def id_prefix(level: str) -> str:
         "Sub-task": "SB",
     }.get(level, "ND")
 
-COLOR_SHAPE = {
-    "Use-Case": {"color": "#1f77b4", "shape": "ellipse",         "w": 80, "h": 80},
-    "Epic":     {"color": "#2ca02c", "shape": "round-rectangle", "w": 70, "h": 70},
-    "Story":    {"color": "#ff7f0e", "shape": "diamond",         "w": 60, "h": 60},
-    "Task":     {"color": "#7f7f7f", "shape": "triangle",        "w": 50, "h": 50},
-    "Sub-task": {"color": "#9467bd", "shape": "hexagon",         "w": 40, "h": 40},
-}
-
-def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
-    """Ensure consistent formatting of dataframe."""
-    df = df.copy().fillna("")
-    if "Jira Key" not in df.columns:
-        df["Jira Key"] = ""
-    if "Relates To" not in df.columns:
-        df["Relates To"] = ""
-    df["ID"] = df["ID"].astype(str).str.strip()
-    df["Parent ID"] = df["Parent ID"].astype(str).str.strip()
-    df["Blocks"] = df["Blocks"].astype(str).str.strip()
-    df["Relates To"] = df["Relates To"].astype(str).str.strip()
-    df["Jira Key"] = df["Jira Key"].astype(str).str.strip()
-    df = df[df["ID"] != ""].drop_duplicates(subset=["ID"])
-    return df
-
 # ----------------------------
 # Defaults
 # ----------------------------
@@ -68,227 +71,266 @@ DEFAULT_ROWS = [
 # ----------------------------
 # Tree helpers
 # ----------------------------
+def get_issue_graph(df):
+    """IssueGraph of df, rebuilt only when its ID / Parent ID / Blocks / Relates To columns change."""
+    key = frame_fingerprint(df, GRAPH_COLUMNS)
+    cached = st.session_state.get("issue_graph")
+    if cached is None or cached[0] != key:
+        cached = (key, IssueGraph.from_frame(df))
+        st.session_state.issue_graph = cached
+    return cached[1]
+
 def descendant_ids(df, root_id):
-    """IDs of root_id and everything under it via Parent ID, BFS style."""
-    result = {root_id}
-    found = True
-    while found:
-        found = False
-        children = df[df["Parent ID"].isin(result)]["ID"].tolist()
-        new = [c for c in children if c not in result]
-        if new:
-            result.update(new)
-            found = True
-    return result
+    """IDs of root_id and everything under it via Parent ID."""
+    return get_issue_graph(df).descendant_ids(root_id)
 
 def find_data_issues(df):
-    """Dangling references and parent cycles, as human-readable messages."""
-    ids = set(df["ID"])
-    issues = []
-    for _, r in df.iterrows():
-        if r["Parent ID"] and r["Parent ID"] not in ids:
-            issues.append(f"{r['ID']}: Parent ID '{r['Parent ID']}' does not exist")
-        for b in [x.strip() for x in r["Blocks"].split(",") if x.strip()]:
-            if b not in ids:
-                issues.append(f"{r['ID']}: Blocks references '{b}', which does not exist")
-        for rel in [x.strip() for x in r["Relates To"].split(",") if x.strip()]:
-            if rel not in ids:
-                issues.append(f"{r['ID']}: Relates To references '{rel}', which does not exist")
-
-    parent_of = dict(zip(df["ID"], df["Parent ID"]))
-    reported_cycles = set()
-    for start in df["ID"]:
-        chain = [start]
-        seen = {start}
-        cur = start
-        while parent_of.get(cur):
-            cur = parent_of[cur]
-            if cur in seen:
-                cycle_key = frozenset(chain[chain.index(cur):] + [cur])
-                if cycle_key not in reported_cycles:
-                    reported_cycles.add(cycle_key)
-                    issues.append(f"Parent cycle: {' -> '.join(chain[chain.index(cur):] + [cur])}")
-                break
-            chain.append(cur)
-            seen.add(cur)
-    return issues
-
-# ----------------------------
-# Jira sync helpers
-# ----------------------------
-def jira_client_from_config(cfg):
-    if not cfg or not cfg.get("base_url"):
-        return None
-    auth_mode = cfg.get("auth_mode")
-    if auth_mode == "cloud" and not cfg.get("api_token"):
+    """Dangling references and parent cycles, re-checking only rows changed since the last rerun."""
+    if "data_validator" not in st.session_state:
+        st.session_state.data_validator = DataValidator()
+    return st.session_state.data_validator.check(df, get_issue_graph(df))
+
+# ----------------------------
+# Jira pull helpers
+# ----------------------------
+def merge_pulled_subtree(pulled, links, levels):
+    """Replace the pulled issues' rows (and their baseline / link entries) with Jira's copies."""
+    pulled_keys = set(pulled["ID"])
+    kept = st.session_state.df[~st.session_state.df["ID"].isin(pulled_keys)]
+    st.session_state.df = normalize_df(pd.concat([kept, pulled], ignore_index=True))
+    st.session_state.sync_baseline = merge_baseline(
+        st.session_state.get("sync_baseline"), sync_baseline(normalize_df(pulled))
+    )
+    st.session_state.link_index = merge_link_index(st.session_state.get("link_index"), links, pulled_keys)
+    st.session_state.subtree_report = [
+        f"Level {s['level']}: {s['parents']} parent(s) -> {s['children']} new child issue(s), "
+        f"{s['queries']} quer{'y' if s['queries'] == 1 else 'ies'} / {s['requests']} request(s) in {s['seconds']:.1f}s"
+        for s in levels
+    ]
+
+# ----------------------------
+# Background sync jobs
+# ----------------------------
+def session_jira_owner():
+    """(site, account ID) this session's Jira credentials authenticate as, or None when they
+    aren't set or can't be verified. Verified once per set of credentials."""
+    cfg = st.session_state.jira_config
+    creds = tuple(sorted((k, str(v)) for k, v in cfg.items()))
+    cached = st.session_state.get("jira_owner")
+    if cached is not None and cached[0] == creds:
+        return cached[1]
+    client = jira_client_from_config(cfg)
+    if client is None:
         return None
-    if auth_mode == "server" and not cfg.get("password"):
+    try:
+        owner = (client.base_url, client.account_id())
+    except JiraError:
         return None
-    return JiraClient(
-        base_url=cfg["base_url"],
-        auth_mode=auth_mode,
-        email=cfg.get("email"),
-        api_token=cfg.get("api_token"),
-        username=cfg.get("username"),
-        password=cfg.get("password"),
-        api_version=cfg.get("api_version", "3" if auth_mode == "cloud" else "2"),
-    )
+    st.session_state.jira_owner = (creds, owner)
+    return owner
 
-JIRA_ROW_COLUMNS = ["ID", "Level", "Summary", "Epic Name", "Parent ID", "Blocks", "Relates To", "Jira Key"]
+def start_sync_job(kind, fn, client, *args, owner=None, **kwargs):
+    """Run fn on the shared job runner; its result is applied on the first rerun after it ends.
 
-def _map_issue_to_row(issue, reverse_type_map, schema):
-    key = issue["key"]
-    fields = issue["fields"]
-    jira_type_name = fields["issuetype"]["name"]
-    level = reverse_type_map.get(jira_type_name, jira_type_name)
+    The job belongs to owner, by default the verified account of the session's credentials.
+    """
+    owner = owner or session_jira_owner()
+    if owner is None:
+        st.session_state.sync_messages = [("error", f"{kind} not started: could not verify the Jira credentials.")]
+        st.rerun()
+    job = get_job_runner().submit(kind, fn, client, *args, client=client, owner=owner, **kwargs)
+    st.session_state.sync_job_id = job.id
+    # Also kept in the URL, so a reloaded page picks the job back up instead of losing it.
+    st.query_params["sync_job"] = job.id
+    st.rerun()
 
-    epic_name = ""
-    if schema.get("epic_name_field"):
-        epic_name = fields.get(schema["epic_name_field"]) or ""
-
-    parent_id = ""
-    if fields.get("parent"):
-        parent_id = fields["parent"]["key"]
-    elif schema.get("epic_link_field") and fields.get(schema["epic_link_field"]):
-        parent_id = fields[schema["epic_link_field"]]
-
-    blocks = []
-    relates = []
-    for link in fields.get("issuelinks", []) or []:
-        link_type_name = link.get("type", {}).get("name", "").lower()
-        if link_type_name == "blocks":
-            outward = link.get("outwardIssue")
-            if outward:
-                blocks.append(outward["key"])
-        elif link_type_name == "relates":
-            other = link.get("outwardIssue") or link.get("inwardIssue")
-            if other:
-                relates.append(other["key"])
+def active_sync_job():
+    """This session's running or unreported job, if any.
+
+    A job ID only found in the URL (a reloaded page, or a shared link) is attached once this
+    session's credentials verify as the account that started the job; other accounts' jobs are
+    dropped from the URL.
+    """
+    job_id = st.session_state.get("sync_job_id")
+    if job_id is None and "sync_job" in st.query_params:
+        job = get_job_runner().get(st.query_params["sync_job"])
+        owner = session_jira_owner() if job is not None else None
+        if job is not None and owner is None:
+            return None  # can't tell yet: wait for this session's credentials
+        if job is None or job.owner != owner:
+            st.query_params.pop("sync_job", None)
+            return None
+        st.session_state.sync_job_id = job_id = job.id
+    job = get_job_runner().get(job_id) if job_id else None
+    if job is None and job_id:
+        st.session_state.pop("sync_job_id", None)
+        st.query_params.pop("sync_job", None)
+    return job
+
+def apply_pull(result):
+    """Replace the table with a pull result (a pull_view when it came through the shared cache)."""
+    st.session_state.df = normalize_df(result["df"])
+    st.session_state.sync_baseline = result["baseline"]
+    st.session_state.link_index = result["links"]
+    if result["shared"]:
+        age = time.time() - result["pulled_at"]
+        note = f"reused a pull from {age:.0f}s ago; tick Full refresh to re-download"
+    else:
+        note = f"{result['stats']['fetched']} downloaded"
+    st.session_state.sync_messages = [("success", f"Pulled {len(result['df'])} issues from Jira ({note})")]
+
+def finish_sync_job(job):
+    """Apply a finished job's result to the session in one go, then forget the job."""
+    get_job_runner().discard(job.id)
+    st.session_state.pop("sync_job_id", None)
+    st.query_params.pop("sync_job", None)
+    if job.status == "failed":
+        st.session_state.sync_messages = [("error", f"{job.kind} failed: {job.error}")]
+        return
+    if job.status == "cancelled":
+        st.session_state.sync_messages = [("warning", f"{job.kind} cancelled; the table was left unchanged.")]
+        return
+
+    result = job.result
+    if job.kind == "Pull":
+        apply_pull(result)
+    elif job.kind == "Subtree pull":
+        if result["df"].empty:
+            st.session_state.sync_messages = [("error", f"No issue found for key '{result['root_key']}'.")]
+        else:
+            merge_pulled_subtree(result["df"], result["links"], result["levels"])
+            st.session_state.sync_messages = [
+                ("success", f"Pulled {len(result['df'])} issue(s) under {result['root_key']}")
+            ]
+    elif job.kind == "Push":
+        report = result["report"]
+        # Replayed on the current table rather than replacing it, so edits made while the push
+        # ran are kept.
+        st.session_state.df = normalize_df(
+            apply_id_map(st.session_state.df, report["id_map"], report["created_keys"])
+        )
+        st.session_state.sync_baseline = report["baseline"]
+        st.session_state.link_index = report["link_index"]
+        links = report["links"]
+        transport = job.client.transport_stats()
+        created, updated = result["created"], result["updated"]
+        summary = f"Created {created}, updated {updated} issue(s) in Jira" if created or updated else ""
+        if report["error"] is not None:
+            summary = f"Push stopped by an error. {summary or 'Nothing was created yet.'}"
+        elif report["cancelled"]:
+            summary = f"Push stopped early. {summary or 'Nothing was created yet.'}"
+        st.session_state.push_report = {
+            "summary": summary,
+            "layers": [
+                f"Layer {s['layer']}: {s['created']}/{s['issues']} created in {s['seconds']:.1f}s "
+                f"over {s['requests']} request(s) ({s['per_second']:.1f} issues/s)"
+                for s in report["layers"]
+            ],
+            "links": (
+                f"Links: {links['created']} created, {links['skipped']} already in Jira, "
+                f"{links['removed']} removed, {links['failed']} failed"
+            ),
+            "transport": (
+                f"{transport['requests']} request(s), {transport['retries']} retried "
+                f"({transport['throttled']} throttled); waited {transport['throttle_wait']:.1f}s "
+                f"on rate limits and {transport['backoff_wait']:.1f}s backing off"
+            ),
+            "errors": result["errors"],
+        }
+
+@st.fragment(run_every=1)
+def sync_job_progress(job_id):
+    """Polls the running job without rerunning the whole app; reruns it once the job ends."""
+    job = get_job_runner().get(job_id)
+    if job is None or job.status != "running":
+        st.rerun()
+    p = job.snapshot()
+    text = f"{job.kind}: {p['stage']} — {p['done']:,}" + (f"/{p['total']:,}" if p["total"] else "") + f" {p['unit']}"
+    details = f"{p['requests'] or 0} request(s), {p['elapsed']:.0f}s elapsed"
+    if p["eta"] is not None:
+        details += f", ~{p['eta']:.0f}s left"
+    if p["fraction"] is not None:
+        st.progress(p["fraction"], text=text)
+    else:
+        st.caption(text)
+    st.caption(details)
+    if st.button("Cancel", key="cancel_sync_job", disabled=job.cancel_requested()):
+        job.cancel()
 
+# ----------------------------
+# Workspaces
+# ----------------------------
+def workspace_meta():
     return {
-        "ID": key,
-        "Level": level,
-        "Summary": fields.get("summary", "") or "",
-        "Epic Name": epic_name,
-        "Parent ID": parent_id,
-        "Blocks": ",".join(blocks),
-        "Relates To": ",".join(relates),
-        "Jira Key": key,
+        "type_map": dict(st.session_state.get("jira_type_map") or {}),
+        "schema": st.session_state.get("jira_schema") or {},
+        "focus": st.session_state.get("mindmap_focus", ""),
+        "link_index": st.session_state.get("link_index"),
     }
 
-def pull_from_jira(client, jql, type_map, schema):
-    reverse_type_map = {v: k for k, v in type_map.items()}
-    issues = client.search_issues(jql)
-    rows = [_map_issue_to_row(issue, reverse_type_map, schema) for issue in issues]
-    return pd.DataFrame(rows, columns=JIRA_ROW_COLUMNS)
-
-def pull_subtree_from_jira(client, root_key, type_map, schema, max_issues=500):
-    """BFS out from root_key via parent/Epic-Link, since JQL has no recursive descendant query."""
-    reverse_type_map = {v: k for k, v in type_map.items()}
-    fetched = {}
-    frontier = {root_key}
-    while frontier and len(fetched) < max_issues:
-        keys_clause = ", ".join(f'"{k}"' for k in frontier)
-        issues = client.search_issues(f"key in ({keys_clause})", max_results=len(frontier))
-        for issue in issues:
-            fetched[issue["key"]] = issue
-
-        child_clauses = [f'parent in ({keys_clause})']
-        if schema.get("epic_link_field"):
-            child_clauses.append(f'"Epic Link" in ({keys_clause})')
-        children = client.search_issues(" OR ".join(child_clauses), max_results=max_issues)
-
-        frontier = {c["key"] for c in children if c["key"] not in fetched}
-
-    rows = [_map_issue_to_row(issue, reverse_type_map, schema) for issue in fetched.values()]
-    return pd.DataFrame(rows, columns=JIRA_ROW_COLUMNS)
-
-def push_to_jira(client, project_key, df, type_map, schema):
-    df = df.copy()
-    id_map = {r["ID"]: r["Jira Key"] for _, r in df.iterrows() if r["Jira Key"]}
-
-    remaining = list(df[df["Jira Key"] == ""].index)
-    order = []
-    resolved = set(id_map.keys())
-    while remaining:
-        progressed = False
-        for idx in list(remaining):
-            parent = df.at[idx, "Parent ID"]
-            if not parent or parent in resolved:
-                order.append(idx)
-                resolved.add(df.at[idx, "ID"])
-                remaining.remove(idx)
-                progressed = True
-        if not progressed:
-            order.extend(remaining)
-            remaining = []
-
-    created, updated, errors = 0, 0, []
-    for idx in order:
-        row = df.loc[idx]
-        level = row["Level"]
-        jira_type = type_map.get(level, level)
-        parent_key = id_map.get(row["Parent ID"], row["Parent ID"] or None)
-
-        extra_fields = {}
-        if level == "Epic" and schema.get("epic_name_field") and row["Epic Name"]:
-            extra_fields[schema["epic_name_field"]] = row["Epic Name"]
-        if parent_key:
-            if level == "Sub-task":
-                extra_fields["parent"] = {"key": parent_key}
-            elif schema.get("epic_link_field"):
-                extra_fields[schema["epic_link_field"]] = parent_key
-            else:
-                extra_fields["parent"] = {"key": parent_key}
-
-        try:
-            new_key = client.create_issue(project_key, jira_type, row["Summary"], extra_fields)
-            id_map[row["ID"]] = new_key
-            df.at[idx, "ID"] = new_key
-            df.at[idx, "Jira Key"] = new_key
-            created += 1
-        except JiraError as e:
-            errors.append(f"{row['ID']} ({row['Summary']}): {e}")
-
-    df["Parent ID"] = df["Parent ID"].map(lambda x: id_map.get(x, x))
-    df["Blocks"] = df["Blocks"].apply(
-        lambda s: ",".join(id_map.get(b.strip(), b.strip()) for b in str(s).split(",") if b.strip())
-    )
-    df["Relates To"] = df["Relates To"].apply(
-        lambda s: ",".join(id_map.get(b.strip(), b.strip()) for b in str(s).split(",") if b.strip())
+def load_workspace(name):
+    df, meta, baseline, state = st.session_state.workspace_store.load(name)
+    st.session_state.df = df
+    st.session_state.jira_type_map = {lvl: lvl for lvl in ISSUE_TYPES} | meta.get("type_map", {})
+    for lvl in ISSUE_TYPES:
+        st.session_state[f"type_map_{lvl}"] = st.session_state.jira_type_map[lvl]
+    st.session_state.jira_schema = meta.get("schema", {})
+    st.session_state.mindmap_focus = meta.get("focus", "")
+    st.session_state.link_index = meta.get("link_index")
+    st.session_state.sync_baseline = baseline
+    st.session_state.workspace = state
+    st.session_state.workspace_saved = None
+    # Kept in the URL, so a reloaded page (or a new session) reopens the workspace.
+    st.query_params["workspace"] = name
+
+def save_workspace(name):
+    state, stats = st.session_state.workspace_store.save(
+        name, st.session_state.df, workspace_meta(), st.session_state.get("sync_baseline"),
+        st.session_state.get("workspace"),
     )
-
-    already_synced_idx = [i for i in df.index if i not in order and df.at[i, "Jira Key"]]
-    for idx in already_synced_idx:
-        row = df.loc[idx]
+    st.session_state.workspace = state
+    st.session_state.workspace_checked = time.time()
+    if stats["rows"] or stats["full"]:
+        st.session_state.workspace_saved = (time.time(), stats)
+    if st.query_params.get("workspace") != name:
+        st.query_params["workspace"] = name
+
+@st.fragment(run_every=AUTOSAVE_DELAY)
+def workspace_autosave():
+    """Saves the open workspace once the app has been idle for AUTOSAVE_DELAY after a rerun.
+
+    Full reruns (every edit is one) only stamp workspace_touched; the save, which diffs the
+    whole table, runs here on a timer so a burst of edits is written once.
+    """
+    state = st.session_state.get("workspace")
+    if state is None:
+        return
+    touched = st.session_state.get("workspace_touched", 0)
+    idle = time.time() - touched >= AUTOSAVE_DELAY
+    if st.session_state.workspace_autosave and idle and touched > st.session_state.get("workspace_checked", 0):
         try:
-            client.update_issue_summary(row["Jira Key"], row["Summary"])
-            updated += 1
-        except JiraError as e:
-            errors.append(f"{row['Jira Key']} update: {e}")
-
-    if schema.get("blocks_link_type"):
-        for _, row in df.iterrows():
-            if not row["Jira Key"]:
-                continue
-            for blocked in [b.strip() for b in str(row["Blocks"]).split(",") if b.strip()]:
-                try:
-                    client.create_link(row["Jira Key"], blocked, schema["blocks_link_type"])
-                except JiraError:
-                    pass
-
-    if schema.get("relates_link_type"):
-        for _, row in df.iterrows():
-            if not row["Jira Key"]:
-                continue
-            for related in [b.strip() for b in str(row["Relates To"]).split(",") if b.strip()]:
-                try:
-                    client.create_link(row["Jira Key"], related, schema["relates_link_type"])
-                except JiraError:
-                    pass
-
-    return normalize_df(df), created, updated, errors
+            save_workspace(state["name"])
+        except WorkspaceError as e:
+            st.session_state.workspace_checked = time.time()
+            st.error(str(e))
+    saved = st.session_state.get("workspace_saved")
+    if saved:
+        at, stats = saved
+        what = "all rows" if stats["full"] else f"{stats['rows']:,} changed row(s)"
+        st.caption(f"Saved {time.strftime('%H:%M:%S', time.localtime(at))} ({what}, {stats['seconds']:.2f}s).")
+
+profiler.mark("Load table")
+if "workspace_store" not in st.session_state:
+    st.session_state.workspace_store = open_workspace_store()
+st.session_state.workspace_touched = time.time()
 
+if "df" not in st.session_state:
+    restore = st.query_params.get("workspace")
+    if st.session_state.workspace_store is not None and restore and st.session_state.workspace_store.exists(restore):
+        try:
+            load_workspace(restore)
+        except WorkspaceError as e:
+            st.session_state.workspace_error = str(e)
 if "df" not in st.session_state:
     st.session_state.df = pd.DataFrame(DEFAULT_ROWS)
 
@@ -297,9 +339,67 @@ st.session_state.df = normalize_df(st.session_state.df)
 if "mindmap_focus" not in st.session_state:
     st.session_state.mindmap_focus = ""
 
+# ----------------------------
+# Workspace
+# ----------------------------
+profiler.mark("Workspace")
+store = st.session_state.workspace_store
+current_workspace = (st.session_state.get("workspace") or {}).get("name")
+with st.sidebar.expander(f"Workspace: {current_workspace}" if current_workspace else "Workspace", expanded=not current_workspace):
+    if st.session_state.get("workspace_error"):
+        st.error(st.session_state.pop("workspace_error"))
+    if store is None:
+        st.caption("Workspaces are unavailable: the workspace folder could not be created.")
+    else:
+        if not current_workspace:
+            st.caption("This table only lives in this browser session. Save it as a workspace to keep it "
+                       "across refreshes and restarts.")
+        save_name = st.text_input("Save as", value=current_workspace or "", placeholder="e.g. Q3 roadmap")
+        if st.button("Save Workspace", disabled=not save_name.strip()):
+            try:
+                save_workspace(save_name.strip())
+                st.rerun()
+            except WorkspaceError as e:
+                st.error(str(e))
+        st.checkbox(
+            "Autosave", value=True, key="workspace_autosave",
+            help=f"Save changes to the open workspace after {AUTOSAVE_DELAY:.0f}s without edits. "
+                 "Only added, changed and deleted rows are written.",
+        )
+        workspace_autosave()
+
+        saved_names = [name for name, _, _ in store.names()]
+        if saved_names:
+            open_name = st.selectbox("Saved workspaces", saved_names, key="workspace_pick")
+            wcol1, wcol2 = st.columns(2)
+            with wcol1:
+                if st.button("Open", key="open_workspace"):
+                    try:
+                        load_workspace(open_name)
+                        st.rerun()
+                    except WorkspaceError as e:
+                        st.error(str(e))
+            with wcol2:
+                if st.button("Delete", key="delete_workspace"):
+                    st.session_state.pending_workspace_delete = open_name
+        pending = st.session_state.get("pending_workspace_delete")
+        if pending:
+            st.error(f"Delete workspace **{pending}** from disk? The table shown here stays as it is.")
+            if st.button("Yes, Delete Workspace", key="confirm_workspace_delete"):
+                store.delete(pending)
+                if pending == current_workspace:
+                    st.session_state.workspace = None
+                    st.query_params.pop("workspace", None)
+                st.session_state.pending_workspace_delete = None
+                st.rerun()
+            if st.button("Cancel", key="cancel_workspace_delete"):
+                st.session_state.pending_workspace_delete = None
+                st.rerun()
+
 # ----------------------------
 # Sidebar Controls
 # ----------------------------
+profiler.mark("Sidebar controls")
 st.sidebar.header("Controls")
 
 col1, col2 = st.sidebar.columns(2)
@@ -327,7 +427,7 @@ if st.session_state.get("show_clear_confirm", False):
         "You can bring issues back afterward with Pull from Jira or Upload CSV/Excel."
     )
     if st.sidebar.button("Yes, Clear Everything", key="confirm_clear"):
-        st.session_state.df = pd.DataFrame(columns=["ID","Level","Summary","Epic Name","Parent ID","Blocks","Relates To","Jira Key"])
+        st.session_state.df = pd.DataFrame(columns=ISSUE_COLUMNS)
         st.session_state.show_clear_confirm = False
         st.rerun()
     if st.sidebar.button("Cancel", key="cancel_clear"):
@@ -337,12 +437,16 @@ if st.session_state.get("show_clear_confirm", False):
 # ----------------------------
 # Jira Connection
 # ----------------------------
+profiler.mark("Jira connection")
 if "jira_config" not in st.session_state:
     st.session_state.jira_config = {}
 if "jira_type_map" not in st.session_state:
     st.session_state.jira_type_map = {lvl: lvl for lvl in ISSUE_TYPES}
 if "jira_schema" not in st.session_state:
     st.session_state.jira_schema = {}
+if "jira_metrics" not in st.session_state:
+    # Shared by every client this session creates, background jobs' included.
+    st.session_state.jira_metrics = RequestMetrics()
 
 if JIRA_MODE:
     st.sidebar.header("Jira Connection")
@@ -363,6 +467,12 @@ if JIRA_MODE:
 
         project_key = st.text_input("Project Key", value=st.session_state.jira_config.get("project_key", ""),
                                      placeholder="e.g. MMP")
+        rate_limit = st.number_input(
+            "Max requests per second", min_value=0.0, step=1.0,
+            value=float(st.session_state.jira_config.get("rate_limit", DEFAULT_RATE_LIMIT)),
+            help="Client-side cap shared by all concurrent requests; 0 disables it. "
+                 "Throttled (429/503) responses are retried either way, honoring Retry-After.",
+        )
 
         if st.button("Save & Test Connection"):
             cfg = {
@@ -373,10 +483,11 @@ if JIRA_MODE:
                 "username": username.strip(),
                 "password": password,
                 "project_key": project_key.strip(),
+                "rate_limit": rate_limit,
             }
             st.session_state.jira_config = cfg
             try:
-                client = jira_client_from_config(cfg)
+                client = jira_client_from_config(cfg, st.session_state.jira_metrics)
                 if client is None:
                     st.error("Base URL and credentials (API token, or username + password) are required.")
                 else:
@@ -394,41 +505,102 @@ if JIRA_MODE:
             )
 
     st.sidebar.subheader("Jira Sync")
+    sync_job = active_sync_job()
+    if sync_job is not None and sync_job.status != "running":
+        finish_sync_job(sync_job)
+        sync_job = None
+    if sync_job is not None:
+        with st.sidebar:
+            sync_job_progress(sync_job.id)
+    for level, message in st.session_state.pop("sync_messages", []):
+        getattr(st.sidebar, level)(message)
+
     jql_default = f"project = {st.session_state.jira_config.get('project_key', '')} ORDER BY created ASC"
     pull_jql = st.sidebar.text_area("Pull JQL", value=jql_default, height=70)
+    st.sidebar.checkbox(
+        "Full refresh", key="pull_full_refresh",
+        help="Pulls normally fetch only issues updated since the last pull of this JQL and reuse the "
+             "local cache for the rest. Tick to re-download everything, e.g. after issues were deleted in Jira.",
+    )
+
+    st.sidebar.number_input(
+        "Push concurrency", min_value=1, max_value=32, value=DEFAULT_PUSH_CONCURRENCY, key="push_concurrency",
+        help="How many issues of the same hierarchy level are created in Jira at once.",
+    )
+
+    # Preview of what Push would send: new issues, plus synced ones whose Summary / Epic Name
+    # changed since the last pull or push.
+    to_create = int((st.session_state.df["Jira Key"] == "").sum())
+    to_update = len(pending_updates(
+        st.session_state.df, st.session_state.get("sync_baseline"), st.session_state.jira_schema
+    ))
+    st.sidebar.caption(f"Push will create {to_create} and update {to_update} issue(s).")
+    st.sidebar.checkbox(
+        "Also remove links deleted locally", key="push_remove_links",
+        help="Delete Jira links that were pulled but no longer appear in Blocks / Relates To.",
+    )
 
     pcol1, pcol2 = st.sidebar.columns(2)
     with pcol1:
-        if st.button("Pull from Jira"):
-            client = jira_client_from_config(st.session_state.jira_config)
+        if st.button("Pull from Jira", disabled=sync_job is not None):
+            client = jira_client_from_config(st.session_state.jira_config, st.session_state.jira_metrics)
+            account = None
             if client is None:
                 st.sidebar.error("Configure and test the Jira connection first.")
             else:
+                # Cached pulls are only shared with the same Jira account, and only once the
+                # credentials are proven to still work.
                 try:
-                    pulled = pull_from_jira(client, pull_jql, st.session_state.jira_type_map, st.session_state.jira_schema)
-                    st.session_state.df = normalize_df(pulled)
-                    st.sidebar.success(f"Pulled {len(pulled)} issues from Jira")
-                    st.rerun()
+                    account = client.account_id()
                 except JiraError as e:
-                    st.sidebar.error(str(e))
+                    st.sidebar.error(f"Could not verify the Jira credentials: {e}")
+            if account is not None:
+                # Another session may have pulled the same thing lately: reuse that right away.
+                shared_key = pull_cache_key(
+                    st.session_state.jira_config["base_url"], account, pull_jql,
+                    st.session_state.jira_type_map, st.session_state.jira_schema,
+                )
+                hit = None if st.session_state.pull_full_refresh else get_pull_cache().get(shared_key)
+                if hit is not None:
+                    apply_pull(dict(pull_view(hit[0]), shared=True))
+                    st.rerun()
+                start_sync_job(
+                    "Pull", pull_job, client,
+                    pull_jql, st.session_state.jira_type_map, st.session_state.jira_schema,
+                    shared_key=shared_key, owner=(client.base_url, account),
+                    cache=open_issue_cache(), site=st.session_state.jira_config["base_url"], account=account,
+                    project=st.session_state.jira_config.get("project_key", ""),
+                    full_refresh=st.session_state.pull_full_refresh,
+                )
 
     with pcol2:
-        if st.button("Push to Jira", type="primary"):
-            client = jira_client_from_config(st.session_state.jira_config)
+        if st.button("Push to Jira", type="primary", disabled=sync_job is not None):
+            client = jira_client_from_config(st.session_state.jira_config, st.session_state.jira_metrics)
             project_key = st.session_state.jira_config.get("project_key")
             if client is None or not project_key:
                 st.sidebar.error("Configure and test the Jira connection first.")
             else:
-                new_df, created, updated, errors = push_to_jira(
-                    client, project_key, st.session_state.df,
-                    st.session_state.jira_type_map, st.session_state.jira_schema
+                start_sync_job(
+                    "Push", push_job, client,
+                    project_key, st.session_state.df, st.session_state.jira_type_map, st.session_state.jira_schema,
+                    total=to_create,
+                    baseline=st.session_state.get("sync_baseline"),
+                    link_index=st.session_state.get("link_index"),
+                    remove_missing_links=st.session_state.push_remove_links,
+                    concurrency=st.session_state.push_concurrency,
                 )
-                st.session_state.df = new_df
-                if created or updated:
-                    st.sidebar.success(f"Created {created}, updated {updated} issue(s) in Jira")
-                for err in errors:
-                    st.sidebar.error(err)
-                st.rerun()
+
+    # Shown once, on the rerun that follows a push.
+    push_report = st.session_state.pop("push_report", None)
+    if push_report:
+        if push_report["summary"]:
+            st.sidebar.success(push_report["summary"])
+        for line in push_report["layers"]:
+            st.sidebar.caption(line)
+        st.sidebar.caption(push_report["links"])
+        st.sidebar.caption(push_report["transport"])
+        for err in push_report["errors"]:
+            st.sidebar.error(err)
 
     st.sidebar.subheader("Pull an Issue + Its Subtree")
     st.sidebar.caption(
@@ -436,31 +608,47 @@ if JIRA_MODE:
         "child, grandchild, etc. underneath it, without needing to already be in the table below."
     )
     root_issue_key = st.sidebar.text_input("Root Issue Key", placeholder="e.g. MMP-1", key="root_issue_key")
-    if st.sidebar.button("Pull Subtree from Root"):
-        client = jira_client_from_config(st.session_state.jira_config)
+    # Per-level crawl stats of the last subtree pull (from here or the focus view), shown once.
+    for line in st.session_state.pop("subtree_report", []):
+        st.sidebar.caption(line)
+    if st.sidebar.button("Pull Subtree from Root", disabled=sync_job is not None):
+        client = jira_client_from_config(st.session_state.jira_config, st.session_state.jira_metrics)
         if client is None:
             st.sidebar.error("Configure and test the Jira connection first.")
         elif not root_issue_key.strip():
             st.sidebar.error("Enter a root issue key first.")
         else:
-            try:
-                pulled = pull_subtree_from_jira(
-                    client, root_issue_key.strip(), st.session_state.jira_type_map, st.session_state.jira_schema
-                )
-                if pulled.empty:
-                    st.sidebar.error(f"No issue found for key '{root_issue_key.strip()}'.")
-                else:
-                    pulled_keys = set(pulled["ID"])
-                    kept = st.session_state.df[~st.session_state.df["ID"].isin(pulled_keys)]
-                    st.session_state.df = normalize_df(pd.concat([kept, pulled], ignore_index=True))
-                    st.sidebar.success(f"Pulled {len(pulled)} issue(s) under {root_issue_key.strip()}")
-                    st.rerun()
-            except JiraError as e:
-                st.sidebar.error(str(e))
+            start_sync_job(
+                "Subtree pull", subtree_job, client,
+                root_issue_key.strip(), st.session_state.jira_type_map, st.session_state.jira_schema,
+            )
+
+    with st.sidebar.expander("Diagnostics"):
+        endpoints = st.session_state.jira_metrics.snapshot()
+        if not endpoints:
+            st.caption("No Jira requests in this session yet.")
+        else:
+            st.caption("Every HTTP attempt to Jira this session, retries included. p50 / p95 are histogram bucket bounds.")
+            st.dataframe(pd.DataFrame([
+                {
+                    "Endpoint": name, "Requests": e["requests"], "Errors": e["errors"], "Throttled": e["throttled"],
+                    "Avg ms": round(1000 * e["seconds"] / e["requests"]), "p50 ms": round(1000 * e["p50"]),
+                    "p95 ms": round(1000 * e["p95"]), "Max ms": round(1000 * e["max_seconds"]),
+                    "KB sent": round(e["bytes_sent"] / 1024, 1), "KB received": round(e["bytes_received"] / 1024, 1),
+                }
+                for name, e in sorted(endpoints.items())
+            ]), hide_index=True)
+            latency = np.sum([e["histogram"] for e in endpoints.values()], axis=0)
+            bucket_labels = [f"≤{b * 1000:g} ms" for b in LATENCY_BUCKETS[:-1]] + [f">{LATENCY_BUCKETS[-2] * 1000:g} ms"]
+            st.bar_chart(pd.Series(latency, index=pd.Index(bucket_labels, name="Latency"), name="Requests"), height=160)
+            if st.button("Reset Diagnostics"):
+                st.session_state.jira_metrics.reset()
+                st.rerun()
 
 # ----------------------------
 # Data validation warnings
 # ----------------------------
+profiler.mark("Validation")
 data_issues = find_data_issues(st.session_state.df)
 if data_issues:
     with st.expander(f"⚠️ {len(data_issues)} data issue(s) found", expanded=False):
@@ -470,8 +658,18 @@ if data_issues:
 # ----------------------------
 # Focus filter
 # ----------------------------
+profiler.mark("Focus filter")
 st.subheader("Mindmap Canvas")
 
+# Clicking a node on the canvas focuses on it; clicking a summary node expands it.
+clicked = take_canvas_click()
+if clicked:
+    owner = cluster_owner(clicked)
+    if owner is not None:
+        st.session_state.lod_expanded = list(dict.fromkeys([*st.session_state.get("lod_expanded", []), owner]))
+    else:
+        st.session_state.mindmap_focus = clicked
+
 all_ids = st.session_state.df["ID"].tolist()
 if st.session_state.mindmap_focus not in [""] + all_ids:
     st.session_state.mindmap_focus = ""
@@ -498,154 +696,91 @@ with fcol2:
         st.rerun()
 
 if st.session_state.mindmap_focus:
-    focus_ids = descendant_ids(st.session_state.df, st.session_state.mindmap_focus)
-    display_df = st.session_state.df[st.session_state.df["ID"].isin(focus_ids)]
+    focus_rows = get_issue_graph(st.session_state.df).subtree_rows(st.session_state.mindmap_focus)
+    display_df = st.session_state.df.iloc[focus_rows]
 else:
     display_df = st.session_state.df
 
 if JIRA_MODE and st.session_state.mindmap_focus:
+    sync_job = active_sync_job()
     focus_row = st.session_state.df.loc[st.session_state.df["ID"] == st.session_state.mindmap_focus].iloc[0]
     if focus_row["Jira Key"]:
-        if st.button(f"🔄 Pull subtree of {focus_row['Jira Key']} from Jira"):
-            client = jira_client_from_config(st.session_state.jira_config)
+        if st.button(f"🔄 Pull subtree of {focus_row['Jira Key']} from Jira", disabled=sync_job is not None):
+            client = jira_client_from_config(st.session_state.jira_config, st.session_state.jira_metrics)
             if client is None:
                 st.error("Configure and test the Jira connection first.")
             else:
-                try:
-                    pulled = pull_subtree_from_jira(
-                        client, focus_row["Jira Key"], st.session_state.jira_type_map, st.session_state.jira_schema
-                    )
-                    pulled_keys = set(pulled["ID"])
-                    kept = st.session_state.df[~st.session_state.df["ID"].isin(pulled_keys)]
-                    st.session_state.df = normalize_df(pd.concat([kept, pulled], ignore_index=True))
-                    st.success(f"Pulled {len(pulled)} issue(s) in this subtree from Jira")
-                    st.rerun()
-                except JiraError as e:
-                    st.error(str(e))
+                start_sync_job(
+                    "Subtree pull", subtree_job, client,
+                    focus_row["Jira Key"], st.session_state.jira_type_map, st.session_state.jira_schema,
+                )
     else:
         st.caption("This issue has no Jira Key yet — Push to Jira first to enable a subtree pull.")
 
 # ----------------------------
-# Build canvas elements
-# ----------------------------
-def build_elements(df):
-    elements = []
-    valid_ids = set(df["ID"])
-    seen_relates = set()
-    for _, r in df.iterrows():
-        node_id = r["ID"]
-        label_prefix = r["Jira Key"] if r["Jira Key"] else r["Level"]
-        sync_class = "synced" if r["Jira Key"] else "unsynced"
-        elements.append({
-            "data": {"id": node_id, "label": f"{label_prefix}: {r['Summary']}"},
-            "classes": f"{r['Level']} {sync_class}",
-        })
-
-        parent_id = r["Parent ID"].strip()
-        if parent_id and parent_id in valid_ids:
-            elements.append({"data": {"source": parent_id, "target": node_id, "relation": "hierarchy"}})
-
-        blocks = str(r["Blocks"]).strip()
-        if blocks:
-            for blocked in [b.strip() for b in blocks.split(",") if b.strip()]:
-                if blocked in valid_ids:
-                    elements.append({"data": {"source": node_id, "target": blocked, "relation": "blocks"}})
-
-        relates_to = str(r["Relates To"]).strip()
-        if relates_to:
-            for related in [b.strip() for b in relates_to.split(",") if b.strip()]:
-                if related in valid_ids:
-                    pair = frozenset((node_id, related))
-                    if pair not in seen_relates:
-                        seen_relates.add(pair)
-                        elements.append({"data": {"source": node_id, "target": related, "relation": "relates"}})
-    return elements
-
-STYLESHEET = [
-    {"selector": "node", "style": {"label": "data(label)", "color": "white",
-                                    "text-outline-color": "#000", "text-outline-width": 2,
-                                    "text-valign": "center", "text-halign": "center"}},
-    {"selector": ".unsynced", "style": {"border-width": 3, "border-style": "dashed", "border-color": "#ffbf00"}},
-]
-for lvl, spec in COLOR_SHAPE.items():
-    STYLESHEET.append({
-        "selector": f".{lvl}",
-        "style": {"background-color": spec["color"], "shape": spec["shape"],
-                  "width": spec["w"], "height": spec["h"]}
-    })
-STYLESHEET.append({
-    "selector": "edge[relation = 'hierarchy']",
-    "style": {"curve-style": "bezier", "target-arrow-shape": "triangle",
-              "line-color": "#999", "target-arrow-color": "#999"}
-})
-STYLESHEET.append({
-    "selector": "edge[relation = 'blocks']",
-    "style": {
-        "line-style": "dashed",
-        "line-color": "red",
-        "curve-style": "bezier",
-        "target-arrow-shape": "triangle",
-        "target-arrow-color": "red",
-        "arrow-scale": 1.5,
-        "label": "blocks",
-        "font-size": 10,
-        "color": "red",
-        "text-rotation": "autorotate",
-        "text-background-color": "white",
-        "text-background-opacity": 1,
-        "text-background-padding": "2px"
-    }
-})
-STYLESHEET.append({
-    "selector": "edge[relation = 'relates']",
-    "style": {
-        "line-style": "dotted",
-        "line-color": "#1f77b4",
-        "curve-style": "bezier",
-        "target-arrow-shape": "none",
-        "source-arrow-shape": "none",
-        "width": 2,
-        "label": "relates to",
-        "font-size": 10,
-        "color": "#1f77b4",
-        "text-rotation": "autorotate",
-        "text-background-color": "white",
-        "text-background-opacity": 1,
-        "text-background-padding": "2px"
-    }
-})
-
-elements = build_elements(display_df)
-
-# ----------------------------
-# Render Cytoscape (static — use the sidebar Add/Edit/Delete forms below to change the tree)
-# ----------------------------
-CY_SRC = "https://cdn.jsdelivr.net/npm/cytoscape/dist/cytoscape.min.js"
-html = f"""
-<!doctype html>
-<html>
-<head>
-  <script src="{CY_SRC}"></script>
-  <style>#cy {{ width:100%; height:450px; background:#fff; }}</style>
-</head>
-<body>
-  <div id="cy"></div>
-  <script>
-    cytoscape({{
-      container: document.getElementById('cy'),
-      elements: {json.dumps(elements)},
-      style: {json.dumps(STYLESHEET)},
-      layout: {{ name: 'breadthfirst', directed: true, spacingFactor: 1.5 }}
-    }});
-  </script>
-</body>
-</html>
-"""
-st.components.v1.html(html, height=500, scrolling=True)
+# Render Cytoscape (click to focus / expand — use the sidebar Add/Edit/Delete forms below to change the tree)
+# ----------------------------
+profiler.mark("Canvas build")
+if "canvas_cache" not in st.session_state:
+    st.session_state.canvas_cache = LRUCache(maxsize=8)
+if "layout_cache" not in st.session_state:
+    st.session_state.layout_cache = LRUCache(maxsize=8)
+
+if "lod_cache" not in st.session_state:
+    st.session_state.lod_cache = LRUCache(maxsize=8)
+
+# Level of detail: beyond node_budget issues and links, subtrees that don't fit are folded into
+# summary nodes, which can be expanded one by one.
+node_budget = int(st.session_state.get("node_budget", DEFAULT_NODE_BUDGET))
+expanded = tuple(st.session_state.get("lod_expanded", []))
+display_fp = frame_fingerprint(display_df, CANVAS_COLUMNS)
+lod_key = (display_fp, node_budget, expanded)
+view = st.session_state.lod_cache.get(lod_key)
+if view is None:
+    display_graph = IssueGraph.from_frame(display_df) if st.session_state.mindmap_focus else get_issue_graph(display_df)
+    view = lod_frame(display_df, display_graph, node_budget, expanded)
+    st.session_state.lod_cache.put(lod_key, view)
+view_df, clusters = view
+
+lcol1, lcol2 = st.columns([1, 3])
+with lcol1:
+    st.number_input(
+        "Max nodes + links on canvas", min_value=20, max_value=20000, step=50, value=DEFAULT_NODE_BUDGET,
+        key="node_budget",
+        help="Issues, summary nodes and blocks / relates-to lines drawn at most. Subtrees that don't fit are folded "
+             "into summary nodes counting their issues per level; lines between them are merged and labelled "
+             "with how many links they stand for.",
+    )
+with lcol2:
+    expandable = [owner for owner in map(cluster_owner, clusters) if owner is not None]
+    st.multiselect(
+        "Expanded clusters", options=list(dict.fromkeys(expandable + list(expanded))), key="lod_expanded",
+        format_func=lambda owner: owner or "(more top-level issues)",
+        help="Show the children of these folded issues even if they go over the limit.",
+    )
+
+canvas_key = (display_fp, st.session_state.mindmap_focus, node_budget, expanded)
+elements = st.session_state.canvas_cache.get(canvas_key)
+if elements is None:
+    if view_df is display_df:
+        view_graph = IssueGraph.from_frame(display_df) if st.session_state.mindmap_focus else get_issue_graph(display_df)
+    else:
+        view_graph = IssueGraph.from_frame(view_df)
+    # Positions only depend on the hierarchy, so edits to summaries or links reuse them.
+    layout_key = frame_fingerprint(view_df, ["ID", "Parent ID"])
+    positions = st.session_state.layout_cache.get(layout_key)
+    if positions is None:
+        positions = tree_layout(view_graph)
+        st.session_state.layout_cache.put(layout_key, positions)
+    elements = build_elements(view_df, view_graph, positions)
+    st.session_state.canvas_cache.put(canvas_key, elements)
+profiler.mark("Canvas send")
+mindmap_canvas(elements, elements_key=canvas_key)
 
 # ----------------------------
 # Add Issue
 # ----------------------------
+profiler.mark("Add issue")
 st.sidebar.subheader("Add Issue")
 
 level = st.sidebar.selectbox("Issue Type", options=ISSUE_TYPES, index=2, key="add_level")
@@ -689,6 +824,7 @@ if submit_add and summary.strip():
 # ----------------------------
 # Edit Issue
 # ----------------------------
+profiler.mark("Edit issue")
 st.sidebar.subheader("Edit Issue")
 id_options = [""] + st.session_state.df["ID"].astype(str).tolist()
 if st.session_state.get("edit_id_select") not in id_options:
@@ -709,16 +845,18 @@ if edit_id:
         new_relates_to = st.sidebar.text_input("Relates To (comma-separated IDs)", value=row.iloc[0]["Relates To"], key="edit_relates_to")
 
         if st.sidebar.button("Save Changes"):
-            st.session_state.df.at[idx, "Summary"] = new_summary
-            st.session_state.df.at[idx, "Epic Name"] = new_epic
-            st.session_state.df.at[idx, "Blocks"] = new_blocks
-            st.session_state.df.at[idx, "Relates To"] = new_relates_to
+            # Stripped here so the table stays normalized without another full pass.
+            st.session_state.df.at[idx, "Summary"] = new_summary.strip()
+            st.session_state.df.at[idx, "Epic Name"] = new_epic.strip()
+            st.session_state.df.at[idx, "Blocks"] = new_blocks.strip()
+            st.session_state.df.at[idx, "Relates To"] = new_relates_to.strip()
             st.sidebar.success("Updated")
             st.rerun()
 
 # ----------------------------
 # Delete Issue (with cascade option + confirm)
 # ----------------------------
+profiler.mark("Delete issue")
 st.sidebar.subheader("Delete Issue")
 delete_id_options = [""] + st.session_state.df["ID"].astype(str).tolist()
 if st.session_state.get("delete_id_select") not in delete_id_options:
@@ -752,16 +890,10 @@ if st.session_state.get("pending_delete"):
     if st.sidebar.button("Yes, Delete", key="confirm_delete"):
         df = st.session_state.df.copy()
         if mode == "cascade":
-            to_delete = set([did])
-            found = True
-            while found:
-                found = False
-                children = df[df["Parent ID"].isin(to_delete)]["ID"].tolist()
-                new = [c for c in children if c not in to_delete]
-                if new:
-                    to_delete.update(new)
-                    found = True
-            df = df[~df["ID"].isin(to_delete)].reset_index(drop=True)
+            to_delete = get_issue_graph(df).subtree_rows(did)
+            keep = np.ones(len(df), dtype=bool)
+            keep[to_delete] = False
+            df = df[keep].reset_index(drop=True)
             st.sidebar.success(f"Deleted {len(to_delete)} issues (cascade)")
         else:
             df = df[df["ID"] != did].reset_index(drop=True)
@@ -779,23 +911,37 @@ if st.session_state.get("pending_delete"):
 # ----------------------------
 # Issue Table
 # ----------------------------
+profiler.mark("Issue table")
 st.subheader("Issue Table (editable)")
+
+def _editor_changed():
+    st.session_state.editor_changed = True
+
 edited = st.data_editor(
     st.session_state.df,
     num_rows="dynamic",
     use_container_width=True,
     key="editor",
+    on_change=_editor_changed,
     column_config={
         "Level": st.column_config.SelectboxColumn("Level", options=ISSUE_TYPES),
         "Parent ID": st.column_config.SelectboxColumn("Parent ID", options=[""] + st.session_state.df["ID"].astype(str).tolist()),
         "Jira Key": st.column_config.TextColumn("Jira Key", disabled=True, help="Set automatically after a Push to Jira"),
     }
 )
-st.session_state.df = normalize_df(edited)
+# data_editor hands back a copy of its input (normalized flag included) with the widget's
+# edits applied. Its edits outlive the rerun they were made in when they normalize back to
+# the input (the widget only resets once its data changes) and are re-applied to that same
+# table every rerun, so only a rerun the editor triggered has anything new to normalize.
+if st.session_state.pop("editor_changed", False):
+    st.session_state.df = normalize_df(mark_dirty(edited))
+elif not any((st.session_state.get("editor") or {}).values()):
+    st.session_state.df = normalize_df(edited)
 
 # ----------------------------
 # Legend
 # ----------------------------
+profiler.mark("Legend")
 st.markdown("### Legend")
 legend_md = """
 - **Shapes / Colors**
@@ -818,27 +964,93 @@ st.markdown(legend_md)
 # ----------------------------
 # Export/Import CSV & Excel
 # ----------------------------
+profiler.mark("Export / import")
 st.sidebar.subheader("Export / Import")
 
-csv_bytes = st.session_state.df.to_csv(index=False).encode("utf-8")
-xlsx_buf = io.BytesIO()
-st.session_state.df.to_excel(xlsx_buf, index=False, sheet_name="Issues")
+if "export_cache" not in st.session_state:
+    st.session_state.export_cache = ExportCache()
 
+# Files are only generated when a download button is clicked, not on every rerun.
 ecol1, ecol2 = st.sidebar.columns(2)
 with ecol1:
-    st.download_button("Download CSV", csv_bytes, "mindmap.csv", "text/csv")
+    st.download_button(
+        "Download CSV", partial(st.session_state.export_cache.read, st.session_state.df, "csv"),
+        "mindmap.csv", "text/csv",
+    )
 with ecol2:
     st.download_button(
-        "Download Excel", xlsx_buf.getvalue(), "mindmap.xlsx",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "Download Excel", partial(st.session_state.export_cache.read, st.session_state.df, "xlsx"),
+        "mindmap.xlsx", XLSX_MIME,
     )
 
 file = st.sidebar.file_uploader("Upload CSV or Excel to replace table", type=["csv", "xlsx"])
-if file is not None:
-    if file.name.lower().endswith(".xlsx"):
-        uploaded = pd.read_excel(file, dtype=str)
-    else:
-        uploaded = pd.read_csv(file, dtype=str)
-    st.session_state.df = normalize_df(uploaded)
-    st.sidebar.success(f"Table replaced from {file.name}.")
-    st.rerun()
\ No newline at end of file
+if file is None:
+    st.session_state.ingested_upload = None
+else:
+    # The uploader keeps its file across reruns; only ingest each distinct upload once so
+    # later edits aren't overwritten by re-parsing it.
+    digest = upload_digest(file)
+    if digest != st.session_state.get("ingested_upload"):
+        progress = st.sidebar.progress(0.0, text=f"Reading {file.name}…")
+        st.session_state.ingested_upload = digest
+        try:
+            uploaded, report = read_upload(file, progress=progress.progress)
+        except UploadError as e:
+            progress.empty()
+            st.session_state.upload_report = None
+            st.session_state.upload_error = str(e)
+        else:
+            st.session_state.df = normalize_df(uploaded)
+            st.session_state.upload_error = None
+            st.session_state.upload_report = (
+                f"Table replaced from {file.name}: {report['rows']:,} rows in {report['seconds']:.2f}s ({report['engine']})."
+            )
+            st.rerun()
+    if st.session_state.get("upload_error"):
+        st.sidebar.error(st.session_state.upload_error)
+    if st.session_state.get("upload_report"):
+        st.sidebar.success(st.session_state.upload_report)
+
+# ----------------------------
+# Rerun profile
+# ----------------------------
+profiler.finish({"Issue table": st.session_state.df, "Sync baseline": st.session_state.get("sync_baseline")})
+
+st.sidebar.checkbox(
+    "Profile reruns", key="profile_reruns",
+    help="Time each section of the app on every rerun and show the breakdown below the legend.",
+)
+if st.session_state.profile_reruns:
+    with st.expander("⏱️ Rerun Profile", expanded=True):
+        history = list(profiler.history)
+        if not history:
+            st.caption("Timings appear from the next rerun on.")
+        else:
+            last = history[-1]
+            memory = ", ".join(f"{name} {size / 2 ** 20:.1f} MiB" for name, size in last["memory"].items())
+            st.caption(
+                f"Last rerun: {last['seconds'] * 1000:.0f} ms" + (" (interrupted)" if last["interrupted"] else "")
+                + (f" · {memory}" if memory else "") + f" · {len(history)} rerun(s) kept"
+            )
+            st.dataframe(pd.DataFrame([
+                {
+                    "Section": name, "Last ms": round(latest * 1000, 1), "Mean ms": round(mean * 1000, 1),
+                    "Max ms": round(most * 1000, 1),
+                }
+                for name, (latest, mean, most) in profiler.section_stats().items()
+            ]), hide_index=True)
+            per_run = pd.DataFrame(
+                [{s["name"]: s["seconds"] * 1000 for s in run["sections"]} for run in history],
+                index=pd.Index([run["run"] for run in history], name="Rerun"),
+            ).fillna(0)
+            st.bar_chart(per_run, y_label="ms", height=220)
+            pcol1, pcol2 = st.columns(2)
+            with pcol1:
+                st.download_button(
+                    "Download Chrome Trace", profiler.chrome_trace, "mindmapp-profile.json", "application/json",
+                    help="Open in chrome://tracing or ui.perfetto.dev.",
+                )
+            with pcol2:
+                if st.button("Clear Profile"):
+                    profiler.clear()
+                    st.rerun()
@@ -0,0 +1,99 @@
+import json
+import time
+from collections import deque
+
+# Script runs a session's profiler keeps; older ones are dropped.
+PROFILE_HISTORY = 50
+
+
+class RerunProfiler:
+    """Times the named sections of each run of a top-to-bottom script.
+
+    Call start() at the top of the script, mark(name) where each section begins (it ends the
+    previous one) and finish() at the bottom. Runs that were started while disabled cost one
+    attribute check per mark. A run cut short by st.rerun() or st.stop() never reaches finish();
+    the next start() keeps it, flagged interrupted, with the sections that completed.
+    """
+
+    def __init__(self, history=PROFILE_HISTORY):
+        self.history = deque(maxlen=history)
+        self.runs = 0
+        self._run = None
+        self._section = None  # (name, perf_counter at its start) of the open section
+
+    def start(self, enabled=True):
+        if self._run is not None:
+            self._close(None, interrupted=True)
+        if enabled:
+            self._run = {"started_at": time.time(), "t0": time.perf_counter(), "sections": []}
+
+    def mark(self, name):
+        if self._run is None:
+            return
+        now = time.perf_counter()
+        self._end_section(now)
+        self._section = (name, now)
+
+    def finish(self, frames=None):
+        """Ends the run; frames maps names to DataFrames whose memory footprint it records."""
+        if self._run is not None:
+            self._close(time.perf_counter(), frames=frames)
+
+    def _end_section(self, now):
+        if self._section is not None:
+            name, begun = self._section
+            self._run["sections"].append((name, begun - self._run["t0"], now - begun))
+            self._section = None
+
+    def _close(self, now, interrupted=False, frames=None):
+        run, sections = self._run, self._run["sections"]
+        if now is None:
+            # Where the run stopped isn't known: drop the open section, end at the last closed one.
+            self._section = None
+            total = sections[-1][1] + sections[-1][2] if sections else 0.0
+        else:
+            self._end_section(now)
+            total = now - run["t0"]
+        self.runs += 1
+        self.history.append({
+            "run": self.runs, "started_at": run["started_at"], "seconds": total, "interrupted": interrupted,
+            "sections": [{"name": name, "offset": offset, "seconds": seconds} for name, offset, seconds in sections],
+            "memory": {
+                name: int(df.memory_usage(deep=True).sum()) for name, df in (frames or {}).items() if df is not None
+            },
+        })
+        self._run = None
+
+    def clear(self):
+        self.history.clear()
+
+    def section_stats(self):
+        """{section: (last, mean, max) seconds} over the history, in script order."""
+        times = {}
+        for run in self.history:
+            for s in run["sections"]:
+                times.setdefault(s["name"], []).append(s["seconds"])
+        return {name: (t[-1], sum(t) / len(t), max(t)) for name, t in times.items()}
+
+    def chrome_trace(self):
+        """The history in Chrome's trace event format, for chrome://tracing or Perfetto.
+
+        Each run is a complete ("X") event with its sections nested inside, on a timeline in
+        microseconds from the first run; memory footprints are counter ("C") events.
+        """
+        origin = self.history[0]["started_at"] if self.history else 0.0
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "Mindmapp"}}]
+        for run in self.history:
+            ts = (run["started_at"] - origin) * 1e6
+            events.append({
+                "name": f"rerun {run['run']}" + (" (interrupted)" if run["interrupted"] else ""), "cat": "rerun",
+                "ph": "X", "pid": 1, "tid": 1, "ts": ts, "dur": run["seconds"] * 1e6,
+            })
+            for s in run["sections"]:
+                events.append({
+                    "name": s["name"], "cat": "section", "ph": "X", "pid": 1, "tid": 1,
+                    "ts": ts + s["offset"] * 1e6, "dur": s["seconds"] * 1e6,
+                })
+            if run["memory"]:
+                events.append({"name": "DataFrame bytes", "ph": "C", "pid": 1, "ts": ts, "args": run["memory"]})
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
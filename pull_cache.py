@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+# Pull results older than this (seconds) are fetched again instead of shared.
+PULL_CACHE_TTL = 900
+# Memory the shared pull results may hold in total; least recently used ones go first.
+PULL_CACHE_MAX_BYTES = 512 * 1024 ** 2
+# How often (seconds) a caller waiting on another's load calls its on_wait.
+WAIT_POLL = 1.0
+
+
+def pull_cache_key(site, account, jql, type_map, schema):
+    """Key of a pull: the same JQL on the same site by the same Jira account, mapped with the
+    same type map and schema.
+
+    account must come from an authenticated request (JiraClient.account_id), so a session only
+    gets results its own credentials were allowed to pull.
+    """
+    return (
+        site.rstrip("/"), account, jql.strip(),
+        json.dumps(type_map, sort_keys=True), json.dumps(schema, sort_keys=True),
+    )
+
+
+def _nbytes(result):
+    size = int(result["df"].memory_usage(deep=True).sum())
+    if result.get("baseline") is not None:
+        size += int(result["baseline"].memory_usage(deep=True).sum())
+    return size
+
+
+def pull_view(result):
+    """A session's own copy of a shared pull result.
+
+    The frames are shallow copies: with pandas' copy-on-write (always on from pandas 3, which
+    requirements.txt asks for) they share the cached data until the session edits them, and
+    only the edited columns are copied then. The link index is
+    small and edited in place by pushes, so it is copied outright.
+    """
+    return dict(
+        result,
+        df=result["df"].copy(deep=False),
+        links=dict(result["links"]),
+        baseline=result["baseline"].copy(deep=False) if result.get("baseline") is not None else None,
+    )
+
+
+class SharedPullCache:
+    """Process-wide cache of pull results, shared by every session of the app.
+
+    Values are dicts with at least "df" (normalized issue table), "links" and "baseline"; hand
+    them to a session through pull_view(). Entries expire after `ttl` seconds and the least
+    recently used ones are evicted to stay within `max_bytes`. Concurrent loads of the same key
+    are collapsed into one: later callers wait for the first one's result.
+    """
+
+    def __init__(self, ttl=PULL_CACHE_TTL, max_bytes=PULL_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored at, bytes, value)
+        self._loading = {}  # key -> Future of the load in progress
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key):
+        """(value, age in seconds) if a fresh result is cached, else None."""
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[2], time.time() - entry[0]
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (time.time(), size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def get_or_load(self, key, load, refresh=False, on_wait=None):
+        """(value, shared): the cached value, or load()'s result, cached.
+
+        refresh skips the cached value, though not a load already running. shared is True when
+        the value came from the cache or from a load another caller started. on_wait, if given,
+        is called every WAIT_POLL seconds while waiting on such a load, and may raise to stop
+        waiting. If that load fails, this caller loads itself.
+        """
+        while True:
+            with self._lock:
+                entry = None if refresh else self._fresh(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[2], True
+                future = self._loading.get(key)
+                owner = future is None
+                if owner:
+                    self.misses += 1
+                    future = self._loading[key] = Future()
+            if owner:
+                break
+            try:
+                while True:
+                    if on_wait:
+                        on_wait()
+                    try:
+                        return future.result(timeout=WAIT_POLL), True
+                    except FutureTimeout:
+                        pass
+            except Exception as e:
+                if not future.done() or future.exception() is not e:
+                    raise
+                refresh = False  # the other load failed (or was cancelled): try again ourselves
+
+        try:
+            value = load()
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            future.set_exception(e)
+            raise
+        self.put(key, value)
+        with self._lock:
+            self._loading.pop(key, None)
+        future.set_result(value)
+        return value, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "loading": len(self._loading),
+            }
+
+
+_pull_cache = None
+_pull_cache_lock = threading.Lock()
+
+
+def get_pull_cache():
+    global _pull_cache
+    with _pull_cache_lock:
+        if _pull_cache is None:
+            _pull_cache = SharedPullCache()
+        return _pull_cache
@@ -0,0 +1,181 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from issue_table import normalize_df
+from jira_sync import pull_from_jira, pull_subtree_from_jira, push_to_jira, sync_baseline
+from pull_cache import get_pull_cache, pull_view
+
+# Jobs are few and mostly wait on Jira; each runs its own request pool where it needs one.
+JOB_WORKERS = 4
+# Finished jobs nobody collected (e.g. their browser tab was closed) are dropped after this long.
+JOB_RETENTION = 3600
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by SyncJob.checkpoint once cancel() was requested."""
+
+
+class SyncJob:
+    """One Jira operation running on the JobRunner, with progress the UI can poll.
+
+    The job's function gets the job as its first argument and reports through report() or
+    checkpoint(). status goes from "running" to "done", "failed" or "cancelled"; result and
+    error are set when it leaves "running". owner identifies who may attach to the job from
+    another session, e.g. the (site, account ID) whose credentials started it.
+    """
+
+    def __init__(self, kind, client=None, owner=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.client = client
+        self.owner = owner
+        self.status = "running"
+        self.result = None
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        self._progress = {"done": 0, "total": None, "unit": "issues", "stage": ""}
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    def report(self, done=None, total=None, **info):
+        with self._lock:
+            if done is not None:
+                self._progress["done"] = done
+            if total is not None:
+                self._progress["total"] = total
+            self._progress.update(info)
+
+    def checkpoint(self, done=None, total=None, **info):
+        """report(), then stop the job if it was cancelled."""
+        self.report(done, total, **info)
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def snapshot(self):
+        """Progress plus status, elapsed seconds, requests sent so far and an ETA when the total is known."""
+        with self._lock:
+            progress = dict(self._progress)
+        elapsed = (self.finished or time.time()) - self.started
+        done, total = progress["done"], progress["total"]
+        progress.update(
+            status=self.status,
+            elapsed=elapsed,
+            requests=self.client.transport_stats()["requests"] if self.client is not None else None,
+            fraction=min(done / total, 1.0) if total else None,
+            eta=elapsed / done * (total - done) if total and done and self.status == "running" else None,
+        )
+        return progress
+
+
+class JobRunner:
+    """Process-wide executor for SyncJobs, so a job outlives the Streamlit rerun (and browser
+    session) that started it."""
+
+    def __init__(self, max_workers=JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mindmapp-sync")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, client=None, owner=None, **kwargs):
+        job = SyncJob(kind, client, owner)
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job, fn, args, kwargs):
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:  # reported to the UI instead of dying with the worker thread
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _expire(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
+
+
+# ----------------------------
+# Job functions: run on the JobRunner, return what the UI applies to the session when done
+# ----------------------------
+def pull_job(job, client, jql, type_map, schema, shared_key=None, **cache_options):
+    """Pull jql; with a shared_key, through the process-wide pull cache, so sessions pulling the
+    same thing at once share one download. Returns the session's own view of the result."""
+    def load():
+        job.report(stage="Downloading issues")
+        df, links, stats = pull_from_jira(
+            client, jql, type_map, schema, on_progress=lambda n: job.checkpoint(n), **cache_options
+        )
+        df = normalize_df(df)
+        return {"df": df, "links": links, "stats": stats, "baseline": sync_baseline(df), "pulled_at": time.time()}
+
+    if shared_key is None:
+        return dict(load(), shared=False)
+    result, shared = get_pull_cache().get_or_load(
+        shared_key, load, refresh=cache_options.get("full_refresh", False),
+        on_wait=lambda: job.checkpoint(stage="Waiting for the same pull in another session"),
+    )
+    return dict(pull_view(result), shared=shared)
+
+
+def subtree_job(job, client, root_key, type_map, schema):
+    job.report(stage=f"Crawling {root_key}")
+    df, links, levels = pull_subtree_from_jira(
+        client, root_key, type_map, schema,
+        on_level=lambda s: job.checkpoint(s["issues"], stage=f"Level {s['level']}: {s['children']} new issue(s)"),
+    )
+    return {"root_key": root_key, "df": df, "links": links, "levels": levels}
+
+
+def push_job(job, client, project_key, df, type_map, schema, total, **options):
+    # Not cancelled through checkpoint: issues created so far must still come back with their
+    # keys, so push_to_jira polls cancel_requested between bulk batches and returns early
+    # instead. It returns early the same way on an unexpected error, rather than raising.
+    created = [0]
+
+    def on_layer(stats):
+        created[0] += stats["created"]
+        job.report(created[0], stage=f"Layer {stats['layer']}: created {stats['created']}/{stats['issues']}")
+
+    job.report(0, total, stage="Creating issues")
+    result = push_to_jira(
+        client, project_key, df, type_map, schema, on_layer=on_layer, should_stop=job.cancel_requested, **options
+    )
+    return dict(zip(("df", "created", "updated", "errors", "report"), result))
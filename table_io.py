@@ -0,0 +1,226 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import zipfile
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from issue_graph import frame_fingerprint
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pandas' C parser is used instead
+    pa = None
+
+EXPORT_CHUNK_ROWS = 5000
+INGEST_CHUNK_ROWS = 50_000
+INGEST_BLOCK_BYTES = 4 << 20
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def iter_csv_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """df as UTF-8 CSV bytes, chunk_rows rows at a time, header first."""
+    if df.empty:
+        yield df.to_csv(index=False).encode("utf-8")
+        return
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def write_csv(df, out):
+    for chunk in iter_csv_chunks(df):
+        out.write(chunk)
+
+
+def write_xlsx(df, out, sheet_name="Issues"):
+    """Write df through a write-only workbook, which streams rows instead of building a sheet in memory."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append([str(c) for c in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        ws.append([str(v) for v in row])
+    wb.save(out)
+
+
+EXPORT_WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+class ExportCache:
+    """Export files built only when a download is requested, reused while the table is unchanged.
+
+    Files are kept on disk rather than in memory, one per format, and only read back for the
+    download itself. download_button runs its data callable on a separate thread, hence the lock.
+    """
+
+    def __init__(self):
+        self._files = {}  # format -> (table fingerprint, path)
+        self._lock = threading.Lock()
+
+    def read(self, df, fmt):
+        """The export of df in fmt, as bytes."""
+        key = frame_fingerprint(df)
+        with self._lock:
+            cached = self._files.get(fmt)
+            if cached is None or cached[0] != key or not os.path.exists(cached[1]):
+                if cached:
+                    _remove(cached[1])
+                fd, path = tempfile.mkstemp(prefix="mindmapp-export-", suffix=f".{fmt}")
+                with os.fdopen(fd, "wb") as out:
+                    EXPORT_WRITERS[fmt](df, out)
+                self._files[fmt] = (key, path)
+            with open(self._files[fmt][1], "rb") as f:
+                return f.read()
+
+    def clear(self):
+        with self._lock:
+            for _, path in self._files.values():
+                _remove(path)
+            self._files.clear()
+
+    def __del__(self):
+        self.clear()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ----------------------------
+# Upload ingestion
+# ----------------------------
+def upload_digest(file):
+    """Content hash of an uploaded file, read in blocks; leaves the file rewound."""
+    h = hashlib.blake2b(digest_size=16)
+    file.seek(0)
+    for block in iter(lambda: file.read(INGEST_BLOCK_BYTES), b""):
+        h.update(block)
+    file.seek(0)
+    return h.hexdigest()
+
+
+class UploadError(Exception):
+    """An uploaded file could not be parsed as a table."""
+
+
+def _header_names(header):
+    """Unique column names for a header row, named the way pandas' readers name them.
+
+    Blank headers become "Unnamed: <position>" and repeats get ".1", ".2", … suffixes, skipping
+    any suffixed name the header already has.
+    """
+    names = [f"Unnamed: {i}" if h is None or str(h) == "" else str(h) for i, h in enumerate(header)]
+    taken = set(names)
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        col = name
+        while count > 0:
+            counts[name] = count + 1
+            col = f"{name}.{count}"
+            count = count + 1 if col in taken else counts.get(col, 0)
+        names[i] = col
+        counts[col] = count + 1
+    return names
+
+
+def _iter_csv_chunks_arrow(file):
+    # The first open only learns the header; the second reads the rows under unique names, with
+    # every column forced to string so IDs like "007" aren't inferred as numbers.
+    names = _header_names(
+        pa_csv.open_csv(file, read_options=pa_csv.ReadOptions(block_size=INGEST_BLOCK_BYTES)).schema.names
+    )
+    file.seek(0)
+    reader = pa_csv.open_csv(
+        file,
+        read_options=pa_csv.ReadOptions(block_size=INGEST_BLOCK_BYTES, column_names=names, skip_rows=1),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in names}, strings_can_be_null=True,
+        ),
+    )
+    # Arrow buffers the file ahead of the batches, so estimate progress from decoded bytes.
+    size, decoded = getattr(file, "size", None), 0
+    for batch in reader:
+        decoded += batch.nbytes
+        yield batch.to_pandas(), min(decoded / size, 0.99) if size else 0.0
+
+
+def _iter_csv_chunks_pandas(file):
+    for chunk in pd.read_csv(file, dtype=str, chunksize=INGEST_CHUNK_ROWS, engine="c"):
+        yield chunk, _file_fraction(file)
+
+
+def _iter_xlsx_chunks(file):
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        total = (ws.max_row or 0) - 1
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        buf, done = [], 0
+        for row in rows:
+            buf.append(row)
+            if len(buf) >= INGEST_CHUNK_ROWS:
+                done += len(buf)
+                yield pd.DataFrame(buf, columns=columns, dtype=object), min(done / total, 1.0) if total > 0 else 0.0
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=columns, dtype=object), 1.0
+    finally:
+        wb.close()
+
+
+def _file_fraction(file):
+    size = getattr(file, "size", None)
+    return min(file.tell() / size, 1.0) if size else 0.0
+
+
+def read_upload(file, progress=None):
+    """Parse an uploaded CSV/XLSX chunk by chunk; returns (DataFrame, report).
+
+    Cells come back as read (strings, or whatever the workbook holds, with missing ones as
+    NaN / None): normalize_df blanks and strips them in one pass over the whole table.
+
+    progress, if given, is called as progress(fraction, text) after every chunk. Raises
+    UploadError when the file isn't a readable table.
+    """
+    try:
+        return _read_upload(file, progress)
+    except (ValueError, KeyError, OSError, zipfile.BadZipFile, InvalidFileException) as e:
+        # pyarrow's ArrowInvalid and pandas' ParserError are ValueErrors; openpyxl raises
+        # KeyError / BadZipFile for workbooks it can't open.
+        raise UploadError(f"Could not read {file.name}: {e}") from e
+
+
+def _read_upload(file, progress):
+    started = time.perf_counter()
+    if file.name.lower().endswith(".xlsx"):
+        engine, chunks = "openpyxl read-only", _iter_xlsx_chunks(file)
+    elif pa is not None:
+        engine, chunks = "pyarrow", _iter_csv_chunks_arrow(file)
+    else:
+        engine, chunks = "pandas", _iter_csv_chunks_pandas(file)
+
+    parts, rows = [], 0
+    file.seek(0)
+    for chunk, done in chunks:
+        parts.append(chunk)
+        rows += len(chunk)
+        if progress is not None:
+            progress(done, f"Read {rows:,} rows…")
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    if progress is not None:
+        progress(1.0, f"Read {rows:,} rows")
+    return df, {"rows": rows, "seconds": time.perf_counter() - started, "engine": engine}
@@ -0,0 +1,71 @@
+"""The row-scanning helpers mindmapp.py used before IssueGraph and DataValidator, kept as
+reference implementations for the tests."""
+
+
+def descendant_ids(df, root_id):
+    """IDs of root_id and everything under it via Parent ID, BFS style."""
+    result = {root_id}
+    found = True
+    while found:
+        found = False
+        children = df[df["Parent ID"].isin(result)]["ID"].tolist()
+        new = [c for c in children if c not in result]
+        if new:
+            result.update(new)
+            found = True
+    return result
+
+
+def find_data_issues(df):
+    """Dangling references and parent cycles, as human-readable messages."""
+    ids = set(df["ID"])
+    issues = []
+    for _, r in df.iterrows():
+        if r["Parent ID"] and r["Parent ID"] not in ids:
+            issues.append(f"{r['ID']}: Parent ID '{r['Parent ID']}' does not exist")
+        for b in [x.strip() for x in r["Blocks"].split(",") if x.strip()]:
+            if b not in ids:
+                issues.append(f"{r['ID']}: Blocks references '{b}', which does not exist")
+        for rel in [x.strip() for x in r["Relates To"].split(",") if x.strip()]:
+            if rel not in ids:
+                issues.append(f"{r['ID']}: Relates To references '{rel}', which does not exist")
+
+    parent_of = dict(zip(df["ID"], df["Parent ID"]))
+    reported_cycles = set()
+    for start in df["ID"]:
+        chain = [start]
+        seen = {start}
+        cur = start
+        while parent_of.get(cur):
+            cur = parent_of[cur]
+            if cur in seen:
+                cycle_key = frozenset(chain[chain.index(cur):] + [cur])
+                if cycle_key not in reported_cycles:
+                    reported_cycles.add(cycle_key)
+                    issues.append(f"Parent cycle: {' -> '.join(chain[chain.index(cur):] + [cur])}")
+                break
+            chain.append(cur)
+            seen.add(cur)
+    return issues
+
+
+def edges(df):
+    """(relation, source, target) of every edge the canvas drew, in the old scan's order."""
+    result = []
+    valid_ids = set(df["ID"])
+    seen_relates = set()
+    for _, r in df.iterrows():
+        node_id = r["ID"]
+        parent_id = r["Parent ID"].strip()
+        if parent_id and parent_id in valid_ids:
+            result.append(("hierarchy", parent_id, node_id))
+        for blocked in [b.strip() for b in str(r["Blocks"]).split(",") if b.strip()]:
+            if blocked in valid_ids:
+                result.append(("blocks", node_id, blocked))
+        for related in [b.strip() for b in str(r["Relates To"]).split(",") if b.strip()]:
+            if related in valid_ids:
+                pair = frozenset((node_id, related))
+                if pair not in seen_relates:
+                    seen_relates.add(pair)
+                    result.append(("relates", node_id, related))
+    return result
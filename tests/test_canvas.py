@@ -0,0 +1,63 @@
+import base64
+import json
+import zlib
+
+import pytest
+
+from benchmarks.synthetic import synthetic_hierarchy
+from canvas import LINK_COUNTS_ATTR, RELATIONS, build_elements, encode_elements
+from issue_graph import IssueGraph
+from issue_table import normalize_df
+from layout import tree_layout
+
+
+def _decode(payload):
+    """build_elements output back from an encoded payload, as canvas_frontend/main.js decodes it."""
+    if "z" in payload:
+        payload = json.loads(zlib.decompress(base64.b64decode(payload["z"])))
+    ids = payload["ids"]
+    elements = []
+    for i in range(payload["n"]):
+        node = {"data": {"id": ids[i], "label": payload["labels"][i]}, "classes": payload["classes"][payload["cls"][i]]}
+        if "x" in payload:
+            node["position"] = {"x": payload["x"][i], "y": payload["y"][i]}
+        elements.append(node)
+    for i, (s, t, r) in enumerate(zip(payload["src"], payload["dst"], payload["rel"])):
+        source, target, relation = ids[s], ids[t], RELATIONS[r]
+        data = {"id": f"{relation}:{source}->{target}", "source": source, "target": target, "relation": relation}
+        if payload.get("cnt") and payload["cnt"][i]:
+            data["count"] = payload["cnt"][i]
+        elements.append({"data": data})
+    return elements
+
+
+def _rounded(elements):
+    for el in elements:
+        if "position" in el:
+            el["position"] = {k: round(v) for k, v in el["position"].items()}
+    return elements
+
+
+@pytest.fixture(scope="module")
+def df():
+    return normalize_df(synthetic_hierarchy(400, seed=11, blocks=0.2, relates=0.1))
+
+
+@pytest.mark.parametrize("compress_min_bytes", [0, 10 ** 9])
+def test_round_trip(df, compress_min_bytes):
+    elements = build_elements(df)
+    payload = encode_elements(elements, compress_min_bytes=compress_min_bytes)
+    assert ("z" in payload) == (compress_min_bytes == 0)
+    assert _decode(payload) == elements
+
+
+def test_round_trip_with_positions_and_counts(df):
+    df = df.copy()
+    df.attrs[LINK_COUNTS_ATTR] = {
+        ("blocks", s, t): 3 for s, t in zip(df["ID"], df["Blocks"]) if t and "," not in t
+    }
+    graph = IssueGraph.from_frame(df)
+    x, y = tree_layout(graph)
+    elements = build_elements(df, graph, positions=(x + 0.4, y))
+    assert any("count" in el["data"] for el in elements)
+    assert _decode(encode_elements(elements)) == _rounded(elements)
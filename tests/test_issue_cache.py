@@ -0,0 +1,58 @@
+import pytest
+
+from issue_cache import IssueCache
+from jira_client import JiraClient
+from jira_stub import StubJira
+from jira_sync import pull_from_jira, updated_since_jql
+
+TYPE_MAP = {"Epic": "Epic", "Story": "Story", "Task": "Task"}
+JQL = "project = STUB ORDER BY key"
+
+
+@pytest.fixture
+def stub():
+    with StubJira() as stub:
+        for i in range(3):
+            stub.add_issue(f"story {i}")
+        yield stub
+
+
+def _pull(client, cache, account="acct-1", **options):
+    return pull_from_jira(client, JQL, TYPE_MAP, {}, cache=cache, site=client.base_url,
+                          account=account, project="STUB", **options)
+
+
+def test_updated_since_jql_keeps_the_order_by():
+    assert updated_since_jql(JQL, 0) == '(project = STUB) AND updated >= "-5m" ORDER BY key'
+    assert updated_since_jql("", 3600) == 'updated >= "-65m"'
+
+
+def test_second_pull_fetches_only_updated_issues(stub, tmp_path):
+    cache = IssueCache(str(tmp_path / "issues.sqlite3"))
+    client = JiraClient(stub.url, email="x", api_token="x")
+    df, _, stats = _pull(client, cache)
+    assert stats == {"fetched": 3, "cached": 3, "incremental": False}
+
+    for key in stub.issues:  # as if the first pull was an hour ago
+        stub._updated[key] -= 3600
+    client.update_issue_summary("STUB-2", "renamed")
+    df, _, stats = _pull(client, cache)
+    assert stats == {"fetched": 1, "cached": 3, "incremental": True}
+    assert list(df["ID"]) == ["STUB-1", "STUB-2", "STUB-3"]
+    assert df.set_index("ID").loc["STUB-2", "Summary"] == "renamed"
+
+    _, _, stats = _pull(client, cache, full_refresh=True)
+    assert stats == {"fetched": 3, "cached": 3, "incremental": False}
+
+
+def test_scopes_are_per_account(stub, tmp_path):
+    cache = IssueCache(str(tmp_path / "issues.sqlite3"))
+    client = JiraClient(stub.url, email="x", api_token="x")
+    _pull(client, cache, account="acct-1")
+    assert cache.last_sync(client.base_url, "acct-2", "STUB", JQL) is None
+    assert list(cache.issues(client.base_url, "acct-2", "STUB", JQL)) == []
+    _, _, stats = _pull(client, cache, account="acct-2")
+    assert not stats["incremental"] and stats["fetched"] == 3
+
+    cache.clear(site=client.base_url)
+    assert cache.last_sync(client.base_url, "acct-1", "STUB", JQL) is None
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import scan_helpers
+from benchmarks.synthetic import synthetic_hierarchy
+from issue_graph import IssueGraph
+from issue_table import normalize_df
+
+
+@pytest.fixture(scope="module")
+def df():
+    return normalize_df(synthetic_hierarchy(600, seed=5, cycles=3, dangling=10))
+
+
+def test_descendant_ids_match_scan(df):
+    graph = IssueGraph.from_frame(df)
+    for root in [*df["ID"].iloc[::37], "MISSING"]:
+        assert graph.descendant_ids(root) == scan_helpers.descendant_ids(df, root)
+
+
+def test_edges_match_scan(df):
+    graph = IssueGraph.from_frame(df)
+    child = np.flatnonzero(graph.parent >= 0)
+    got = [("hierarchy", p, c) for p, c in zip(graph.ids[graph.parent[child]], graph.ids[child])]
+    got += [("blocks", s, t) for s, t in zip(*(graph.ids[e] for e in graph.blocks_edges()))]
+    got += [("relates", s, t) for s, t in zip(*(graph.ids[e] for e in graph.relates_edges()))]
+    assert sorted(got) == sorted(scan_helpers.edges(df))
+
+
+def test_parent_cycles_match_scan(df):
+    graph = IssueGraph.from_frame(df)
+    cycles = [f"Parent cycle: {' -> '.join(graph.ids[c])}" for c in graph.parent_cycles()]
+    assert cycles == [m for m in scan_helpers.find_data_issues(df) if m.startswith("Parent cycle")]
+    assert len(cycles) == 3
+
+
+def test_duplicate_ids_rejected(df):
+    with pytest.raises(ValueError):
+        IssueGraph.from_frame(df.iloc[[0, 0]])
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from issue_table import ISSUE_COLUMNS, ISSUE_TYPES, NORMALIZED_ATTR, mark_dirty, normalize_df
+
+
+def test_cleans_dedupes_and_adds_columns():
+    raw = pd.DataFrame({
+        "ID": [" UC1 ", "E1", "", "UC1", np.nan, "S1"],
+        "Level": ["Use-Case", " Epic", "Task", "Story", "Task", "Custom"],
+        "Summary": ["  login ", np.nan, "blank id", "duplicate", "no id", 3],
+        "Parent ID": ["", "UC1 ", "", "", "", "E1"],
+        "Blocks": ["", " S1", "", "", "", ""],
+    }, index=[10, 11, 12, 13, 14, 15])
+    df = normalize_df(raw)
+    assert list(df.columns) == ["ID", "Level", "Summary", "Parent ID", "Blocks", "Epic Name", "Relates To", "Jira Key"]
+    assert set(df.columns) == set(ISSUE_COLUMNS)
+    assert df.index.tolist() == [10, 11, 15]
+    assert df["ID"].tolist() == ["UC1", "E1", "S1"]
+    assert df["Summary"].tolist() == ["login", "", "3"]
+    assert df["Parent ID"].tolist() == ["", "UC1", "E1"] and df["Blocks"].tolist() == ["", "S1", ""]
+    assert (df["Jira Key"] == "").all()
+    assert list(df["Level"].cat.categories) == ISSUE_TYPES + ["Custom"]
+    assert df.attrs[NORMALIZED_ATTR]
+
+
+def test_normalized_frames_are_returned_as_is():
+    df = normalize_df(pd.DataFrame({"ID": ["A", "B"], "Level": ["Epic", "Task"]}))
+    assert normalize_df(df) is df
+    copy = df.copy()
+    assert normalize_df(copy) is copy  # attrs travel with copies
+
+
+def test_mark_dirty_forces_a_new_pass():
+    df = normalize_df(pd.DataFrame({"ID": ["A", "B"], "Level": ["Epic", "Task"]}))
+    edited = df.copy()
+    edited.loc[edited.index[0], "Summary"] = "  padded  "
+    edited.loc[edited.index[1], "ID"] = "A"
+    assert normalize_df(edited) is edited
+    again = normalize_df(mark_dirty(edited))
+    assert again is not edited and again["ID"].tolist() == ["A"] and again["Summary"].tolist() == ["padded"]
+    assert again.attrs[NORMALIZED_ATTR]
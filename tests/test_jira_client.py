@@ -0,0 +1,126 @@
+import gzip
+import json
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+import jira_client
+from jira_client import MAX_RETRY_AFTER, JiraClient, JiraError, TokenBucket, _received_bytes, _retry_after
+from jira_stub import StubJira
+
+
+def _response(body, headers):
+    r = requests.Response()
+    r.status_code = 200
+    r._content = body
+    r.headers.update(headers)
+    return r
+
+
+def test_received_bytes_counts_the_transfer():
+    body = json.dumps({"pad": "x" * 5000}).encode()
+    compressed = gzip.compress(body)
+    assert _received_bytes(_response(body, {"Content-Length": str(len(compressed)), "Content-Encoding": "gzip"})) == len(compressed)
+    assert _received_bytes(_response(body, {"Transfer-Encoding": "chunked"})) == len(body)
+
+
+def test_metrics_per_endpoint():
+    with StubJira() as stub:
+        client = JiraClient(stub.url, email="x", api_token="x")
+        client.test_connection()
+        client.test_connection()
+    m = client.metrics.snapshot()["GET myself"]
+    assert m["requests"] == 2 and m["errors"] == 0
+    assert m["bytes_received"] == 2 * len(json.dumps({"accountId": "stub", "displayName": "Stub Jira User"}))
+
+
+def test_bulk_create_maps_keys_and_errors_to_local_ids():
+    with StubJira() as stub:
+        client = JiraClient(stub.url, email="x", api_token="x")
+        issues = [(f"L{i}", "Task", "" if i % 40 == 7 else f"task {i}", None) for i in range(120)]
+        issues += [(f"E{i}", "Task", "", None) for i in range(3)]
+        keys, errors = client.create_issues_bulk("STUB", issues, batch_size=50)
+        assert sum(1 for r in stub.requests if r[1] == "issue/bulk") == 3
+        assert set(errors) == {"L7", "L47", "L87", "E0", "E1", "E2"}
+        assert errors["L7"] == "summary: You must specify a summary."
+        assert len(keys) == 117 and not set(keys) & set(errors)
+        # Keys come back in request order, skipping the failed elements.
+        for local_id, key in keys.items():
+            assert stub.issues[key]["fields"]["summary"] == f"task {local_id[1:]}"
+
+
+def test_bulk_create_reports_a_failed_request_for_its_whole_batch():
+    with StubJira(error_rate=1.0) as stub:
+        client = JiraClient(stub.url, email="x", api_token="x", max_retries=0)
+        keys, errors = client.create_issues_bulk("STUB", [("A", "Task", "a", None), ("B", "Task", "b", None)])
+        assert keys == {} and set(errors) == {"A", "B"}
+        assert "failed (500)" in errors["A"]
+
+
+def test_retry_after_parses_deltas_and_dates():
+    assert _retry_after(_response(b"", {"Retry-After": "3"})) == 3.0
+    assert 8 <= _retry_after(_response(b"", {"Retry-After": formatdate(time.time() + 10, usegmt=True)})) <= 10
+    assert _retry_after(_response(b"", {"Retry-After": formatdate(time.time() - 60, usegmt=True)})) == 0.0
+    assert _retry_after(_response(b"", {"Retry-After": "86400"})) == MAX_RETRY_AFTER
+    assert _retry_after(_response(b"", {"Retry-After": "soon"})) is None
+    assert _retry_after(_response(b"", {})) is None and _retry_after(None) is None
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=100, burst=5)
+    started = time.monotonic()
+    assert all(bucket.acquire() == 0 for _ in range(5))
+    waited = sum(bucket.acquire() for _ in range(10))
+    assert waited > 0.05 and time.monotonic() - started >= 0.09
+
+
+def test_throttled_requests_are_retried():
+    with StubJira(throttle_rate=0.3, retry_after=0, seed=3) as stub:
+        client = JiraClient(stub.url, email="x", api_token="x", rate_limit=None)
+        for _ in range(20):
+            client.test_connection()
+    throttled = sum(status == 429 for _, _, status in stub.requests)
+    stats = client.transport_stats()
+    assert throttled and stats["throttled"] == stats["retries"] == throttled
+    assert stats["requests"] == len(stub.requests) == 20 + throttled
+
+
+def test_server_errors_are_retried_only_when_idempotent(monkeypatch):
+    monkeypatch.setattr(jira_client, "BACKOFF_BASE", 0.001)
+    with StubJira(error_rate=1.0) as stub:
+        client = JiraClient(stub.url, email="x", api_token="x", rate_limit=None, max_retries=2)
+        with pytest.raises(JiraError, match="500"):
+            client.test_connection()
+        assert len(stub.requests) == 3
+        with pytest.raises(JiraError, match="500"):
+            client.create_issue("STUB", "Task", "once")
+        assert len(stub.requests) == 4 and stub.requests[-1][:2] == ("POST", "issue")
+    assert client.transport_stats()["retries"] == 2
+
+
+def _search_requests(stub):
+    return [(path, status) for method, path, status in stub.requests if path.startswith("search")]
+
+
+def test_token_paging_follows_the_cursor():
+    with StubJira() as stub:
+        keys = [stub.add_issue(f"issue {i}") for i in range(25)]
+        client = JiraClient(stub.url, email="x", api_token="x")
+        assert [i["key"] for i in client.search_issues("project = STUB", page_size=10)] == keys
+        assert _search_requests(stub) == [("search/jql", 200)] * 3
+        assert [i["key"] for i in client.search_issues("project = STUB", max_results=15, page_size=10)] == keys[:15]
+        assert len(_search_requests(stub)) == 5
+    assert client.search_mode == "token"
+
+
+def test_offset_paging_after_a_404():
+    with StubJira(search_api="offset") as stub:
+        keys = [stub.add_issue(f"issue {i}") for i in range(25)]
+        client = JiraClient(stub.url, email="x", api_token="x")
+        assert [i["key"] for i in client.search_issues("project = STUB", page_size=10)] == keys
+        assert client.search_mode == "offset"
+        assert _search_requests(stub) == [("search/jql", 404)] + [("search", 200)] * 3
+        assert [i["key"] for i in client.search_issues("project = STUB", max_results=15, page_size=4)] == keys[:15]
+        assert _search_requests(stub)[4:] == [("search", 200)] * 4
@@ -0,0 +1,146 @@
+import pandas as pd
+import pytest
+
+from issue_table import ISSUE_COLUMNS, ISSUE_TYPES, normalize_df
+from jira_client import JiraClient
+from jira_stub import StubJira
+from jira_sync import pending_updates, pull_from_jira, push_to_jira, sync_baseline
+
+TYPE_MAP = {level: level for level in ISSUE_TYPES}
+
+
+def _new_rows(prefix, n):
+    return pd.DataFrame([dict(zip(ISSUE_COLUMNS, [f"{prefix}{i}", "Task", f"{prefix} {i}", "", "", "", "", ""]))
+                         for i in range(n)])
+
+
+@pytest.fixture
+def stub():
+    with StubJira() as stub:
+        for i in range(3):
+            stub.add_issue(f"story {i}", "Story")
+        yield stub
+
+
+@pytest.fixture
+def pulled(stub):
+    client = JiraClient(stub.url, email="x", api_token="x")
+    df, _, _ = pull_from_jira(client, f"project = {stub.project}", TYPE_MAP, {})
+    df = normalize_df(df)
+    return client, df, sync_baseline(df)
+
+
+def test_cancelled_push_keeps_created_keys_and_unsent_updates(stub, pulled):
+    client, df, baseline = pulled
+    df = df.copy()
+    df.loc[df["Jira Key"] == "STUB-1", "Summary"] = "changed"
+    df = normalize_df(pd.concat([df, _new_rows("N", 250)], ignore_index=True))
+    polls = []
+
+    def should_stop():
+        polls.append(1)
+        return len(polls) > 2
+
+    out, created, updated, errors, report = push_to_jira(
+        client, stub.project, df, TYPE_MAP, {}, baseline=baseline, concurrency=1, should_stop=should_stop,
+    )
+    assert report["cancelled"] and report["error"] is None
+    assert 0 < created < 250 and updated == 0
+    assert (out["Jira Key"] != "").sum() == 3 + created
+    assert set(report["created_keys"].values()) <= set(stub.issues)
+    # The update was never sent, so the next push still sees it.
+    assert pending_updates(out, report["baseline"], {}) == {"STUB-1": {"summary": "changed"}}
+
+    out, created_next, updated, errors, report = push_to_jira(
+        client, stub.project, out, TYPE_MAP, {}, baseline=report["baseline"],
+    )
+    assert not report["cancelled"] and not errors
+    assert created + created_next == 250 and updated == 1
+    assert stub.issues["STUB-1"]["fields"]["summary"] == "changed"
+    assert pending_updates(out, report["baseline"], {}) == {}
+
+
+def test_unexpected_error_stops_the_push(stub, pulled, monkeypatch):
+    client, df, baseline = pulled
+    df = df.copy()
+    df.loc[df["Jira Key"] == "STUB-2", "Summary"] = "changed"
+    df = normalize_df(pd.concat([df, _new_rows("N", 250)], ignore_index=True))
+    create = client.create_issues_bulk
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return create(*args, **kwargs)
+
+    monkeypatch.setattr(client, "create_issues_bulk", flaky)
+    out, created, updated, errors, report = push_to_jira(
+        client, stub.project, df, TYPE_MAP, {}, baseline=baseline, concurrency=1,
+    )
+    assert report["error"] == "boom"
+    assert errors[-1] == "Push stopped by an unexpected error: boom"
+    assert updated == 0 and (out["Jira Key"] != "").sum() == 3 + created
+    assert "STUB-2" in pending_updates(out, report["baseline"], {})
+
+
+def test_children_of_a_failed_parent_are_not_sent(stub, pulled):
+    client, df, baseline = pulled
+    rows = pd.DataFrame([dict(zip(ISSUE_COLUMNS, row)) for row in [
+        ["E1", "Epic", "", "", "", "", "", ""],           # no summary: Jira rejects it
+        ["S1", "Story", "child", "", "E1", "", "", ""],
+        ["T1", "Task", "grandchild", "", "S1", "", "", ""],
+        ["S2", "Story", "typo parent", "", "E9", "", "", ""],
+        ["S3", "Story", "under a synced issue", "", "STUB-1", "", "", ""],
+    ]])
+    df = normalize_df(pd.concat([df, rows], ignore_index=True))
+    before = set(stub.issues)
+
+    out, created, _, errors, report = push_to_jira(client, stub.project, df, TYPE_MAP, {}, baseline=baseline)
+    assert created == 1 and report["created_keys"].keys() == {"S3"}
+    assert set(stub.issues) - before == {report["created_keys"]["S3"]}
+    assert stub.issues[report["created_keys"]["S3"]]["fields"]["parent"] == {"key": "STUB-1"}
+    assert errors == [
+        "S2 (typo parent): parent E9 is not in Jira",
+        "E1 (): summary: You must specify a summary.",
+        "S1 (child): parent E1 was not created",
+        "T1 (grandchild): parent S1 was not created",
+    ]
+
+
+LINK_SCHEMA = {"blocks_link_type": "Blocks", "relates_link_type": "Relates"}
+
+
+def test_links_are_diffed_against_the_pulled_link_index(stub):
+    stub.add_link("Blocks", "STUB-1", "STUB-3")
+    stub.add_link("Relates", "STUB-2", "STUB-1")
+    client = JiraClient(stub.url, email="x", api_token="x")
+    df, link_index, _ = pull_from_jira(client, f"project = {stub.project}", TYPE_MAP, LINK_SCHEMA)
+    df = normalize_df(df)
+    assert df.set_index("ID").loc["STUB-1", "Blocks"] == "STUB-3"
+    assert set(link_index) == {("blocks", "STUB-1", "STUB-3"), ("relates", "STUB-1", "STUB-2")}
+
+    df = df.copy()
+    df.loc[df["ID"] == "STUB-1", "Blocks"] = "STUB-2"
+    kept = dict(link_index)
+    _, _, _, errors, report = push_to_jira(
+        client, stub.project, df, TYPE_MAP, LINK_SCHEMA, baseline=sync_baseline(df), link_index=link_index,
+    )
+    assert not errors and report["links"] == {"created": 1, "skipped": 1, "removed": 0, "failed": 0}
+    assert ("blocks", "STUB-1", "STUB-3") in report["link_index"] and len(stub.links) == 3
+    assert link_index == kept  # the caller's index isn't modified
+
+    out, _, _, errors, report = push_to_jira(
+        client, stub.project, df, TYPE_MAP, LINK_SCHEMA, baseline=sync_baseline(df),
+        link_index=report["link_index"], remove_missing_links=True,
+    )
+    assert not errors and report["links"] == {"created": 0, "skipped": 2, "removed": 1, "failed": 0}
+    assert sorted(stub.links.values()) == [("Blocks", "STUB-1", "STUB-2"), ("Relates", "STUB-2", "STUB-1")]
+    assert set(report["link_index"]) == {("blocks", "STUB-1", "STUB-2"), ("relates", "STUB-1", "STUB-2")}
+
+    sent = len(stub.requests)
+    _, _, _, _, report = push_to_jira(
+        client, stub.project, out, TYPE_MAP, LINK_SCHEMA, baseline=sync_baseline(out),
+        link_index=report["link_index"], remove_missing_links=True,
+    )
+    assert report["links"]["skipped"] == 2 and len(stub.requests) == sent
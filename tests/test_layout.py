@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_hierarchy
+from issue_graph import IssueGraph
+from issue_table import normalize_df
+from layout import X_SPACING, Y_SPACING, tree_layout
+
+
+def _positions(df):
+    graph = IssueGraph.from_frame(df)
+    x, y = tree_layout(graph)
+    return graph, dict(zip(graph.ids, zip(x / X_SPACING, y / Y_SPACING)))
+
+
+def test_parents_are_centred_over_their_leaves():
+    df = normalize_df(pd.DataFrame({
+        "ID": ["E1", "S1", "T1", "T2", "T3", "S2", "T4", "E2", "C1", "C2"],
+        "Parent ID": ["", "E1", "S1", "S1", "S1", "E1", "S2", "", "C2", "C1"],
+    }))
+    _, pos = _positions(df)
+    assert pos == {
+        "E1": (2.0, 0), "E2": (4.5, 0),
+        "S1": (1.5, 1), "S2": (3.5, 1),
+        "T1": (0.5, 2), "T2": (1.5, 2), "T3": (2.5, 2), "T4": (3.5, 2),
+        "C1": (0.5, 3), "C2": (1.5, 3),  # a parent cycle: a last row of its own
+    }
+
+
+def test_rows_follow_depth_without_overlaps():
+    df = normalize_df(synthetic_hierarchy(500, seed=5))
+    graph, pos = _positions(df)
+    x, y = np.array(list(pos.values())).T
+    depth = np.zeros(len(graph))
+    for d, level in enumerate(graph.depth_levels()[0]):
+        depth[level] = d
+    assert (y == depth).all()
+    for row in np.unique(y):
+        xs = np.sort(x[y == row])
+        assert (np.diff(xs) >= 1).all()
+    children = np.flatnonzero(graph.parent >= 0)
+    spans = pd.Series(x[children]).groupby(graph.parent[children]).agg(["min", "max"])
+    assert np.allclose(x[spans.index], x[spans.index].clip(spans["min"], spans["max"]))
+    assert (y[graph.parent[children]] == y[children] - 1).all()
@@ -0,0 +1,49 @@
+import re
+
+import pytest
+
+from benchmarks.synthetic import synthetic_hierarchy
+from canvas import CLUSTER_LEVEL, LINK_COUNTS_ATTR, build_elements
+from issue_graph import IssueGraph
+from issue_table import normalize_df
+from lod import cluster_owner, lod_frame
+
+
+@pytest.fixture(scope="module")
+def df():
+    return normalize_df(synthetic_hierarchy(2000, seed=7, blocks=0.3, relates=0.2))
+
+
+def _elements(frame):
+    elements = build_elements(frame)
+    nodes = [el for el in elements if "source" not in el["data"]]
+    links = [el for el in elements if el["data"].get("relation") in ("blocks", "relates")]
+    return nodes, links
+
+
+@pytest.mark.parametrize("budget", [10, 50, 200, 800])
+def test_frame_fits_the_budget(df, budget):
+    frame, clusters = lod_frame(df, IssueGraph.from_frame(df), budget=budget)
+    nodes, links = _elements(frame)
+    assert len(nodes) + len(links) <= budget
+    assert set(clusters) == set(frame.loc[frame["Level"] == CLUSTER_LEVEL, "ID"])
+
+    # Every issue is either shown or counted by exactly one cluster.
+    hidden = sum(int(re.match(r"\+(\d+)", s).group(1)) for s in frame.loc[frame["Level"] == CLUSTER_LEVEL, "Summary"])
+    assert len(frame) - len(clusters) + hidden == len(df)
+    assert all(count > 1 for count in frame.attrs[LINK_COUNTS_ATTR].values())
+
+
+def test_expanded_clusters_open(df):
+    graph = IssueGraph.from_frame(df)
+    frame, clusters = lod_frame(df, graph, budget=50)
+    owner = next(cluster_owner(c) for c in clusters if cluster_owner(c))
+    opened, _ = lod_frame(df, graph, budget=50, expanded={owner})
+    children = set(df.loc[df["Parent ID"] == owner, "ID"])
+    assert owner in set(opened["ID"]) and children and children <= set(opened["ID"])
+
+
+def test_small_tables_are_not_folded():
+    small = normalize_df(synthetic_hierarchy(30, seed=1))
+    frame, clusters = lod_frame(small, IssueGraph.from_frame(small), budget=1000)
+    assert frame is small and clusters == []
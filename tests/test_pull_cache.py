@@ -0,0 +1,74 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from pull_cache import SharedPullCache, pull_cache_key, pull_view
+
+
+def _result(n=3):
+    df = pd.DataFrame({"ID": [f"S-{i}" for i in range(n)], "Summary": ["x"] * n})
+    return {"df": df, "links": {("blocks", "S-0", "S-1"): "10"}, "baseline": df.copy()}
+
+
+def test_keys_are_per_account_and_normalized():
+    key = pull_cache_key("https://jira.example/", "acct-1", " project = A ", {"Story": "Story"}, {})
+    assert key == pull_cache_key("https://jira.example", "acct-1", "project = A", {"Story": "Story"}, {})
+    assert key != pull_cache_key("https://jira.example", "acct-2", "project = A", {"Story": "Story"}, {})
+
+
+def test_concurrent_loads_are_shared():
+    cache = SharedPullCache()
+    release, calls, results = threading.Event(), [], []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return _result()
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", load))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert cache.get_or_load("k", load)[1] and len(calls) == 1
+    assert cache.get_or_load("k", load, refresh=True)[1] is False and len(calls) == 2
+
+
+def test_failed_load_is_not_cached():
+    cache = SharedPullCache()
+
+    def fails():
+        raise RuntimeError("offline")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("k", fails)
+    value, shared = cache.get_or_load("k", _result)
+    assert not shared and len(value["df"]) == 3
+
+
+def test_views_do_not_change_the_cached_result():
+    cache = SharedPullCache()
+    value, _ = cache.get_or_load("k", _result)
+    view = pull_view(value)
+    view["df"].loc[0, "Summary"] = "edited"
+    view["links"].clear()
+    cached, _ = cache.get("k")
+    assert cached["df"].loc[0, "Summary"] == "x" and cached["links"]
+
+
+def test_entries_expire_and_are_evicted():
+    cache = SharedPullCache(ttl=-1)
+    cache.put("k", _result())
+    assert cache.get("k") is None
+
+    small = _result()
+    size = int(small["df"].memory_usage(deep=True).sum() + small["baseline"].memory_usage(deep=True).sum())
+    cache = SharedPullCache(max_bytes=2 * size)
+    for key in "abc":
+        cache.put(key, _result())
+    assert cache.get("a") is None and cache.get("c") is not None
+    assert cache.stats()["bytes"] <= 2 * size
@@ -0,0 +1,35 @@
+import threading
+
+from sync_jobs import JobRunner
+
+
+def test_jobs_keep_owner_and_result():
+    runner = JobRunner(max_workers=1)
+    job = runner.submit("Pull", lambda job, x: x * 2, 21, owner=("https://jira.example", "acct-1"))
+    runner._pool.shutdown(wait=True)
+    assert runner.get(job.id) is job
+    assert job.owner == ("https://jira.example", "acct-1")
+    assert (job.status, job.result, job.error) == ("done", 42, None)
+
+
+def test_cancel_and_failure_are_reported():
+    runner = JobRunner(max_workers=2)
+    started = threading.Event()
+
+    def waits(job):
+        started.set()
+        while True:
+            job.checkpoint(stage="waiting")
+
+    def fails(job):
+        raise RuntimeError("boom")
+
+    cancelled = runner.submit("Pull", waits)
+    failed = runner.submit("Push", fails)
+    started.wait(5)
+    cancelled.cancel()
+    runner._pool.shutdown(wait=True)
+    assert cancelled.status == "cancelled" and cancelled.snapshot()["stage"] == "waiting"
+    assert (failed.status, failed.error) == ("failed", "boom")
+    runner.discard(failed.id)
+    assert runner.get(failed.id) is None
@@ -0,0 +1,103 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.synthetic import synthetic_hierarchy
+from issue_table import normalize_df
+import table_io
+from table_io import ExportCache, UploadError, _header_names, iter_csv_chunks, read_upload, write_xlsx
+
+
+@pytest.fixture
+def df():
+    return normalize_df(synthetic_hierarchy(300, seed=4))
+
+
+def test_csv_chunks_join_to_one_csv(df):
+    data = b"".join(iter_csv_chunks(df, chunk_rows=64))
+    assert data == df.to_csv(index=False).encode("utf-8")
+
+
+def test_export_cache_reuses_files_until_the_table_changes(df):
+    cache = ExportCache()
+    try:
+        csv = cache.read(df, "csv")
+        assert pd.read_csv(io.BytesIO(csv), dtype=str, keep_default_na=False).equals(df.astype(str).reset_index(drop=True))
+        path = cache._files["csv"][1]
+        assert cache.read(df, "csv") == csv and cache._files["csv"][1] == path
+
+        changed = df.copy()
+        changed.iloc[0, changed.columns.get_loc("Summary")] = "changed"
+        assert cache.read(changed, "csv") != csv
+        assert not os.path.exists(path)
+
+        ws = load_workbook(io.BytesIO(cache.read(df, "xlsx")), read_only=True).worksheets[0]
+        rows = list(ws.iter_rows(values_only=True))
+        assert list(rows[0]) == list(df.columns) and len(rows) == len(df) + 1
+    finally:
+        cache.clear()
+    assert not cache._files
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_export_leaves_no_file_open(df):
+    cache = ExportCache()
+    before = len(os.listdir("/proc/self/fd"))
+    for _ in range(5):
+        cache.read(df, "csv")
+    assert len(os.listdir("/proc/self/fd")) == before
+    cache.clear()
+
+
+class Upload(io.BytesIO):
+    """Stands in for Streamlit's UploadedFile."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def test_header_names_match_pandas():
+    header = ["ID", "", "ID", None, "ID.1", "ID", "Summary"]
+    expected = list(pd.read_csv(io.StringIO(",".join(h or "" for h in header) + "\n")).columns)
+    assert _header_names(header) == expected
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_csv_upload_round_trip(df, monkeypatch, arrow):
+    if not arrow:
+        monkeypatch.setattr(table_io, "pa", None)
+    raw = df.astype(str).copy()
+    raw.iloc[::5, raw.columns.get_loc("Summary")] = "  padded  "
+    raw.iloc[::7, raw.columns.get_loc("Epic Name")] = np.nan
+    raw.iloc[3, raw.columns.get_loc("ID")] = "007"
+    uploaded, report = read_upload(Upload(raw.to_csv(index=False).encode(), "t.csv"))
+    assert report["rows"] == len(raw) and report["engine"] == ("pyarrow" if arrow else "pandas")
+    out = normalize_df(uploaded)
+    assert out["ID"].iat[3] == "007"
+    assert (out["Summary"].iloc[::5] == "padded").all()
+    assert (out["Epic Name"].iloc[::7] == "").all()
+
+
+def test_xlsx_upload_round_trip(df):
+    buf = io.BytesIO()
+    write_xlsx(df, buf)
+    uploaded, report = read_upload(Upload(buf.getvalue(), "t.xlsx"))
+    pd.testing.assert_frame_equal(normalize_df(uploaded).reset_index(drop=True), df.reset_index(drop=True))
+
+
+def test_duplicate_upload_headers_are_renamed():
+    csv = b"ID,Summary,Summary,\nA,one,two,three\n"
+    uploaded, _ = read_upload(Upload(csv, "t.csv"))
+    assert list(uploaded.columns) == ["ID", "Summary", "Summary.1", "Unnamed: 3"]
+
+
+@pytest.mark.parametrize("data, name", [(b"not a workbook", "t.xlsx"), (b'ID,Summary\n"A,unterminated', "t.csv")])
+def test_unreadable_uploads_raise_upload_error(data, name):
+    with pytest.raises(UploadError, match=f"Could not read {name}"):
+        read_upload(Upload(data, name))
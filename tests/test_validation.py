@@ -0,0 +1,41 @@
+import numpy as np
+
+import scan_helpers
+from benchmarks.synthetic import synthetic_hierarchy
+from issue_table import normalize_df
+from validation import DataValidator, find_data_issues
+
+
+def test_matches_scan():
+    df = normalize_df(synthetic_hierarchy(800, seed=3, cycles=4, dangling=20))
+    assert find_data_issues(df) == scan_helpers.find_data_issues(df)
+
+
+def test_incremental_checks_match_scan():
+    df = normalize_df(synthetic_hierarchy(800, seed=3, cycles=4, dangling=20))
+    validator = DataValidator()
+    assert validator.check(df) == scan_helpers.find_data_issues(df)
+    rng = np.random.default_rng(1)
+    parent = df.columns.get_loc("Parent ID")
+    for i in range(4):
+        # Reorder, re-point a parent (possibly closing a cycle), then delete and add rows.
+        df = normalize_df(df.iloc[rng.permutation(len(df))].reset_index(drop=True))
+        assert validator.check(df) == scan_helpers.find_data_issues(df), ("reorder", i)
+        df = df.copy()
+        df.iat[i * 7, parent] = df["ID"].iat[i * 11]
+        assert validator.check(df) == scan_helpers.find_data_issues(df), ("edit", i)
+        df = normalize_df(df.drop(index=df.index[i * 13]).reset_index(drop=True))
+        assert validator.check(df) == scan_helpers.find_data_issues(df), ("delete", i)
+
+
+def test_only_changed_rows_are_rechecked():
+    df = normalize_df(synthetic_hierarchy(200, seed=2, dangling=5))
+    validator = DataValidator()
+    first = validator.check(df)
+    df = df.copy()
+    df.iat[0, df.columns.get_loc("Summary")] = "Summary only"
+    assert validator.check(df) is first
+    df = df.copy()
+    df.iat[5, df.columns.get_loc("Blocks")] = "MISSING"
+    assert validator.check(df) == scan_helpers.find_data_issues(df)
+    assert validator.rows_checked == 1
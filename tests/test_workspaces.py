@@ -0,0 +1,85 @@
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_hierarchy
+from issue_table import ISSUE_COLUMNS, normalize_df
+from jira_sync import sync_baseline
+from workspaces import WorkspaceStore
+
+
+def _segments(store, name):
+    with closing(store._connect()) as conn:
+        return conn.execute("SELECT COUNT(*) FROM segments WHERE workspace = ?", (name,)).fetchone()[0]
+
+
+def _assert_same(loaded, df):
+    pd.testing.assert_frame_equal(
+        loaded[ISSUE_COLUMNS].reset_index(drop=True).astype(str),
+        df[ISSUE_COLUMNS].reset_index(drop=True).astype(str),
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WorkspaceStore(str(tmp_path))
+
+
+@pytest.fixture
+def df():
+    return normalize_df(synthetic_hierarchy(500, seed=7))
+
+
+def test_delta_saves_replay_to_the_saved_table(store, df):
+    state, stats = store.save("ws", df, {"focus": None})
+    assert stats["full"]
+
+    # The app's edits: rows edited in place, deleted, and appended.
+    df = df.copy()
+    df.iloc[3, df.columns.get_loc("Summary")] = "edited"
+    df.iloc[40, df.columns.get_loc("Blocks")] = df["ID"].iat[41]
+    df = df.drop(index=df.index[[10, 200]])
+    new = pd.DataFrame([dict(zip(ISSUE_COLUMNS, [f"NEW{i}", "Task", f"new {i}", "", df["ID"].iat[0], "", "", ""]))
+                        for i in range(3)])
+    df = normalize_df(pd.concat([df, new], ignore_index=True))
+    state, stats = store.save("ws", df, {"focus": None}, state=state)
+    assert not stats["full"] and stats["rows"] == 5
+    assert _segments(store, "ws") == 2
+
+    df = df.copy()
+    df.iloc[-1, df.columns.get_loc("Summary")] = "edited again"
+    state, _ = store.save("ws", df, {"focus": None}, state=state)
+
+    loaded, meta, baseline, loaded_state = store.load("ws")
+    _assert_same(loaded, df)
+    assert meta == {"focus": None} and baseline is None
+    assert loaded_state["version"] == state["version"] == 3
+    assert (loaded_state["hashes"] == state["hashes"]).all()
+
+
+def test_unchanged_table_saves_nothing(store, df):
+    state, _ = store.save("ws", df, {"focus": None})
+    state, stats = store.save("ws", df, {"focus": None}, state=state)
+    assert stats["rows"] == 0 and _segments(store, "ws") == 1
+
+
+def test_metadata_only_save_adds_no_segment(store, df):
+    state, _ = store.save("ws", df, {"focus": None})
+    baseline = sync_baseline(df)
+    state, stats = store.save("ws", df, {"focus": df["ID"].iat[0]}, baseline=baseline, state=state)
+    assert stats["rows"] == 0 and _segments(store, "ws") == 1
+
+    loaded, meta, loaded_baseline, loaded_state = store.load("ws")
+    _assert_same(loaded, df)
+    assert meta == {"focus": df["ID"].iat[0]}
+    pd.testing.assert_frame_equal(loaded_baseline, baseline)
+    assert loaded_state["meta"] == state["meta"] and loaded_state["baseline"] == state["baseline"]
+
+
+def test_reordered_table_is_rewritten(store, df):
+    state, _ = store.save("ws", df, {})
+    df = normalize_df(df.iloc[::-1].reset_index(drop=True))
+    _, stats = store.save("ws", df, {}, state=state)
+    assert stats["full"] and _segments(store, "ws") == 1
+    _assert_same(store.load("ws")[0], df)
@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from issue_graph import GRAPH_COLUMNS, IssueGraph, split_ids
+
+
+def _row_messages(issue_id, parent_id, blocks, relates, known):
+    msgs = []
+    if parent_id and parent_id not in known:
+        msgs.append(f"{issue_id}: Parent ID '{parent_id}' does not exist")
+    for b in blocks:
+        if b not in known:
+            msgs.append(f"{issue_id}: Blocks references '{b}', which does not exist")
+    for rel in relates:
+        if rel not in known:
+            msgs.append(f"{issue_id}: Relates To references '{rel}', which does not exist")
+    return msgs
+
+
+class DataValidator:
+    """find_data_issues that keeps its results between reruns.
+
+    Each check() hashes the ID / Parent ID / Blocks / Relates To columns row by row and
+    re-validates only rows whose hash changed, plus rows pointing at IDs that appeared or
+    disappeared. The parent cycle pass runs only when a parent edge changed.
+    """
+
+    def __init__(self):
+        self.row_hash = pd.Series([], index=pd.Index([], dtype=object), dtype=np.uint64)
+        self.known = set()
+        self.refs = {}                       # ID -> (parent, blocks, relates)
+        self.referrers = defaultdict(set)    # referenced ID -> IDs referencing it
+        self.row_issues = {}                 # ID -> messages, only for rows that have any
+        self.cycle_issues = []
+        self.messages = []
+        self.rows_checked = 0
+
+    def _set_refs(self, issue_id, refs):
+        old = self.refs.get(issue_id)
+        if old:
+            for ref in [old[0], *old[1], *old[2]]:
+                if ref:
+                    self.referrers[ref].discard(issue_id)
+        if refs is None:
+            self.refs.pop(issue_id, None)
+            return
+        self.refs[issue_id] = refs
+        for ref in [refs[0], *refs[1], *refs[2]]:
+            if ref:
+                self.referrers[ref].add(issue_id)
+
+    def check(self, df, graph=None):
+        """All data issue messages for df; graph (an IssueGraph of df) is only used for cycles."""
+        ids = df["ID"].astype(str).to_numpy(dtype=object)
+        hashes = pd.util.hash_pandas_object(df[GRAPH_COLUMNS], index=False).to_numpy()
+        prev_ids = self.row_hash.index
+        prev_hashes = self.row_hash.to_numpy()
+        if len(ids) == len(prev_ids) and np.array_equal(hashes, prev_hashes) and prev_ids.equals(pd.Index(ids)):
+            return self.messages
+
+        index = pd.Index(ids)
+        prev_pos = prev_ids.get_indexer(index) if len(prev_ids) else np.full(len(ids), -1)
+        is_new = prev_pos < 0
+        changed = is_new | (prev_hashes[np.where(is_new, 0, prev_pos)] != hashes) if len(prev_ids) else is_new
+        removed = prev_ids.difference(index).tolist() if len(prev_ids) else []
+        added = ids[is_new].tolist()
+
+        self.known.difference_update(removed)
+        self.known.update(added)
+        parents_changed = bool(removed or added)
+        recheck = set()
+        for issue_id in removed:
+            self._set_refs(issue_id, None)
+            self.row_issues.pop(issue_id, None)
+        for issue_id in removed + added:
+            recheck.update(self.referrers.get(issue_id, ()))
+
+        rows = np.flatnonzero(changed)
+        # Whole columns as arrays once: per-row Series.iat costs more than the rest of the loop.
+        parents = df["Parent ID"].to_numpy(dtype=object)[rows]
+        blocks = df["Blocks"].to_numpy(dtype=object)[rows]
+        relates = df["Relates To"].to_numpy(dtype=object)[rows]
+        for issue_id, parent, block_refs, relates_refs in zip(ids[rows], parents, blocks, relates):
+            parent = str(parent).strip()
+            old = self.refs.get(issue_id)
+            parents_changed = parents_changed or old is None or old[0] != parent
+            self._set_refs(issue_id, (parent, split_ids(block_refs), split_ids(relates_refs)))
+            recheck.add(issue_id)
+
+        recheck.difference_update(removed)
+        for issue_id in recheck:
+            msgs = _row_messages(issue_id, *self.refs[issue_id], self.known)
+            if msgs:
+                self.row_issues[issue_id] = msgs
+            else:
+                self.row_issues.pop(issue_id, None)
+        self.rows_checked = len(recheck)
+
+        # Cycles are reported from the row the walk entered them by, so a reorder rewrites them.
+        if parents_changed or (self.cycle_issues and not prev_ids.equals(index)):
+            if graph is None:
+                graph = IssueGraph.from_frame(df)
+            self.cycle_issues = [f"Parent cycle: {' -> '.join(graph.ids[c])}" for c in graph.parent_cycles()]
+
+        self.row_hash = pd.Series(hashes, index=index)
+        flagged = list(self.row_issues)
+        order = np.argsort(index.get_indexer(flagged), kind="stable") if flagged else []
+        self.messages = [m for i in order for m in self.row_issues[flagged[i]]] + self.cycle_issues
+        return self.messages
+
+
+def find_data_issues(df, graph=None):
+    """Dangling references and parent cycles, as human-readable messages."""
+    return DataValidator().check(df, graph)
@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from caching import CACHE_DIR
+from issue_graph import frame_fingerprint
+from issue_table import ISSUE_COLUMNS, ISSUE_TYPES, NORMALIZED_ATTR
+
+DEFAULT_WORKSPACE_DIR = os.path.join(CACHE_DIR, "workspaces")
+# Autosave runs once the session has been idle this long (seconds) after a change.
+AUTOSAVE_DELAY = 3.0
+# A save rewrites the whole table instead of adding a delta file once the deltas would hold
+# this share of its rows, or there would be more than MAX_SEGMENTS files.
+COMPACT_RATIO = 0.25
+MAX_SEGMENTS = 50
+# Parquet column holding _row_hashes, so loading needn't recompute them.
+HASH_COLUMN = "__row_hash"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workspaces (
+    name TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    saved_at REAL NOT NULL,
+    rows INTEGER NOT NULL,
+    meta TEXT NOT NULL,
+    baseline TEXT
+);
+CREATE TABLE IF NOT EXISTS segments (
+    workspace TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    file TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    deleted TEXT NOT NULL,
+    PRIMARY KEY (workspace, seq)
+);
+"""
+
+
+class WorkspaceError(Exception):
+    """A workspace could not be read or written."""
+
+
+def _row_hashes(df):
+    """One uint64 per row over ISSUE_COLUMNS, to tell which rows changed since the last save."""
+    out = np.zeros(len(df), dtype=np.uint64)
+    for c in ISSUE_COLUMNS:
+        with np.errstate(over="ignore"):
+            out = out * np.uint64(1000003) ^ pd.util.hash_array(df[c].to_numpy(dtype=object), categorize=False)
+    return out
+
+
+def _encode_meta(meta):
+    meta = dict(meta)
+    if meta.get("link_index") is not None:
+        meta["link_index"] = [[*key, link_id] for key, link_id in meta["link_index"].items()]
+    return json.dumps(meta, sort_keys=True)
+
+
+def _decode_meta(text):
+    meta = json.loads(text)
+    if meta.get("link_index") is not None:
+        meta["link_index"] = {tuple(row[:3]): row[3] for row in meta["link_index"]}
+    return meta
+
+
+def _baseline_print(baseline):
+    return frame_fingerprint(baseline.reset_index()) if baseline is not None else None
+
+
+def _normalized(df):
+    """A table read back from Parquet, marked normalized the way normalize_df leaves it."""
+    df = df.reset_index(drop=True)
+    extra = [lvl for lvl in df["Level"].astype(object).unique() if lvl not in ISSUE_TYPES]
+    df["Level"] = pd.Categorical(df["Level"].astype(object), categories=ISSUE_TYPES + extra)
+    df.attrs[NORMALIZED_ATTR] = True
+    return df
+
+
+class WorkspaceStore:
+    """Named workspaces on disk: the issue table as Parquet files, everything else in SQLite.
+
+    A workspace's table is a full Parquet file followed by delta files, each holding the rows
+    added or changed by one save plus (in SQLite) the IDs it deleted; loading replays them in
+    order. Besides the table, a workspace keeps a JSON metadata dict (type map, schema, focus,
+    link index) and the sync baseline.
+
+    save() and load() return the saved state: the version (latest segment number) and per-row
+    hashes that the next save diffs against. Like IssueCache, it opens a connection per call.
+    """
+
+    def __init__(self, root=DEFAULT_WORKSPACE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.root, "workspaces.sqlite3"), timeout=30)
+
+    @staticmethod
+    def _folder(name):
+        return hashlib.blake2b(name.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _write(self, name, df, suffix, hashes=None):
+        """df (plus HASH_COLUMN, if hashes) as a new Parquet file of the workspace; returns its path relative to root."""
+        rel = os.path.join(self._folder(name), f"{uuid.uuid4().hex}.{suffix}.parquet")
+        os.makedirs(os.path.join(self.root, self._folder(name)), exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if hashes is not None:
+            table = table.append_column(HASH_COLUMN, pa.array(hashes, type=pa.uint64()))
+        pq.write_table(table, os.path.join(self.root, rel))
+        return rel
+
+    def _remove(self, files):
+        for rel in files:
+            try:
+                os.remove(os.path.join(self.root, rel))
+            except FileNotFoundError:
+                pass
+
+    def _read(self, rel):
+        df = pq.read_table(os.path.join(self.root, rel)).to_pandas()
+        if "Level" in df.columns:
+            df["Level"] = df["Level"].astype(object)
+        return df
+
+    def names(self):
+        """[(name, saved_at, rows)] of every workspace, most recently saved first."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT name, saved_at, rows FROM workspaces ORDER BY saved_at DESC").fetchall()
+
+    def exists(self, name):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM workspaces WHERE name = ?", (name,)).fetchone() is not None
+
+    def load(self, name):
+        """(df, meta, baseline, saved state) of a workspace; df comes back normalized."""
+        try:
+            return self._load(name)
+        except (OSError, sqlite3.Error, pa.ArrowException) as e:
+            raise WorkspaceError(f"Could not load workspace '{name}': {e}") from e
+
+    def _load(self, name):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT meta, baseline FROM workspaces WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise WorkspaceError(f"No workspace named '{name}'.")
+            segments = conn.execute(
+                "SELECT seq, file, deleted FROM segments WHERE workspace = ? ORDER BY seq", (name,)
+            ).fetchall()
+        df = self._read(segments[0][1])
+        for _, rel, deleted in segments[1:]:
+            deleted = json.loads(deleted)
+            if deleted:
+                df = df[~df["ID"].isin(deleted)]
+            part = self._read(rel)
+            # Changed rows replace theirs in place; added ones go to the end, as in the session.
+            pos = pd.Index(df["ID"]).get_indexer(part["ID"])
+            known = pos >= 0
+            df = df.reset_index(drop=True)
+            if known.any():
+                df.iloc[pos[known]] = part[known].to_numpy()
+            df = pd.concat([df, part[~known]], ignore_index=True)
+        hashes = df.pop(HASH_COLUMN).to_numpy(dtype=np.uint64)
+        df = _normalized(df)
+        baseline = self._read(row[1]).set_index("Jira Key") if row[1] else None
+        state = {
+            "name": name, "version": segments[-1][0], "ids": df["ID"].to_numpy(dtype=object),
+            "hashes": hashes, "meta": row[0],
+            "baseline": _baseline_print(baseline),
+        }
+        return df, _decode_meta(row[0]), baseline, state
+
+    def save(self, name, df, meta, baseline=None, state=None):
+        """Save df, meta and baseline as workspace `name`; returns (new saved state, stats).
+
+        With the state of this workspace's last load or save, only the rows changed since then
+        are written, unless the table was reordered, another session saved in between, or the
+        deltas are due for compaction. Nothing is written when nothing changed.
+        """
+        try:
+            return self._save(name, df, meta, baseline, state)
+        except (OSError, sqlite3.Error, pa.ArrowException) as e:
+            raise WorkspaceError(f"Could not save workspace '{name}': {e}") from e
+
+    def _save(self, name, df, meta, baseline, state):
+        started = time.perf_counter()
+        df = df[ISSUE_COLUMNS]
+        ids = df["ID"].to_numpy(dtype=object)
+        hashes = _row_hashes(df)
+        meta_text = _encode_meta(meta)
+        baseline_print = _baseline_print(baseline)
+        if state is not None and state["name"] != name:
+            state = None
+
+        with closing(self._connect()) as conn:
+            segments = conn.execute(
+                "SELECT seq, file, rows FROM segments WHERE workspace = ? ORDER BY seq", (name,)
+            ).fetchall()
+            old_baseline = conn.execute("SELECT baseline FROM workspaces WHERE name = ?", (name,)).fetchone()
+        version = segments[-1][0] if segments else None
+
+        rows = None
+        deleted = []
+        if state is not None and state["version"] == version:
+            delta = self._delta(state, ids, hashes)
+            if delta is not None:
+                rows, deleted = delta
+                if not len(rows) and not deleted:
+                    # The table is as saved: at most the metadata or baseline changed.
+                    if meta_text != state["meta"] or baseline_print != state["baseline"]:
+                        state = self._save_meta(name, meta_text, baseline, baseline_print, state, old_baseline)
+                    return state, {"rows": 0, "full": False, "seconds": time.perf_counter() - started}
+                pending = sum(r for _, _, r in segments[1:]) + len(rows)
+                if pending > COMPACT_RATIO * max(len(df), 1) or len(segments) >= MAX_SEGMENTS:
+                    rows = None
+        full = rows is None
+
+        new_files = [self._write(name, df if full else df.iloc[rows], "table", hashes if full else hashes[rows])]
+        baseline_file, new_baseline, stale = self._baseline_files(name, baseline, baseline_print, state, old_baseline)
+        new_files += new_baseline
+
+        seq = (version or 0) + 1
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                if full:
+                    stale += [f for _, f in conn.execute("SELECT seq, file FROM segments WHERE workspace = ?", (name,))]
+                    conn.execute("DELETE FROM segments WHERE workspace = ?", (name,))
+                conn.execute(
+                    "INSERT INTO segments (workspace, seq, file, rows, deleted) VALUES (?, ?, ?, ?, ?)",
+                    (name, seq, new_files[0], len(df) if full else len(rows), json.dumps(deleted)),
+                )
+                conn.execute(
+                    "INSERT INTO workspaces (name, created_at, saved_at, rows, meta, baseline) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET saved_at = excluded.saved_at, rows = excluded.rows, "
+                    "meta = excluded.meta, baseline = excluded.baseline",
+                    (name, now, now, len(df), meta_text, baseline_file),
+                )
+        except sqlite3.Error:
+            self._remove(new_files)
+            raise
+        self._remove(stale)
+        state = {
+            "name": name, "version": seq, "ids": ids, "hashes": hashes, "meta": meta_text, "baseline": baseline_print,
+        }
+        stats = {"rows": len(df) if full else len(rows), "full": full, "seconds": time.perf_counter() - started}
+        return state, stats
+
+    def _baseline_files(self, name, baseline, baseline_print, state, old_baseline):
+        """(baseline file to record, files written, files made stale): the baseline is only
+        rewritten when it changed since state."""
+        baseline_file = old_baseline[0] if old_baseline else None
+        if state is not None and baseline_print == state["baseline"]:
+            return baseline_file, [], []
+        stale = [baseline_file] if baseline_file else []
+        baseline_file = self._write(name, baseline.reset_index(), "baseline") if baseline is not None else None
+        return baseline_file, [baseline_file] if baseline_file else [], stale
+
+    def _save_meta(self, name, meta_text, baseline, baseline_print, state, old_baseline):
+        """Record new metadata / baseline of a workspace whose table is unchanged, without a
+        new segment; returns the new saved state."""
+        baseline_file, new_files, stale = self._baseline_files(name, baseline, baseline_print, state, old_baseline)
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "UPDATE workspaces SET saved_at = ?, meta = ?, baseline = ? WHERE name = ?",
+                    (time.time(), meta_text, baseline_file, name),
+                )
+        except sqlite3.Error:
+            self._remove(new_files)
+            raise
+        self._remove(stale)
+        return dict(state, meta=meta_text, baseline=baseline_print)
+
+    @staticmethod
+    def _delta(state, ids, hashes):
+        """(positions of added or changed rows, deleted IDs) since state, or None if rows moved.
+
+        A delta can only express rows deleted, edited in place or appended, which is how the
+        app's edits change the table; anything else (e.g. re-pulled rows moving to the end)
+        needs a full rewrite.
+        """
+        old_ids = state["ids"]
+        kept = pd.Index(ids).get_indexer(old_ids) >= 0
+        k = int(kept.sum())
+        if not np.array_equal(ids[:k], old_ids[kept]):
+            return None
+        changed = np.flatnonzero(hashes[:k] != state["hashes"][kept])
+        return np.concatenate([changed, np.arange(k, len(ids))]), old_ids[~kept].tolist()
+
+    def delete(self, name):
+        with closing(self._connect()) as conn, conn:
+            files = [f for (f,) in conn.execute("SELECT file FROM segments WHERE workspace = ?", (name,))]
+            row = conn.execute("SELECT baseline FROM workspaces WHERE name = ?", (name,)).fetchone()
+            conn.execute("DELETE FROM segments WHERE workspace = ?", (name,))
+            conn.execute("DELETE FROM workspaces WHERE name = ?", (name,))
+        self._remove(files + ([row[0]] if row and row[0] else []))
+
+
+def open_workspace_store(root=DEFAULT_WORKSPACE_DIR):
+    """WorkspaceStore at root, or None when it can't be created (e.g. a read-only home directory)."""
+    try:
+        return WorkspaceStore(root)
+    except (OSError, sqlite3.Error):
+        return None